@@ -1,6 +1,13 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import copy
+import csv
+from datetime import date, datetime
 import functools
+import io
+import itertools
 import json
 import logging
 import re
@@ -9,6 +16,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Optional,
     Set,
@@ -21,10 +29,19 @@ import urllib.parse
 
 from apispec import APISpec, yaml_utils
 from apispec.exceptions import DuplicateComponentNameError
-from flask import Blueprint, current_app, jsonify, make_response, request, Response
+from flask import (
+    Blueprint,
+    current_app,
+    jsonify,
+    make_response,
+    request,
+    Response,
+    stream_with_context,
+)
 from flask_appbuilder._compat import as_unicode
 from flask_appbuilder.api.convert import Model2SchemaConverter
 from flask_appbuilder.api.schemas import (
+    export_schema,
     get_info_schema,
     get_item_schema,
     get_list_schema,
@@ -35,12 +52,15 @@ from flask_appbuilder.const import (
     API_ADD_COLUMNS_RIS_KEY,
     API_ADD_TITLE_RES_KEY,
     API_ADD_TITLE_RIS_KEY,
+    API_COUNT_MODE_RIS_KEY,
+    API_CURSOR_RIS_KEY,
     API_DESCRIPTION_COLUMNS_RES_KEY,
     API_DESCRIPTION_COLUMNS_RIS_KEY,
     API_EDIT_COLUMNS_RES_KEY,
     API_EDIT_COLUMNS_RIS_KEY,
     API_EDIT_TITLE_RES_KEY,
     API_EDIT_TITLE_RIS_KEY,
+    API_EXPORT_FORMAT_RIS_KEY,
     API_FILTERS_RES_KEY,
     API_FILTERS_RIS_KEY,
     API_LABEL_COLUMNS_RES_KEY,
@@ -49,6 +69,7 @@ from flask_appbuilder.const import (
     API_LIST_COLUMNS_RIS_KEY,
     API_LIST_TITLE_RES_KEY,
     API_LIST_TITLE_RIS_KEY,
+    API_NEXT_CURSOR_RES_KEY,
     API_ORDER_COLUMN_RIS_KEY,
     API_ORDER_COLUMNS_RES_KEY,
     API_ORDER_COLUMNS_RIS_KEY,
@@ -65,12 +86,16 @@ from flask_appbuilder.const import (
     API_SHOW_TITLE_RES_KEY,
     API_SHOW_TITLE_RIS_KEY,
     API_URI_RIS_KEY,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_NDJSON,
     PERMISSION_PREFIX,
+    QUERY_COUNT_MODE_EXACT,
 )
 from flask_appbuilder.exceptions import (
     DatabaseException,
     FABException,
     InvalidColumnArgsFABException,
+    InvalidCursorFABException,
     InvalidOrderByColumnFABException,
 )
 from flask_appbuilder.hooks import (
@@ -82,8 +107,9 @@ from flask_appbuilder.models.sqla import Model
 from flask_appbuilder.models.sqla.filters import BaseFilter
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_appbuilder.security.decorators import permission_name, protect
+from flask_appbuilder.utils.cache import TTLCache
 from flask_appbuilder.utils.limit import Limit
-from flask_babel import lazy_gettext as _
+from flask_babel import get_locale, lazy_gettext as _
 import jsonschema
 from marshmallow import Schema, ValidationError
 from marshmallow.fields import Field
@@ -774,10 +800,14 @@ class BaseApi(AbstractViewApi):
     def merge_current_user_permissions(
         self, response: Dict[str, Any], **kwargs: Any
     ) -> None:
+        access = self.appbuilder.sm.has_access_batch(
+            (permission, self.class_permission_name)
+            for permission in self.base_permissions
+        )
         response[API_PERMISSIONS_RES_KEY] = [
             permission
             for permission in self.base_permissions
-            if self.appbuilder.sm.has_access(permission, self.class_permission_name)
+            if access[(permission, self.class_permission_name)]
         ]
 
     @staticmethod
@@ -958,6 +988,41 @@ class ModelRestApi(BaseApi):
     many-to-one relationships at the model level. Will apply:
      https://docs.sqlalchemy.org/en/14/orm/loading_relationships.html#sqlalchemy.orm.Load.defaultload
     """
+    list_count_mode = QUERY_COUNT_MODE_EXACT
+    """
+    How the get list endpoint counts the total number of records, one of
+    `exact`, `window`, `estimated` or `none`. Take a look at `SQLAInterface.query`.
+    Clients can override it with the `count_mode` rison argument
+    """
+    allow_export = False
+    """
+    Enables the `/export/` endpoint, that streams all the rows matching the
+    rison filters and order as CSV or NDJSON, with no page size limit.
+    It's protected by its own `can_export` permission
+    """
+    export_batch_size = 1000
+    """
+    Number of rows fetched from the database on each round trip by `/export/`
+    """
+    locale_metadata_cache_maxsize = 256
+    """
+    Maximum number of translated meta data blocks kept, like label and
+    description columns or titles, by locale and columns
+    """
+    info_etag_ttl = 0
+    """
+    Seconds the ETag of an `_info` response is trusted, for the same
+    locale, user and rison arguments. Meanwhile, requests with a matching
+    `If-None-Match` get a 304 without computing the response. Related field
+    values, that come from the database, may be stale for up to this time.
+    0 always computes the response, and compares its ETag
+    """
+    columns_schema_cache_maxsize = 128
+    """
+    Maximum number of marshmallow schemas generated for the `columns` rison
+    argument that are kept, by requested columns. Set 0 to generate
+    a new schema on each request
+    """
     list_columns: Optional[List[str]] = None
     """
     A list of columns (or model's methods) to be displayed on the list view.
@@ -1098,12 +1163,15 @@ class ModelRestApi(BaseApi):
     (inherit from BaseModel2SchemaConverter)
     """
     _apispec_parameter_schemas = {
+        "export_schema": export_schema,
         "get_info_schema": get_info_schema,
         "get_item_schema": get_item_schema,
         "get_list_schema": get_list_schema,
     }
 
     def __init__(self) -> None:
+        if not self.allow_export:
+            self.exclude_route_methods = set(self.exclude_route_methods) | {"export"}
         super().__init__()
         self._init_properties()
         self._init_titles()
@@ -1111,6 +1179,10 @@ class ModelRestApi(BaseApi):
         self.model2schemaconverter = self.model2schemaconverter(
             self.datamodel, self.validators_columns
         )
+        self._entities_datamodels: Dict[Type[Model], SQLAInterface] = {}
+        self._columns_schemas = TTLCache(maxsize=self.columns_schema_cache_maxsize)
+        self._locale_metadata = TTLCache(maxsize=self.locale_metadata_cache_maxsize)
+        self._info_etags = TTLCache(ttl=self.info_etag_ttl)
 
     def create_blueprint(
         self, appbuilder: "AppBuilder", *args: Any, **kwargs: Any
@@ -1274,11 +1346,11 @@ class ModelRestApi(BaseApi):
     def _fetch_entities(self, model_class: Model, ids: List[int]):
         if not ids:
             return []
-        return (
-            current_app.appbuilder.session.query(model_class)
-            .filter(model_class.id.in_(ids))
-            .all()
-        )
+        datamodel = self._entities_datamodels.get(model_class)
+        if datamodel is None:
+            datamodel = self.datamodel.__class__(model_class)
+            self._entities_datamodels[model_class] = datamodel
+        return datamodel.get_many(ids)
 
     def merge_add_field_info(self, response: Dict[str, Any], **kwargs: Any) -> None:
         add_columns_info = kwargs.get("add_columns", {})
@@ -1313,10 +1385,14 @@ class ModelRestApi(BaseApi):
         response[API_FILTERS_RES_KEY] = search_filters
 
     def merge_add_title(self, response: Dict[str, Any], **kwargs: Any) -> None:
-        response[API_ADD_TITLE_RES_KEY] = self.add_title
+        response[API_ADD_TITLE_RES_KEY] = self._get_locale_metadata(
+            ("add_title",), str, self.add_title
+        )
 
     def merge_edit_title(self, response: Dict[str, Any], **kwargs: Any) -> None:
-        response[API_EDIT_TITLE_RES_KEY] = self.edit_title
+        response[API_EDIT_TITLE_RES_KEY] = self._get_locale_metadata(
+            ("edit_title",), str, self.edit_title
+        )
 
     def merge_label_columns(self, response: Dict[str, Any], **kwargs: Any) -> None:
         pruned_select_cols = kwargs.get(API_SELECT_COLUMNS_RIS_KEY, [])
@@ -1330,7 +1406,9 @@ class ModelRestApi(BaseApi):
                 columns = self.show_columns
             else:
                 columns = self.label_columns  # pragma: no cover
-        response[API_LABEL_COLUMNS_RES_KEY] = self._label_columns_json(columns)
+        response[API_LABEL_COLUMNS_RES_KEY] = self._get_locale_metadata(
+            ("label_columns", tuple(columns or ())), self._label_columns_json, columns
+        )
 
     def merge_list_label_columns(self, response: Dict[str, Any], **kwargs: Any) -> None:
         self.merge_label_columns(response, caller="list", **kwargs)
@@ -1350,14 +1428,15 @@ class ModelRestApi(BaseApi):
     ) -> None:
         pruned_select_cols = kwargs.get(API_SELECT_COLUMNS_RIS_KEY, [])
         if pruned_select_cols:
-            response[API_DESCRIPTION_COLUMNS_RES_KEY] = self._description_columns_json(
-                pruned_select_cols
-            )
+            columns = pruned_select_cols
         else:
             # Send all descriptions if cols are or request pruned
-            response[API_DESCRIPTION_COLUMNS_RES_KEY] = self._description_columns_json(
-                self.description_columns
-            )
+            columns = list(self.description_columns)
+        response[API_DESCRIPTION_COLUMNS_RES_KEY] = self._get_locale_metadata(
+            ("description_columns", tuple(columns)),
+            self._description_columns_json,
+            columns,
+        )
 
     def merge_list_columns(self, response: Dict[str, Any], **kwargs: Any) -> None:
         pruned_select_cols = kwargs.get(API_SELECT_COLUMNS_RIS_KEY, [])
@@ -1378,19 +1457,63 @@ class ModelRestApi(BaseApi):
             response[API_ORDER_COLUMNS_RES_KEY] = self.order_columns
 
     def merge_list_title(self, response: Dict[str, Any], **kwargs: Any) -> None:
-        response[API_LIST_TITLE_RES_KEY] = self.list_title
+        response[API_LIST_TITLE_RES_KEY] = self._get_locale_metadata(
+            ("list_title",), str, self.list_title
+        )
 
     def merge_show_title(self, response: Dict[str, Any], **kwargs: Any) -> None:
-        response[API_SHOW_TITLE_RES_KEY] = self.show_title
+        response[API_SHOW_TITLE_RES_KEY] = self._get_locale_metadata(
+            ("show_title",), str, self.show_title
+        )
+
+    def _get_locale_metadata(
+        self, key: Tuple[Any, ...], func: Callable[..., Any], *args: Any
+    ) -> Any:
+        """
+        Returns static response meta data, like translated labels or titles.
+        func(*args) is called once per locale and key, then a shallow copy
+        of the kept result is returned
+
+        :param key: A hashable key for the meta data, without the locale
+        :param func: Function that computes the meta data
+        """
+        key = (str(get_locale()),) + key
+        value = self._locale_metadata.get(key)
+        if value is None:
+            value = func(*args)
+            self._locale_metadata.set(key, value)
+        return copy.copy(value)
+
+    def _get_info_etag_key(self, rison_args: Dict[str, Any]) -> Tuple[Any, ...]:
+        user = self.appbuilder.sm.current_user
+        return (
+            str(get_locale()),
+            getattr(user, "id", None),
+            self.appbuilder.sm.permissions_version,
+            self.appbuilder.sm.users_version,
+            json.dumps(rison_args, sort_keys=True),
+        )
 
     def info_headless(self, **kwargs: Any) -> Response:
         """
-        response for CRUD REST meta data
+        response for CRUD REST meta data, with a strong ETag
         """
         payload = {}
         rison_args = kwargs.get("rison", {})
+        etag_key = None
+        if self.info_etag_ttl:
+            etag_key = self._get_info_etag_key(rison_args)
+            etag = self._info_etags.get(etag_key)
+            if etag and request.if_none_match.contains(etag):
+                response = make_response("", 304)
+                response.set_etag(etag)
+                return response
         self.set_response_key_mappings(payload, self.info, rison_args, **rison_args)
-        return self.response(200, **payload)
+        response = self.response(200, **payload)
+        response.add_etag()
+        if etag_key:
+            self._info_etags.set(etag_key, response.get_etag()[0])
+        return response.make_conditional(request)
 
     @expose("/_info", methods=["GET"])
     @protect()
@@ -1495,7 +1618,7 @@ class ModelRestApi(BaseApi):
             response, self.get, args, **{API_SELECT_COLUMNS_RIS_KEY: pruned_select_cols}
         )
         if pruned_select_cols:
-            show_model_schema = self.model2schemaconverter.convert(pruned_select_cols)
+            show_model_schema = self.get_columns_schema(pruned_select_cols)
         else:
             show_model_schema = self.show_model_schema
 
@@ -1612,7 +1735,7 @@ class ModelRestApi(BaseApi):
         # Create a response schema with the computed response columns,
         # defined or requested
         if pruned_select_cols:
-            list_model_schema = self.model2schemaconverter.convert(pruned_select_cols)
+            list_model_schema = self.get_columns_schema(pruned_select_cols)
         else:
             list_model_schema = self.list_model_schema
         # handle filters
@@ -1627,6 +1750,18 @@ class ModelRestApi(BaseApi):
             return self.response_400(message=str(e))
         # handle pagination
         page_index, page_size = self._handle_page_args(args)
+        cursor = args.get(API_CURSOR_RIS_KEY)
+        seek_after = None
+        if cursor is not None:
+            try:
+                order_column, order_direction, seek_after = self._handle_cursor_args(
+                    cursor, order_column, order_direction
+                )
+            except InvalidCursorFABException as e:
+                return self.response_400(message=str(e))
+            page_index = None
+            if select_columns and order_column not in select_columns:
+                select_columns = select_columns + [order_column]
         # Make the query
         count, lst = self.datamodel.query(
             joined_filters,
@@ -1636,11 +1771,19 @@ class ModelRestApi(BaseApi):
             page_size=page_size,
             select_columns=select_columns,
             outer_default_load=self.list_outer_default_load,
+            count_mode=args.get(API_COUNT_MODE_RIS_KEY, self.list_count_mode),
+            seek_after=seek_after,
         )
         pks = self.datamodel.get_keys(lst)
         response[API_RESULT_RES_KEY] = list_model_schema.dump(lst, many=True)
         response["ids"] = pks
         response["count"] = count
+        if cursor is not None:
+            response[API_NEXT_CURSOR_RES_KEY] = (
+                self._encode_cursor(lst[-1], order_column, order_direction)
+                if page_size and len(lst) == page_size
+                else None
+            )
         self.pre_get_list(response)
         return self.response(200, **response)
 
@@ -1713,8 +1856,10 @@ class ModelRestApi(BaseApi):
                           type: string
                       count:
                         description: >-
-                          The total record count on the backend
+                          The total record count on the backend,
+                          null when count_mode is none
                         type: number
+                        nullable: true
                       order_columns:
                         description: >-
                           A list of allowed columns to sort
@@ -1738,6 +1883,138 @@ class ModelRestApi(BaseApi):
         """
         return self.get_list_headless(**kwargs)
 
+    def export_headless(self, **kwargs: Any) -> Response:
+        """
+        Streams all the items from Model
+        """
+        args = kwargs.get("rison", {})
+        # handle select columns
+        try:
+            select_columns, pruned_select_cols = self._handle_columns_args(
+                args,
+                self.list_select_columns,
+                self.list_columns,
+            )
+        except InvalidColumnArgsFABException as e:
+            return self.response_400(message=str(e))
+        if pruned_select_cols:
+            list_model_schema = self.get_columns_schema(pruned_select_cols)
+        else:
+            list_model_schema = self.list_model_schema
+        # handle filters
+        try:
+            joined_filters = self._handle_filters_args(args)
+        except FABException as e:
+            return self.response_400(message=str(e))
+        # handle base order
+        try:
+            order_column, order_direction = self._handle_order_args(args)
+        except InvalidOrderByColumnFABException as e:
+            return self.response_400(message=str(e))
+        # To many columns are fetched page by page, that needs a single pk
+        if (
+            select_columns
+            and self.datamodel.exists_col_to_many(select_columns)
+            and self.datamodel.is_pk_composite()
+        ):
+            return self.response_400(message="Composite primary key not supported")
+        items = self.datamodel.query_iter(
+            joined_filters,
+            order_column,
+            order_direction,
+            select_columns=select_columns,
+            outer_default_load=self.list_outer_default_load,
+            batch_size=self.export_batch_size,
+        )
+        # Fetch the first batch before streaming, so that query errors are
+        # returned as an error response instead of breaking the stream
+        items = itertools.chain(list(itertools.islice(items, 1)), items)
+        export_format = args.get(API_EXPORT_FORMAT_RIS_KEY, EXPORT_FORMAT_CSV)
+        if export_format == EXPORT_FORMAT_NDJSON:
+            rows = self._export_ndjson(items, list_model_schema)
+            mimetype = "application/x-ndjson"
+        else:
+            rows = self._export_csv(items, list_model_schema)
+            mimetype = "text/csv"
+        response = Response(stream_with_context(rows), mimetype=mimetype)
+        response.headers["Content-Disposition"] = (
+            f"attachment; filename={self.resource_name}.{export_format}"
+        )
+        return response
+
+    def _export_csv(self, items: Iterator[Model], schema: Schema) -> Iterator[str]:
+        columns = [field.data_key or name for name, field in schema.dump_fields.items()]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for i, item in enumerate(items, start=1):
+            row = schema.dump(item)
+            writer.writerow(
+                [
+                    (
+                        json.dumps(value, default=str)
+                        if isinstance(value, (dict, list))
+                        else value
+                    )
+                    for value in (row.get(column) for column in columns)
+                ]
+            )
+            if i % self.export_batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def _export_ndjson(self, items: Iterator[Model], schema: Schema) -> Iterator[str]:
+        lines = []
+        for item in items:
+            lines.append(json.dumps(schema.dump(item), default=str))
+            if len(lines) == self.export_batch_size:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+    @expose("/export/", methods=["GET"])
+    @protect()
+    @safe
+    @permission_name("export")
+    @rison(export_schema)
+    def export(self, **kwargs: Any) -> Response:
+        """Export all items from Model
+        ---
+        get:
+          description: >-
+            Streams all the models matching the filters as CSV or NDJSON,
+            with no page size limit
+          parameters:
+          - in: query
+            name: q
+            content:
+              application/json:
+                schema:
+                  $ref: '#/components/schemas/export_schema'
+          responses:
+            200:
+              description: Items from Model
+              content:
+                text/csv:
+                  schema:
+                    type: string
+                application/x-ndjson:
+                  schema:
+                    type: string
+            400:
+              $ref: '#/components/responses/400'
+            401:
+              $ref: '#/components/responses/401'
+            422:
+              $ref: '#/components/responses/422'
+            500:
+              $ref: '#/components/responses/500'
+        """
+        return self.export_headless(**kwargs)
+
     def post_headless(self) -> Response:
         """
         POST/Add item to Model
@@ -1981,10 +2258,87 @@ class ModelRestApi(BaseApi):
             )
         return order_column, order_direction
 
+    def _handle_cursor_args(
+        self, cursor: str, order_column: str, order_direction: str
+    ) -> Tuple[str, str, Optional[Tuple[Any, Any]]]:
+        """
+        Help function to handle the rison keyset pagination cursor.
+        An empty cursor requests the first page. Orders by primary key
+        when no order column is set
+
+        :param cursor: The opaque cursor returned on `next_cursor`
+        :param order_column: The requested order column
+        :param order_direction: The requested order direction
+        :return: (tuple) order_column, order_direction, seek_after
+        """
+        if self.datamodel.is_pk_composite():
+            raise InvalidCursorFABException(
+                "Cursor pagination is not supported with composite primary keys"
+            )
+        if not order_column:
+            order_column, order_direction = self.datamodel.get_pk_name(), "asc"
+        elif not self.datamodel.is_keyset_supported(order_column):
+            raise InvalidCursorFABException(
+                f"Cursor pagination is not supported ordering by: {order_column}"
+            )
+        if not cursor:
+            return order_column, order_direction, None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+            seek_after = tuple(payload["after"])
+            if (payload["col"], payload["dir"]) != (order_column, order_direction):
+                raise ValueError("Cursor order does not match the request order")
+            if len(seek_after) != 2:
+                raise ValueError("Malformed cursor values")
+        except (binascii.Error, KeyError, TypeError, ValueError) as e:
+            raise InvalidCursorFABException(f"Invalid cursor: {e}")
+        return order_column, order_direction, seek_after
+
+    def _encode_cursor(
+        self, item: Model, order_column: str, order_direction: str
+    ) -> str:
+        """
+        Returns the opaque cursor that points after a certain item
+        """
+        values = [getattr(item, order_column), self.datamodel.get_pk_value(item)]
+        payload = {
+            "col": order_column,
+            "dir": order_direction,
+            "after": [
+                value.isoformat() if isinstance(value, (date, datetime)) else value
+                for value in values
+            ],
+        }
+        return base64.urlsafe_b64encode(
+            json.dumps(payload, default=str).encode("utf-8")
+        ).decode("utf-8")
+
     def _handle_filters_args(self, rison_args: Dict[str, Any]) -> Filters:
-        self._filters.clear_filters()
-        self._filters.rest_add_filters(rison_args.get(API_FILTERS_RIS_KEY, []))
-        return self._filters.get_joined_filters(self._base_filters)
+        # self._filters is shared by all requests, it's never changed
+        filters = self._filters.empty_copy()
+        filters.rest_add_filters(rison_args.get(API_FILTERS_RIS_KEY, []))
+        return filters.get_joined_filters(self._base_filters)
+
+    def get_columns_schema(self, columns: List[str], nested: bool = True) -> Schema:
+        """
+        Returns the marshmallow schema for columns requested with the `columns`
+        rison argument. Generating schema classes is expensive, so they are
+        kept on a LRU cache by columns and nested flag, take a look at
+        `columns_schema_cache_maxsize`. The cache hits and misses are
+        counted on `self._columns_schemas`
+
+        :param columns: A list of the requested columns, supports dotted notation
+        :param nested: Generate relations with nested schemas
+        :return: A marshmallow Schema instance
+        """
+        if not self.columns_schema_cache_maxsize:
+            return self.model2schemaconverter.convert(columns, nested=nested)
+        key = (tuple(columns), nested)
+        schema = self._columns_schemas.get(key)
+        if schema is None:
+            schema = self.model2schemaconverter.convert(columns, nested=nested)
+            self._columns_schemas.set(key, schema)
+        return schema
 
     def _handle_columns_args(
         self,
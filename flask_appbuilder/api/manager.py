@@ -1,12 +1,21 @@
+import gzip
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
 from apispec import APISpec
 from apispec.ext.marshmallow import MarshmallowPlugin
 from apispec.ext.marshmallow.common import resolve_schema_cls
-from flask import current_app, request
+from flask import current_app, request, Response
 from flask_appbuilder.api import BaseApi
 from flask_appbuilder.api import expose, protect, safe
 from flask_appbuilder.basemanager import BaseManager
 from flask_appbuilder.baseviews import BaseView
 from flask_appbuilder.security.decorators import has_access
+from flask_appbuilder.utils.cache import TTLCache
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
 
 
 def resolver(schema):
@@ -22,10 +31,43 @@ def resolver(schema):
     return name
 
 
+class OpenApiSpec(NamedTuple):
+    """
+    A rendered OpenAPI spec, ready to be served as is
+    """
+
+    data: bytes
+    gzip_data: bytes
+    etag: str
+
+    @classmethod
+    def from_data(cls, data: bytes) -> "OpenApiSpec":
+        return cls(
+            data=data,
+            gzip_data=gzip.compress(data, mtime=0),
+            etag=hashlib.sha1(data).hexdigest(),
+        )
+
+
+def get_openapi_spec_file(version: str) -> Optional[str]:
+    """
+    Returns the path of the prebuilt spec file for version, on
+    FAB_OPENAPI_SPEC_FOLDER, or None if not configured
+    """
+    folder = current_app.config.get("FAB_OPENAPI_SPEC_FOLDER")
+    if not folder:
+        return None
+    return os.path.join(folder, f"openapi_{version}.json")
+
+
 class OpenApi(BaseApi):
     route_base = "/api"
     allow_browser_login = True
 
+    def __init__(self) -> None:
+        super().__init__()
+        self._specs = TTLCache(maxsize=32)
+
     @expose("/<version>/_openapi")
     @protect()
     @safe
@@ -53,22 +95,95 @@ class OpenApi(BaseApi):
             500:
               $ref: '#/components/responses/500'
         """
+        spec = self.get_spec(version)
+        if spec is None:
+            return self.response_404()
+        if "gzip" in request.accept_encodings:
+            response = Response(spec.gzip_data, content_type=JSON_CONTENT_TYPE)
+            response.headers["Content-Encoding"] = "gzip"
+            response.set_etag(f"{spec.etag}-gzip")
+        else:
+            response = Response(spec.data, content_type=JSON_CONTENT_TYPE)
+            response.set_etag(spec.etag)
+        response.vary.add("Accept-Encoding")
+        return response.make_conditional(request)
+
+    def get_spec(self, version: str) -> Optional[OpenApiSpec]:
+        """
+        Returns the rendered spec for version. It's read from
+        FAB_OPENAPI_SPEC_FOLDER when prebuilt there, or built and kept
+        by version, servers and registered views when FAB_OPENAPI_CACHE_ENABLED
+
+        :param version: The API version
+        :return: The spec, or None if no API has this version
+        """
+        path = get_openapi_spec_file(version)
+        if path and os.path.exists(path):
+            # Keyed by modification time so a re exported file is picked up
+            file_key = (path, os.stat(path).st_mtime_ns)
+            spec = self._specs.get(file_key)
+            if spec is None:
+                with open(path, "rb") as fd:
+                    spec = OpenApiSpec.from_data(fd.read())
+                self._specs.set(file_key, spec)
+            return spec
+        servers = self._get_servers()
+        if not current_app.config["FAB_OPENAPI_CACHE_ENABLED"]:
+            return self._build_spec(version, servers)
+        key = (
+            version,
+            json.dumps(servers, sort_keys=True),
+            len(current_app.appbuilder.baseviews),
+        )
+        spec = self._specs.get(key)
+        if spec is None:
+            spec = self._build_spec(version, servers)
+            if spec is not None:
+                self._specs.set(key, spec)
+        return spec
+
+    @classmethod
+    def _build_spec(
+        cls, version: str, servers: List[Dict[str, Any]]
+    ) -> Optional[OpenApiSpec]:
+        spec = cls.build_spec_dict(version, servers)
+        if spec is None:
+            return None
+        return OpenApiSpec.from_data(current_app.json.dumps(spec).encode("utf-8"))
+
+    @classmethod
+    def build_spec_dict(
+        cls, version: str, servers: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Builds the OpenAPI spec for all APIs that belong to a certain version
+
+        :param version: The API version
+        :param servers: The OpenAPI servers list
+        :return: The spec as a dict, or None if no API has this version
+        """
         version_found = False
-        api_spec = self._create_api_spec(version)
+        api_spec = cls._create_api_spec(version, servers)
         for base_api in current_app.appbuilder.baseviews:
             if isinstance(base_api, BaseApi) and base_api.version == version:
                 base_api.add_api_spec(api_spec)
                 version_found = True
         if version_found:
-            return self.response(200, **api_spec.to_dict())
-        else:
-            return self.response_404()
+            return api_spec.to_dict()
+        return None
 
     @staticmethod
-    def _create_api_spec(version):
-        servers = current_app.config.get(
+    def _get_servers() -> List[Dict[str, Any]]:
+        return current_app.config.get(
             "FAB_OPENAPI_SERVERS", [{"url": request.host_url}]
         )
+
+    @staticmethod
+    def _create_api_spec(
+        version: str, servers: Optional[List[Dict[str, Any]]] = None
+    ) -> APISpec:
+        if servers is None:
+            servers = OpenApi._get_servers()
         return APISpec(
             title=current_app.appbuilder.app_name,
             version=version,
@@ -3,9 +3,12 @@ from marshmallow import post_load, Schema
 from ..const import (
     API_ADD_COLUMNS_RIS_KEY,
     API_ADD_TITLE_RIS_KEY,
+    API_COUNT_MODE_RIS_KEY,
+    API_CURSOR_RIS_KEY,
     API_DESCRIPTION_COLUMNS_RIS_KEY,
     API_EDIT_COLUMNS_RIS_KEY,
     API_EDIT_TITLE_RIS_KEY,
+    API_EXPORT_FORMAT_RIS_KEY,
     API_FILTERS_RIS_KEY,
     API_LABEL_COLUMNS_RIS_KEY,
     API_LIST_COLUMNS_RIS_KEY,
@@ -21,6 +24,8 @@ from ..const import (
     API_SELECT_SEL_COLUMNS_RIS_KEY,
     API_SHOW_COLUMNS_RIS_KEY,
     API_SHOW_TITLE_RIS_KEY,
+    EXPORT_FORMATS,
+    QUERY_COUNT_MODES,
 )
 
 
@@ -76,6 +81,8 @@ get_list_schema = {
         API_ORDER_DIRECTION_RIS_KEY: {"type": "string", "enum": ["asc", "desc"]},
         API_PAGE_INDEX_RIS_KEY: {"type": "integer"},
         API_PAGE_SIZE_RIS_KEY: {"type": "integer"},
+        API_COUNT_MODE_RIS_KEY: {"type": "string", "enum": list(QUERY_COUNT_MODES)},
+        API_CURSOR_RIS_KEY: {"type": "string"},
         API_FILTERS_RIS_KEY: {
             "type": "array",
             "items": {
@@ -107,6 +114,17 @@ get_list_schema = {
     },
 }
 
+export_schema = {
+    "type": "object",
+    "properties": {
+        API_SELECT_COLUMNS_RIS_KEY: {"type": "array", "items": {"type": "string"}},
+        API_ORDER_COLUMN_RIS_KEY: {"type": "string"},
+        API_ORDER_DIRECTION_RIS_KEY: {"type": "string", "enum": ["asc", "desc"]},
+        API_EXPORT_FORMAT_RIS_KEY: {"type": "string", "enum": list(EXPORT_FORMATS)},
+        API_FILTERS_RIS_KEY: get_list_schema["properties"][API_FILTERS_RIS_KEY],
+    },
+}
+
 get_item_schema = {
     "type": "object",
     "properties": {
@@ -2,7 +2,20 @@ from __future__ import annotations
 
 from functools import reduce
 import logging
-from typing import Any, Callable, cast, Dict, List, Optional, Type, TYPE_CHECKING, Union
+import threading
+from typing import (
+    Any,
+    Callable,
+    cast,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TYPE_CHECKING,
+    Union,
+)
 
 from flask import Blueprint, current_app, Flask, url_for
 from flask_appbuilder import __version__
@@ -128,6 +141,9 @@ class AppBuilder:
         self.static_folder = static_folder
         self.static_url_path = static_url_path
         self.update_perms = update_perms
+        self.update_perms_bulk = False
+        self._permissions_synced = False
+        self._permissions_lock = threading.Lock()
 
         # Security Manager Class
         self.sm: BaseSecurityManager = None  # type: ignore
@@ -155,6 +171,7 @@ class AppBuilder:
         app.config.setdefault("ADDON_MANAGERS", [])
         app.config.setdefault("RATELIMIT_ENABLED", False)
         app.config.setdefault("FAB_API_MAX_PAGE_SIZE", 100)
+        app.config.setdefault("FAB_OPENAPI_CACHE_ENABLED", True)
         app.config.setdefault("FAB_BASE_TEMPLATE", self.base_template)
         app.config.setdefault("FAB_STATIC_FOLDER", self.static_folder)
         app.config.setdefault("FAB_STATIC_URL_PATH", self.static_url_path)
@@ -184,6 +201,7 @@ class AppBuilder:
 
         if self.update_perms:  # default is True, if False takes precedence from config
             self.update_perms = app.config.get("FAB_UPDATE_PERMS", True)
+        self.update_perms_bulk = app.config.get("FAB_UPDATE_PERMS_BULK", False)
         _security_manager_class_name = app.config.get(
             "FAB_SECURITY_MANAGER_CLASS", None
         )
@@ -208,6 +226,8 @@ class AppBuilder:
         self._add_admin_views()
         self._add_addon_views()
         self._add_menu_permissions()
+        if self.update_perms and self.update_perms_bulk:
+            app.before_request(self._add_permissions_on_first_request)
         log.info("Initializing AppBuilder done")
 
     def _init_extension(self, app: Flask) -> None:
@@ -558,7 +578,7 @@ class AppBuilder:
         """
         return self.add_view_no_menu(baseview)
 
-    def security_cleanup(self) -> None:
+    def security_cleanup(self, dry: bool = False) -> Dict[str, Any]:
         """
         This method is useful if you have changed
         the name of your menus or classes,
@@ -570,8 +590,11 @@ class AppBuilder:
         that is no longer part of any registered view or menu.
 
         Remember invoke ONLY AFTER YOU HAVE REGISTERED ALL VIEWS
+
+        :param dry: If True will not change DB, only report the affected rows
+        :return: Dict with the affected rows and the elapsed time
         """
-        self.sm.security_cleanup(self.baseviews, self.menu)
+        return self.sm.security_cleanup(self.baseviews, self.menu, dry=dry)
 
     def security_converge(self, dry: bool = False) -> Dict[str, Any]:
         """
@@ -637,15 +660,60 @@ class AppBuilder:
     def add_permissions(self, update_perms: bool = False) -> None:
         from flask_appbuilder.baseviews import AbstractViewApi
 
-        if self.update_perms or update_perms:
+        if (self.update_perms or update_perms) and self.update_perms_bulk:
+            # A failed sync is retried on the next request
+            self._permissions_synced = self.sm.sync_permissions(
+                *self._get_registered_permissions(), force=update_perms
+            )
+        elif self.update_perms or update_perms:
             for baseview in self.baseviews:
                 baseview = cast(AbstractViewApi, baseview)
                 self._add_permission(baseview, update_perms=update_perms)
             self._add_menu_permissions(update_perms=update_perms)
 
+    def _get_registered_permissions(self) -> Tuple[Dict[str, Set[str]], Set[str]]:
+        """
+        Returns the permissions of all registered views, by view name,
+        and the names of all menu items and categories
+        """
+        from flask_appbuilder.baseviews import AbstractViewApi
+
+        view_permissions: Dict[str, Set[str]] = {}
+        for baseview in self.baseviews:
+            baseview = cast(AbstractViewApi, baseview)
+            if not baseview.class_permission_name:
+                continue
+            view_permissions.setdefault(baseview.class_permission_name, set()).update(
+                baseview.base_permissions or []
+            )
+        menus: Set[str] = set()
+        if self.menu is not None:
+            for category in self.menu.get_list():
+                menus.add(category.name)
+                for item in category.childs:
+                    # don't add permission for menu separator
+                    if item.name != "-":
+                        menus.add(item.name)
+        return view_permissions, menus
+
+    def _add_permissions_on_first_request(self) -> None:
+        if self._permissions_synced:
+            return
+        with self._permissions_lock:
+            if not self._permissions_synced:
+                self.add_permissions()
+
+    def _is_permissions_sync_deferred(self, update_perms: bool) -> bool:
+        # Bulk sync adds all permissions at once, after views are registered
+        return (
+            self.update_perms_bulk and not update_perms and not self._permissions_synced
+        )
+
     def _add_permission(
         self, baseview: "AbstractViewApi", update_perms: bool = False
     ) -> None:
+        if self._is_permissions_sync_deferred(update_perms):
+            return
         if self.update_perms or update_perms:
             try:
                 self.sm.add_permissions_view(
@@ -656,6 +724,8 @@ class AppBuilder:
                 log.error(LOGMSG_ERR_FAB_ADD_PERMISSION_VIEW, e)
 
     def _add_permissions_menu(self, name: str, update_perms: bool = False) -> None:
+        if self._is_permissions_sync_deferred(update_perms):
+            return
         if self.update_perms or update_perms:
             try:
                 self.sm.add_permissions_menu(name)
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from inspect import isclass
 import json
@@ -8,11 +9,14 @@ from typing import List, Optional, TYPE_CHECKING
 from flask import (
     abort,
     Blueprint,
+    copy_current_request_context,
     current_app,
     flash,
+    g,
     render_template,
     request,
     session,
+    stream_with_context,
     url_for,
 )
 from flask_appbuilder._compat import as_unicode
@@ -32,6 +36,7 @@ from flask_appbuilder.urltools import (
 )
 from flask_appbuilder.widgets import FormWidget, ListWidget, SearchWidget, ShowWidget
 from flask_babel import lazy_gettext
+from sqlalchemy.orm import scoped_session
 
 if TYPE_CHECKING:
     from flask_appbuilder.base import AppBuilder
@@ -347,6 +352,24 @@ class BaseView(AbstractViewApi):
             template, **dict(list(kwargs.items()) + list(self.extra_args.items()))
         )
 
+    def stream_template(self, template, **kwargs):
+        """
+        Like `render_template`, but streams the rendered template
+        to the client as it renders.
+
+        :param template: The template relative path
+        :param kwargs: arguments to be passed to the template
+        """
+        kwargs["base_template"] = self.appbuilder.base_template
+        kwargs["appbuilder"] = self.appbuilder
+        kwargs["current_app"] = current_app
+        context = dict(list(kwargs.items()) + list(self.extra_args.items()))
+        current_app.update_template_context(context)
+        jinja_template = current_app.jinja_env.get_or_select_template(template)
+        return current_app.response_class(
+            stream_with_context(jinja_template.generate(context))
+        )
+
     def _prettify_name(self, name):
         """
         Prettify pythonic variable name.
@@ -698,6 +721,22 @@ class BaseCRUDView(BaseModelView):
     """
     _related_views = None
     """ internal list with ref to instantiated view classes """
+    related_views_max_workers = 0
+    """
+        Number of threads used to query the related views concurrently on show
+        and edit pages, each thread uses its own session. 0 queries them
+        sequentially. Only used with scoped sessions, like Flask-SQLAlchemy's::
+
+            class MyView(ModelView):
+                datamodel = SQLAInterface(Group)
+                related_views = [MyOtherRelatedView, MyThirdRelatedView]
+                related_views_max_workers = 2
+
+    """
+    _related_views_executor = None
+    """ internal thread pool to query the related views """
+    _list_row_accessor = None
+    """ internal function that gets the list columns values of a row """
     list_title = ""
     """ List Title, if not configured the default is 'List ' with pretty model name """
     show_title = ""
@@ -859,6 +898,13 @@ class BaseCRUDView(BaseModelView):
 
     list_template = "appbuilder/general/model/list.html"
     """ Your own add jinja2 template for list """
+    list_stream = False
+    """
+        If True the list page HTML is streamed to the client while the
+        template renders, so the first bytes leave before the whole page is
+        rendered. Errors raised while rendering can't change the response
+        status anymore
+    """
     edit_template = "appbuilder/general/model/edit.html"
     """ Your own add jinja2 template for edit """
     add_template = "appbuilder/general/model/add.html"
@@ -1002,15 +1048,12 @@ class BaseCRUDView(BaseModelView):
     -----------------------------------------------------
     """
 
-    def _get_related_view_widget(
-        self,
-        item,
-        related_view,
-        order_column="",
-        order_direction="",
-        page=None,
-        page_size=None,
-    ):
+    def _get_related_view_filters(self, item, related_view):
+        """
+        :return:
+            Returns the filters for the related view rows of item,
+            None if the relation is not found
+        """
         fk = related_view.datamodel.get_related_fk(self.datamodel.obj)
         filters = related_view.datamodel.get_filters()
         # Check if it's a many to one model relation
@@ -1034,6 +1077,20 @@ class BaseCRUDView(BaseModelView):
                 name = related_view.__class__.__name__
             log.error("Can't find relation on related view %s", name)
             return None
+        return filters
+
+    def _get_related_view_widget(
+        self,
+        item,
+        related_view,
+        order_column="",
+        order_direction="",
+        page=None,
+        page_size=None,
+    ):
+        filters = self._get_related_view_filters(item, related_view)
+        if filters is None:
+            return None
         return related_view._get_view_widget(
             filters=filters,
             order_column=order_column,
@@ -1042,6 +1099,55 @@ class BaseCRUDView(BaseModelView):
             page_size=page_size,
         )
 
+    def _is_related_views_concurrent(self) -> bool:
+        return (
+            self.related_views_max_workers > 0
+            and len(self._related_views) > 1
+            and all(
+                isinstance(view.datamodel.session, scoped_session)
+                for view in self._related_views
+            )
+        )
+
+    def _get_related_views_widgets_concurrent(self, item, related_views_args):
+        """
+        Queries each related view on a thread of the related views pool,
+        with a copy of the current request context, a new app context and
+        so a new scoped session
+        """
+        if self._related_views_executor is None:
+            self._related_views_executor = ThreadPoolExecutor(
+                max_workers=self.related_views_max_workers,
+                thread_name_prefix=f"{self.__class__.__name__}-related-views",
+            )
+        request_globals = dict(vars(g._get_current_object()))
+
+        def get_view_widget(view, filters, kwargs):
+            vars(g._get_current_object()).update(request_globals)
+            widget = view._get_view_widget(filters=filters, **kwargs)
+            # Read the values while the thread session is still open
+            template_args = getattr(widget, "template_args", None) or {}
+            value_columns = template_args.get("value_columns")
+            if value_columns is not None:
+                widget.template_args["value_columns"] = list(value_columns)
+            return widget
+
+        futures = []
+        for view, kwargs in related_views_args:
+            filters = self._get_related_view_filters(item, view)
+            if filters is None:
+                futures.append(None)
+                continue
+            futures.append(
+                self._related_views_executor.submit(
+                    copy_current_request_context(get_view_widget),
+                    view,
+                    filters,
+                    kwargs,
+                )
+            )
+        return [future.result() if future else None for future in futures]
+
     def _get_related_views_widgets(
         self, item, orders=None, pages=None, page_sizes=None, widgets=None, **args
     ):
@@ -1051,22 +1157,32 @@ class BaseCRUDView(BaseModelView):
             Model View widgets
         """
         widgets = widgets or {}
-        widgets["related_views"] = []
+        related_views_args = []
         for view in self._related_views:
             if orders.get(view.__class__.__name__):
                 order_column, order_direction = orders.get(view.__class__.__name__)
             else:
                 order_column, order_direction = "", ""
-            widgets["related_views"].append(
-                self._get_related_view_widget(
-                    item,
+            related_views_args.append(
+                (
                     view,
-                    order_column,
-                    order_direction,
-                    page=pages.get(view.__class__.__name__),
-                    page_size=page_sizes.get(view.__class__.__name__),
+                    dict(
+                        order_column=order_column,
+                        order_direction=order_direction,
+                        page=pages.get(view.__class__.__name__),
+                        page_size=page_sizes.get(view.__class__.__name__),
+                    ),
                 )
             )
+        if self._is_related_views_concurrent():
+            widgets["related_views"] = self._get_related_views_widgets_concurrent(
+                item, related_views_args
+            )
+            return widgets
+        widgets["related_views"] = [
+            self._get_related_view_widget(item, view, **kwargs)
+            for view, kwargs in related_views_args
+        ]
         return widgets
 
     def _get_view_widget(self, **kwargs):
@@ -1076,6 +1192,16 @@ class BaseCRUDView(BaseModelView):
         """
         return self._get_list_widget(**kwargs).get("list")
 
+    def _get_list_row_accessor(self):
+        """
+        :return:
+            Returns the function that gets the list columns values of a row,
+            built once from list_columns
+        """
+        if self._list_row_accessor is None:
+            self._list_row_accessor = self.datamodel.get_row_accessor(self.list_columns)
+        return self._list_row_accessor
+
     def _get_list_widget(
         self,
         filters,
@@ -1109,7 +1235,7 @@ class BaseCRUDView(BaseModelView):
         widgets["list"] = self.list_widget(
             label_columns=self.label_columns,
             include_columns=self.list_columns,
-            value_columns=self.datamodel.get_values(lst, self.list_columns),
+            value_columns=map(self._get_list_row_accessor(), lst),
             order_columns=self.order_columns,
             formatters_columns=self.formatters_columns,
             page=page,
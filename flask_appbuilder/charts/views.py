@@ -167,16 +167,14 @@ class GroupByChartView(BaseChartView):
         if not self.datamodel.get_order_columns_list([order_column]):
             order_column = ""
             order_direction = ""
-        count, lst = self.datamodel.query(
-            filters=joined_filters,
-            order_column=order_column,
-            order_direction=order_direction,
-        )
         if not definition:
             definition = self.definitions[0]
         group = self.get_group_by_class(definition)
         value_columns = group.to_json(
-            group.apply(lst, sort=order_column == ""), self.label_columns
+            self._get_group_by_data(
+                group, joined_filters, order_column, order_direction
+            ),
+            self.label_columns,
         )
         widgets["chart"] = self.chart_widget(
             route_base=self.route_base,
@@ -190,6 +188,34 @@ class GroupByChartView(BaseChartView):
         )
         return widgets
 
+    def _get_group_by_data(self, group, filters, order_column, order_direction):
+        """
+        Groups and aggregates on the database when the datamodel supports it
+        and the order is the group order, falls back to fetching all items
+        and processing them in Python
+        """
+        is_group_by = isinstance(group, GroupByProcessData)
+        if (
+            is_group_by
+            and order_column in ("", *group.group_bys_cols[:1])
+            and self.datamodel.is_aggregate_supported(
+                group.group_bys_cols, group.aggr_by_cols
+            )
+        ):
+            rows = self.datamodel.query_aggregate(
+                group.group_bys_cols,
+                group.aggr_by_cols,
+                filters=filters,
+                order_direction=order_direction or "asc",
+            )
+            return group.apply_aggregated(rows)
+        count, lst = self.datamodel.query(
+            filters=filters,
+            order_column=order_column,
+            order_direction=order_direction,
+        )
+        return group.apply(lst, sort=order_column == "")
+
     @expose("/chart/<group_by>")
     @expose("/chart/")
     @has_access
@@ -3,7 +3,7 @@ from __future__ import annotations
 from io import BytesIO
 import os
 import shutil
-from typing import Any, Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
 from urllib.request import urlopen
 from zipfile import ZipFile
 
@@ -35,6 +35,19 @@ def echo_header(title: str) -> None:
     click.echo(click.style("-" * len(title), fg="green"))
 
 
+def echo_security_report(report: Dict[str, Any]) -> None:
+    click.echo(click.style("Affected rows:", fg="green"))
+    click.echo(f"Permissions on views added: {report.get('add_pvm', 0)}")
+    click.echo(f"Permissions on views added to roles: {report.get('add_role_pvm', 0)}")
+    click.echo(
+        f"Permissions on views removed from roles: {report.get('del_role_pvm', 0)}"
+    )
+    click.echo(f"Permissions on views removed: {report.get('del_pvm', 0)}")
+    click.echo(f"Views removed: {report.get('del_views', 0)}")
+    click.echo(f"Permissions removed: {report.get('del_perms', 0)}")
+    click.echo(f"Elapsed: {report.get('elapsed', 0):.3f}s")
+
+
 def cast_int_like_to_int(cli_arg: Any) -> Union[None, str, int]:
     """Cast int-like objects to int if possible
 
@@ -195,6 +208,35 @@ def import_roles(path: str) -> None:
     current_app.appbuilder.sm.import_roles(path)
 
 
+@fab.command("export-openapi")
+@with_appcontext
+@click.option("--version", "-v", "api_version", default="v1", help="The API version")
+@click.option(
+    "--path",
+    "-p",
+    help="Specify filepath to export the spec to, defaults to "
+    "FAB_OPENAPI_SPEC_FOLDER/openapi_<version>.json if configured",
+)
+@click.option("--server", "-s", "servers", multiple=True, help="OpenAPI server URL")
+def export_openapi(
+    api_version: str = "v1", path: Optional[str] = None, servers: Tuple[str, ...] = ()
+) -> None:
+    """Exports the OpenAPI spec of an API version to a JSON file"""
+    from flask_appbuilder.api.manager import get_openapi_spec_file, OpenApi
+
+    openapi_servers = [{"url": server} for server in servers] or (
+        current_app.config.get("FAB_OPENAPI_SERVERS", [{"url": "/"}])
+    )
+    spec = OpenApi.build_spec_dict(api_version, openapi_servers)
+    if spec is None:
+        click.echo(click.style(f"No APIs found for version {api_version}", fg="red"))
+        return
+    path = path or get_openapi_spec_file(api_version) or f"openapi_{api_version}.json"
+    with open(path, "w") as fd:
+        fd.write(current_app.json.dumps(spec))
+    click.echo(click.style(f"Exported OpenAPI spec to {path}", fg="green"))
+
+
 @fab.command("version")
 @with_appcontext
 def version() -> None:
@@ -211,13 +253,20 @@ def version() -> None:
 
 
 @fab.command("security-cleanup")
+@click.option(
+    "--dry-run", "-d", is_flag=True, help="Dry run & print the affected rows."
+)
 @with_appcontext
-def security_cleanup() -> None:
+def security_cleanup(dry_run: bool = False) -> None:
     """
     Cleanup unused permissions from views and roles.
     """
-    current_app.appbuilder.security_cleanup()
-    click.echo(click.style("Finished security cleanup", fg="green"))
+    report = current_app.appbuilder.security_cleanup(dry=dry_run)
+    if dry_run:
+        click.echo(click.style("Computed security cleanup:", fg="green"))
+        echo_security_report(report)
+    else:
+        click.echo(click.style("Finished security cleanup", fg="green"))
 
 
 @fab.command("security-converge")
@@ -244,6 +293,11 @@ def security_converge(dry_run: bool = False) -> None:
         click.echo(click.style("Remove permissions:", fg="green"))
         for perms in state_transitions["del_perms"]:
             click.echo(perms)
+        if state_transitions:
+            appbuilder = current_app.appbuilder
+            echo_security_report(
+                appbuilder.sm.apply_security_converge(state_transitions, dry=True)
+            )
     else:
         click.echo(click.style("Finished security converge", fg="green"))
 
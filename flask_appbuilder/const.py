@@ -36,6 +36,12 @@ LOGMSG_ERR_SEC_ADD_PERMVIEW = "Creation of Permission View Error: %s"
 """ Error adding permission view, format with err message """
 LOGMSG_ERR_SEC_DEL_PERMVIEW = "Remove Permission from View Error: %s"
 """ Error deleting permission view, format with err message """
+LOGMSG_ERR_SEC_SYNC_PERMS = "Bulk sync of permissions Error: %s"
+""" Error on bulk permissions sync, format with err message """
+LOGMSG_ERR_SEC_CONVERGE = "Security converge Error: %s"
+""" Error on security converge, format with err message """
+LOGMSG_ERR_SEC_CLEANUP = "Security cleanup Error: %s"
+""" Error on security cleanup, format with err message """
 LOGMSG_WAR_SEC_DEL_PERMVIEW = (
     "Refused to delete permission view, assoc with role exists %s.%s %s"
 )
@@ -71,6 +77,16 @@ LOGMSG_INF_SEC_ADD_PERMVIEW = "Created Permission View: %s"
 """ Info when adding permission view, format with permission view class string """
 LOGMSG_INF_SEC_DEL_PERMVIEW = "Removed Permission View: %s on %s"
 """ Info when deleting permission view, format with permission name and view name """
+LOGMSG_INF_SEC_SYNC_PERMS = (
+    "Synced permissions, added %s permission views, removed %s, granted %s to admin"
+)
+""" Info when permissions are synced in bulk, format with the changed row counts """
+LOGMSG_INF_SEC_SYNC_PERMS_SKIP = "Permissions fingerprint unchanged, skipping sync"
+""" Info when the permissions sync is skipped by the fingerprint """
+LOGMSG_INF_SEC_CONVERGE = "Security converge affected rows: %s"
+""" Info when security converge is applied, format with the report dict """
+LOGMSG_INF_SEC_CLEANUP = "Security cleanup affected rows: %s"
+""" Info when security cleanup is applied, format with the report dict """
 LOGMSG_INF_SEC_ADD_PERMROLE = "Added Permission %s to role %s"
 """ Info when adding permission to role,
 format with permission view class string and role name """
@@ -149,6 +165,23 @@ AUTH_OAUTH = 4
 AUTH_SAML = 5
 """ Constants for supported authentication types """
 
+QUERY_COUNT_MODE_EXACT = "exact"
+QUERY_COUNT_MODE_WINDOW = "window"
+QUERY_COUNT_MODE_ESTIMATED = "estimated"
+QUERY_COUNT_MODE_NONE = "none"
+QUERY_COUNT_MODES = (
+    QUERY_COUNT_MODE_EXACT,
+    QUERY_COUNT_MODE_WINDOW,
+    QUERY_COUNT_MODE_ESTIMATED,
+    QUERY_COUNT_MODE_NONE,
+)
+""" Constants for the supported list query count modes """
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMATS = (EXPORT_FORMAT_CSV, EXPORT_FORMAT_NDJSON)
+""" Constants for the supported export formats """
+
 # -----------------------------------
 #  REST API Constants
 # -----------------------------------
@@ -174,6 +207,7 @@ API_DESCRIPTION_COLUMNS_RES_KEY = "description_columns"
 API_RESULT_RES_KEY = "result"
 API_FILTERS_RES_KEY = "filters"
 API_PERMISSIONS_RES_KEY = "permissions"
+API_NEXT_CURSOR_RES_KEY = "next_cursor"
 
 API_LIST_TITLE_RES_KEY = "list_title"
 API_ADD_TITLE_RES_KEY = "add_title"
@@ -199,6 +233,9 @@ API_ORDER_COLUMN_RIS_KEY = "order_column"
 API_ORDER_DIRECTION_RIS_KEY = "order_direction"
 API_PAGE_INDEX_RIS_KEY = "page"
 API_PAGE_SIZE_RIS_KEY = "page_size"
+API_COUNT_MODE_RIS_KEY = "count_mode"
+API_CURSOR_RIS_KEY = "cursor"
+API_EXPORT_FORMAT_RIS_KEY = "format"
 
 API_LIST_TITLE_RIS_KEY = "list_title"
 API_ADD_TITLE_RIS_KEY = "add_title"
@@ -44,6 +44,12 @@ class InvalidColumnArgsFABException(FABException):
     ...
 
 
+class InvalidCursorFABException(FABException):
+    """Invalid keyset pagination cursor"""
+
+    ...
+
+
 class InterfaceQueryWithoutSession(FABException):
     """You need to setup a session on the interface to perform queries"""
 
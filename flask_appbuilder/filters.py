@@ -1,3 +1,5 @@
+from typing import Dict, List, Optional, Tuple
+
 from flask import current_app, request, url_for
 
 from .const import PERMISSION_PREFIX
@@ -24,19 +26,25 @@ class TemplateFilters(object):
 
     @app_template_filter("get_actions_on_list")
     def get_actions_on_list(self, actions, modelview_name):
+        visible = self.get_items_visible(
+            [action.name for action in actions.values()], modelview_name
+        )
         res_actions = dict()
         for action_key in actions:
             action = actions[action_key]
-            if self.is_item_visible(action.name, modelview_name) and action.multiple:
+            if visible[action.name] and action.multiple:
                 res_actions[action_key] = action
         return res_actions
 
     @app_template_filter("get_actions_on_show")
     def get_actions_on_show(self, actions, modelview_name):
+        visible = self.get_items_visible(
+            [action.name for action in actions.values()], modelview_name
+        )
         res_actions = dict()
         for action_key in actions:
             action = actions[action_key]
-            if self.is_item_visible(action.name, modelview_name) and action.single:
+            if visible[action.name] and action.single:
                 res_actions[action_key] = action
         return res_actions
 
@@ -151,6 +159,40 @@ class TemplateFilters(object):
          - 'can_' + <METHOD_NAME>: On normal routes
          - <METHOD_NAME>: when it's an action
 
+        """
+        item_permission = self._get_item_permission(permission, item)
+        if item_permission is None:
+            return False
+        return self.security_manager.has_access(*item_permission)
+
+    @app_template_filter("get_items_visible")
+    def get_items_visible(self, permissions: List[str], item: str) -> Dict[str, bool]:
+        """
+        Same as `is_item_visible` for a list of permissions,
+        checked with one single lookup on the user's permissions
+
+        :return: A dict of permission to a boolean
+        """
+        item_permissions = {
+            permission: self._get_item_permission(permission, item)
+            for permission in permissions
+        }
+        access = self.security_manager.has_access_batch(
+            item_permission
+            for item_permission in item_permissions.values()
+            if item_permission is not None
+        )
+        return {
+            permission: item_permission is not None and access[item_permission]
+            for permission, item_permission in item_permissions.items()
+        }
+
+    def _get_item_permission(
+        self, permission: str, item: str
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Returns the (permission name, view name) to check for an item
+        or None if the view does not allow it
         """
         _view = self.find_views_by_name(item)
         item = _view.class_permission_name
@@ -161,11 +203,11 @@ class TemplateFilters(object):
             if hasattr(_view, "actions") and _view.actions.get(permission):
                 permission_name = _view.get_action_permission_name(permission)
                 if permission_name not in _view.base_permissions:
-                    return False
-                return self.security_manager.has_access(permission_name, item)
+                    return None
+                return permission_name, item
             else:
                 method = permission
         permission_name = PERMISSION_PREFIX + _view.get_method_permission(method)
         if permission_name not in _view.base_permissions:
-            return False
-        return self.security_manager.has_access(permission_name, item)
+            return None
+        return permission_name, item
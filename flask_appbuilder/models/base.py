@@ -1,9 +1,13 @@
 import datetime
 from functools import reduce
+from inspect import isfunction
 import logging
-from typing import Any, Type
+from operator import attrgetter, methodcaller
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type
 
-from flask_appbuilder.models.filters import BaseFilterConverter, Filters
+from flask_appbuilder.models.filters import BaseFilter, BaseFilterConverter, Filters
+from flask_appbuilder.utils.cache import TTLCache
 
 try:
     import enum
@@ -15,6 +19,20 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 
+def _date_to_json(value: Any) -> Any:
+    if value is None:
+        return value
+    return value.isoformat()
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return value
+
+
 class BaseInterface:
     """
     Base class for all data model interfaces.
@@ -24,8 +42,21 @@ class BaseInterface:
     filter_converter_class = Type[BaseFilterConverter]
     """ when sub classing override with your own custom filter converter """
 
+    accessors_cache_maxsize = 128
+    """
+    Maximum number of compiled column accessors, by columns
+    """
+
     def __init__(self, obj: Type[Any]):
         self.obj = obj
+        self._accessors = TTLCache(maxsize=self.accessors_cache_maxsize)
+        self._pk_getter: Optional[Callable[[Any], Any]] = None
+        self._column_filters: Dict[
+            Type[BaseFilterConverter], Dict[str, Tuple[BaseFilter, ...]]
+        ] = {}
+        self._filters_registry: Dict[
+            Type[BaseFilterConverter], Mapping[str, Tuple[BaseFilter, ...]]
+        ] = {}
 
     # def __getattr__(self, name: str) -> Any:
     #     """
@@ -69,6 +100,165 @@ class BaseInterface:
                 return value.value
             return value
 
+    def _is_scalar_column(self, col: str) -> bool:
+        return not self.is_enum(col) and (
+            self.is_string(col)
+            or self.is_text(col)
+            or self.is_integer(col)
+            or self.is_numeric(col)
+            or self.is_float(col)
+            or self.is_boolean(col)
+        )
+
+    def _get_attr_getter(self, col: str) -> Callable[[Any], Any]:
+        """
+        Compiles the lookup `_get_attr_value` does for col, from the model class
+        instead of each item, into a getter for items of this model
+        """
+        if self._is_scalar_column(col):
+            return attrgetter(col)
+        if not hasattr(self.obj, col):
+            if "." not in col:
+                # maybe an instance attribute, keep the item based lookup
+                return lambda item: self._get_attr_value(item, col)
+            # it's an inner obj attr
+            get_inner_value = attrgetter(col)
+
+            def get_inner_attr_value(item: Any) -> Any:
+                try:
+                    return get_inner_value(item)
+                except Exception:
+                    return ""
+
+            return get_inner_attr_value
+        if isfunction(getattr(self.obj, col)):
+            # its a method
+            return methodcaller(col)
+        get_value = attrgetter(col)
+
+        def get_attr_value(item: Any) -> Any:
+            try:
+                value = get_value(item)
+            except AttributeError:
+                return ""
+            if callable(value):
+                return value()
+            # if value is an Enum instance than list and show widgets should display
+            # its .value rather than its .name:
+            if _has_enum and isinstance(value, enum.Enum):
+                return value.value
+            return value
+
+        return get_attr_value
+
+    def _get_json_serializer(self, col: str) -> Optional[Callable[[Any], Any]]:
+        """
+        :return: The function that converts values of col to JSON types,
+            None if they need no conversion
+        """
+        if self._is_scalar_column(col):
+            return None
+        if self.is_date(col) or self.is_datetime(col):
+            return _date_to_json
+        return _to_json
+
+    def _get_accessors(
+        self, columns: List[str], json: bool = False
+    ) -> Tuple[Tuple[str, Callable[[Any], Any], Optional[Callable[[Any], Any]]], ...]:
+        """
+        Compiles, once for each list of columns, a tuple with the column name,
+        the getter and the JSON serializer of each column
+        """
+        key = (tuple(columns), json)
+        accessors = self._accessors.get(key)
+        if accessors is None:
+            accessors = tuple(
+                (
+                    col,
+                    self._get_attr_getter(col),
+                    self._get_json_serializer(col) if json else None,
+                )
+                for col in columns
+            )
+            self._accessors.set(key, accessors)
+        return accessors
+
+    def get_row_accessor(self, columns: List[str]) -> Callable[[Any], Dict[str, Any]]:
+        """
+        Returns a function that gets the values of columns from an item,
+        formatted like `get_values`. The lookup of each column is resolved
+        once, so use it for many items.
+
+        :param columns: The list of columns to include
+        """
+        getters = tuple(
+            (col, getter) for col, getter, _ in self._get_accessors(columns)
+        )
+
+        def get_row(item: Any) -> Dict[str, Any]:
+            return {col: getter(item) for col, getter in getters}
+
+        return get_row
+
+    def get_json_row_accessor(
+        self, columns: List[str]
+    ) -> Callable[[Any], Dict[str, Any]]:
+        """
+        Like `get_row_accessor`, with the values converted
+        to JSON types like `get_values_json`
+
+        :param columns: The list of columns to include
+        """
+        accessors = self._get_accessors(columns, json=True)
+
+        def get_row(item: Any) -> Dict[str, Any]:
+            row = {}
+            for col, getter, serializer in accessors:
+                value = getter(item)
+                row[col] = serializer(value) if serializer else value
+            return row
+
+        return get_row
+
+    def get_column_filters(
+        self, filter_converter: Type[BaseFilterConverter], col_name: str
+    ) -> Tuple[BaseFilter, ...]:
+        """
+        Returns the possible filters for a column. Columns are converted
+        once per filter converter, the filter instances are shared by
+        all Filters of this interface
+
+        :param filter_converter: A BaseFilterConverter class
+        :param col_name: The column name
+        :return: A tuple of BaseFilter instances, empty if not supported
+        """
+        column_filters = self._column_filters.setdefault(filter_converter, {})
+        filters = column_filters.get(col_name)
+        if filters is None:
+            filters = tuple(filter_converter(self).convert(col_name) or ())
+            column_filters[col_name] = filters
+        return filters
+
+    def get_filters_registry(
+        self, filter_converter: Type[BaseFilterConverter]
+    ) -> Mapping[str, Tuple[BaseFilter, ...]]:
+        """
+        Returns an immutable mapping of all the model columns to their
+        possible filters, computed once per filter converter
+
+        :param filter_converter: A BaseFilterConverter class
+        """
+        registry = self._filters_registry.get(filter_converter)
+        if registry is None:
+            column_filters = {}
+            for col_name in self.get_columns_list():
+                filters = self.get_column_filters(filter_converter, col_name)
+                if filters:
+                    column_filters[col_name] = filters
+            registry = MappingProxyType(column_filters)
+            self._filters_registry[filter_converter] = registry
+        return registry
+
     def get_filters(self, search_columns=None, search_filters=None):
         search_columns = search_columns or []
         return Filters(
@@ -79,7 +269,7 @@ class BaseInterface:
         )
 
     def get_values_item(self, item, show_columns):
-        return [self._get_attr_value(item, col) for col in show_columns]
+        return [getter(item) for _, getter, _ in self._get_accessors(show_columns)]
 
     def _get_values(self, lst, list_columns):
         """
@@ -91,13 +281,7 @@ class BaseInterface:
         :param list_columns:
             The list of columns to include
         """
-        retlst = []
-        for item in lst:
-            retdict = {}
-            for col in list_columns:
-                retdict[col] = self._get_attr_value(item, col)
-            retlst.append(retdict)
-        return retlst
+        return list(map(self.get_row_accessor(list_columns), lst))
 
     def get_values(self, lst, list_columns):
         """
@@ -109,28 +293,13 @@ class BaseInterface:
         :param list_columns:
             The list of columns to include
         """
-        for item in lst:
-            retdict = {}
-            for col in list_columns:
-                retdict[col] = self._get_attr_value(item, col)
-            yield retdict
+        return map(self.get_row_accessor(list_columns), lst)
 
     def get_values_json(self, lst, list_columns):
         """
         Converts list of objects from query to JSON
         """
-        result = []
-        for item in self.get_values(lst, list_columns):
-            for key, value in list(item.items()):
-                if isinstance(value, datetime.datetime) or isinstance(
-                    value, datetime.date
-                ):
-                    value = value.isoformat()
-                    item[key] = value
-                if isinstance(value, list):
-                    item[key] = [str(v) for v in value]
-            result.append(item)
-        return result
+        return list(map(self.get_json_row_accessor(list_columns), lst))
 
     """
         Returns the models class name
@@ -155,6 +324,24 @@ class BaseInterface:
     ):
         pass
 
+    def is_aggregate_supported(self, group_by_cols, aggr_by_cols):
+        """
+        Returns True if the datamodel can group and aggregate on the backend,
+        otherwise all items are fetched and processed in Python
+        """
+        return False
+
+    def is_keyset_supported(self, col_name):
+        """
+        Returns True if col_name can order keyset (cursor) pagination
+        """
+        return False
+
+    def query_aggregate(
+        self, group_by_cols, aggr_by_cols, filters=None, order_direction="asc"
+    ):
+        pass
+
     def is_image(self, col_name):
         return False
 
@@ -270,11 +457,17 @@ class BaseInterface:
         """
         return a list of pk values from object list
         """
-        pk_name = self.get_pk_name()
-        if self.is_pk_composite():
-            return [[getattr(item, pk) for pk in pk_name] for item in lst]
-        else:
-            return [getattr(item, pk_name) for item in lst]
+        return list(map(self._get_pk_getter(), lst))
+
+    def _get_pk_getter(self) -> Callable[[Any], Any]:
+        if self._pk_getter is None:
+            pk_name = self.get_pk_name()
+            if self.is_pk_composite():
+                get_pks = attrgetter(*pk_name)
+                self._pk_getter = lambda item: list(get_pks(item))
+            else:
+                self._pk_getter = attrgetter(pk_name)
+        return self._pk_getter
 
     def get_pk_name(self):
         """
@@ -283,11 +476,7 @@ class BaseInterface:
         raise NotImplementedError
 
     def get_pk_value(self, item):
-        pk_name = self.get_pk_name()
-        if self.is_pk_composite():
-            return [getattr(item, pk) for pk in pk_name]
-        else:
-            return getattr(item, pk_name)
+        return self._get_pk_getter()(item)
 
     def get(self, pk, filter=None):
         """
@@ -296,6 +485,15 @@ class BaseInterface:
         """
         pass
 
+    def get_many(self, pks, filters=None):
+        """
+        return the records from a list of keys, in the same order, you can
+        optionally pass filters. Keys that do not exist or are excluded
+        by the filters are left out.
+        """
+        items = (self.get(pk, filters) for pk in pks)
+        return [item for item in items if item is not None]
+
     def get_related_model(self, prop):
         raise NotImplementedError
 
@@ -1,6 +1,6 @@
 import copy
 import logging
-from typing import Any, Dict, List, Optional, Tuple, Type
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Type
 
 from .._compat import as_unicode
 from ..exceptions import (
@@ -124,7 +124,8 @@ class Filters:
     """ list of values to apply to filters """
     _search_filters: Dict[str, List[BaseFilter]] = {}
     """ dict like {'col_name':[BaseFilter1, BaseFilter2, ...], ... } """
-    _all_filters: Dict[str, List[BaseFilter]] = {}
+    _all_filters: Mapping[str, Tuple[BaseFilter, ...]] = {}
+    """ shared registry of all the datamodel's columns and possible filters """
 
     def __init__(
         self,
@@ -147,7 +148,7 @@ class Filters:
         self.clear_filters()
         if self.search_columns:
             self._search_filters = self._get_filters(self.search_columns)
-        self._all_filters = self._get_filters(datamodel.get_columns_list())
+        self._all_filters = datamodel.get_filters_registry(filter_converter)
 
         if search_filters:
             for k, v in search_filters.items():
@@ -159,9 +160,9 @@ class Filters:
     def _get_filters(self, cols: List[str]):
         filters = {}
         for col in cols:
-            _filters = self.filter_converter(self.datamodel).convert(col)
+            _filters = self.datamodel.get_column_filters(self.filter_converter, col)
             if _filters:
-                filters[col] = _filters
+                filters[col] = list(_filters)
         return filters
 
     def clear_filters(self):
@@ -240,11 +241,23 @@ class Filters:
             self._add_filter(filter_class(column_name, self.datamodel), value)
         return self
 
+    def empty_copy(self) -> "Filters":
+        """
+        Returns a new filters class without active filters. The columns
+        allowed filters are shared and not computed again, so this is cheap
+        enough to be called on each request
+
+        :return: A new Filters
+        """
+        ret_filters = copy.copy(self)
+        ret_filters.clear_filters()
+        return ret_filters
+
     def get_joined_filters(self, filters) -> "Filters":
         """
         Creates a new filters class with active filters joined
         """
-        ret_filters = Filters(self.filter_converter, self.datamodel)
+        ret_filters = self.empty_copy()
         ret_filters.filters = self.filters + filters.filters
         ret_filters.values = self.values + filters.values
         return ret_filters
@@ -255,7 +268,7 @@ class Filters:
 
         :return: A copy of self
         """
-        retfilters = Filters(self.filter_converter, self.datamodel)
+        retfilters = self.empty_copy()
         retfilters.filters = copy.copy(self.filters)
         retfilters.values = copy.copy(self.values)
         return retfilters
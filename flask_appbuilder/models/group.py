@@ -14,22 +14,26 @@ from .. import const as c
 log = logging.getLogger(__name__)
 
 
-def aggregate(label=""):
+def aggregate(label="", sql_func=""):
     """
     Use this decorator to set a label for your aggregation functions on charts.
 
     :param label:
         The label to complement with the column
+    :param sql_func:
+        Optional name of the equivalent SQL aggregate function (count, sum, avg),
+        allows the datamodel to aggregate on the database
     """
 
     def wrap(f):
         f._label = label
+        f._sql_func = sql_func
         return f
 
     return wrap
 
 
-@aggregate(_("Count of"))
+@aggregate(_("Count of"), sql_func="count")
 def aggregate_count(items, col):
     """
     Function to use on Group by Charts.
@@ -38,7 +42,7 @@ def aggregate_count(items, col):
     return len(list(items))
 
 
-@aggregate(_("Sum of"))
+@aggregate(_("Sum of"), sql_func="sum")
 def aggregate_sum(items, col):
     """
     Function to use on Group by Charts.
@@ -47,7 +51,7 @@ def aggregate_sum(items, col):
     return sum(getattr(item, col) for item in items)
 
 
-@aggregate(_("Avg. of"))
+@aggregate(_("Avg. of"), sql_func="avg")
 def aggregate_avg(items, col):
     """
     Function to use on Group by Charts.
@@ -349,3 +353,20 @@ class GroupByProcessData(BaseProcessData):
                 result_item.append(aggr_by_col[0](items, aggr_by_col[1]))
             result.append(result_item)
         return result
+
+    def apply_aggregated(self, rows):
+        """
+        Formats rows already grouped and aggregated by the datamodel.
+
+        :rows: A list of rows with the group columns followed by the aggregations
+        :return: A List of lists with group column and aggregation
+        """
+        group_count = len(self.group_bys_cols)
+        result = []
+        for row in rows:
+            if group_count == 1:
+                grouped = row[0]
+            else:
+                grouped = tuple(row[:group_count])
+            result.append([self.format_columns(grouped)] + list(row[group_count:]))
+        return result
@@ -1,15 +1,37 @@
 from __future__ import annotations
 
-from contextlib import suppress
+import datetime
+import decimal
 import logging
-from typing import Any, Iterable, Optional, Tuple, Type
+import operator
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
 
 from flask import current_app, Request
+from flask_appbuilder.const import (
+    QUERY_COUNT_MODE_ESTIMATED,
+    QUERY_COUNT_MODE_EXACT,
+    QUERY_COUNT_MODE_NONE,
+    QUERY_COUNT_MODE_WINDOW,
+)
 from flask_appbuilder.exceptions import DatabaseException, FABException
 from flask_appbuilder.filemanager import FileManager, ImageManager
 from flask_appbuilder.models.base import BaseInterface
 from flask_appbuilder.models.filters import Filters
-from flask_appbuilder.models.group import GroupByCol, GroupByDateMonth, GroupByDateYear
+from flask_appbuilder.models.group import (
+    BaseGroupBy,
+    GroupByCol,
+    GroupByDateMonth,
+    GroupByDateYear,
+)
 from flask_appbuilder.models.mixins import FileColumn, ImageColumn
 from flask_appbuilder.models.sqla import filters, Model
 from flask_appbuilder.utils.base import (
@@ -17,7 +39,8 @@ from flask_appbuilder.utils.base import (
     get_column_root_relation,
     is_column_dotted,
 )
-from sqlalchemy import asc, desc
+from sqlalchemy import and_, asc, cast, desc, extract, func, or_
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy import types as sa_types
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import aliased, class_mapper, ColumnProperty, contains_eager, Load
@@ -26,7 +49,7 @@ from sqlalchemy.orm.properties import RelationshipProperty
 from sqlalchemy.orm.query import Query
 from sqlalchemy.orm.session import Session as SessionBase
 from sqlalchemy.orm.util import AliasedClass
-from sqlalchemy.sql import ColumnElement, visitors
+from sqlalchemy.sql import ColumnElement
 from sqlalchemy.sql.elements import BinaryExpression
 from sqlalchemy.sql.schema import Column
 from sqlalchemy.sql.sqltypes import TypeEngine
@@ -43,6 +66,17 @@ def _is_sqla_type(model: Model, sa_type: Type[TypeEngine]) -> bool:
     )
 
 
+class RelationInfo(NamedTuple):
+    """
+    Immutable metadata of a model relationship, collected once per interface
+    """
+
+    direction: str
+    uselist: bool
+    related_model: Type[Model]
+    local_columns: Tuple[Column, ...]
+
+
 class SQLAInterface(BaseInterface):
     """
     SQLAModel
@@ -50,6 +84,10 @@ class SQLAInterface(BaseInterface):
     """
 
     filter_converter_class = filters.SQLAFilterConverter
+    get_many_chunk_size = 500
+    """
+    Maximum number of bound parameters on each IN query of `get_many`
+    """
 
     def __init__(self, obj: Type[Model], session: Optional[SessionBase] = None) -> None:
         _include_filters(self)
@@ -63,8 +101,30 @@ class SQLAInterface(BaseInterface):
         for col_name in obj.__mapper__.columns.keys():
             if col_name in self.list_properties:
                 self.list_columns[col_name] = obj.__mapper__.columns[col_name]
+        # Relations and primary key metadata, so that hot paths
+        # don't inspect the mapper on every request
+        self._relations: dict[str, RelationInfo] = {
+            key: RelationInfo(
+                prop.direction.name,
+                prop.uselist,
+                prop.mapper.class_,
+                tuple(prop.local_columns),
+            )
+            for key, prop in self.list_properties.items()
+            if isinstance(prop, RelationshipProperty)
+        }
+        self._pk_names = tuple(pk.name for pk in obj.__mapper__.primary_key)
+        self._attrs: dict[str, Any] = {}
         super().__init__(obj)
 
+    def _get_attr(self, col_name: str) -> Any:
+        attr = self._attrs.get(col_name)
+        if attr is None:
+            attr = super()._get_attr(col_name)
+            if attr is not None:
+                self._attrs[col_name] = attr
+        return attr
+
     @property
     def session(self) -> SessionBase:
         """
@@ -84,37 +144,24 @@ class SQLAInterface(BaseInterface):
 
     @staticmethod
     def is_model_already_joined(query: Query, model: Type[Model]) -> bool:
+        """
+        Checks if a model is the query entity or was already joined. Uses the
+        query join setup, so the SQL statement is not built or walked
+        """
         if hasattr(query, "_join_entities"):  # For SQLAlchemy < 1.3
             return model in [mapper.class_ for mapper in query._join_entities]
-        # Solution for SQLAlchemy >= 1.4
         model_table_name = model.__table__.fullname
-        for visitor in visitors.iterate(query.statement):
-            # Checking for `.join(Parent.child)` clauses
-            if visitor.__visit_name__ == "alias":
-                _visitor = visitor.element
-            else:
-                _visitor = visitor
-            if _visitor.__visit_name__ == "select":
-                continue
-            if _visitor.__visit_name__ == "binary":
-                for vis in visitors.iterate(_visitor):
-                    # Visitor might not have table attribute
-                    with suppress(AttributeError):
-                        # Verify if already present based on table name
-                        if model_table_name == vis.table.fullname:
-                            return True
-            # Checking for `.join(Child)` clauses
-            if _visitor.__visit_name__ == "table":
-                # Visitor might be of ColumnCollection or so,
-                # which cannot be compared to model
-                if model_table_name == _visitor.fullname:
-                    return True
-            # Checking for `Model.column` clauses
-            if _visitor.__visit_name__ == "column":
-                with suppress(AttributeError):
-                    if model_table_name == _visitor.table.fullname:
-                        return True
-        return False
+        setup_joins = getattr(query, "_setup_joins", ()) + getattr(
+            query, "_legacy_setup_joins", ()
+        )
+        for setup_join in setup_joins:
+            if _get_join_target_table_name(setup_join[0]) == model_table_name:
+                return True
+        return any(
+            _get_join_target_table_name(description["entity"]) == model_table_name
+            for description in query.column_descriptions
+            if description["entity"] is not None
+        )
 
     def _get_base_query(
         self,
@@ -122,7 +169,7 @@ class SQLAInterface(BaseInterface):
         filters: Filters | None = None,
         order_column: str = "",
         order_direction: str = "",
-    ) -> str:
+    ) -> Query:
         if filters:
             query = filters.apply_all(query)
         return self.apply_order_by(query, order_column, order_direction)
@@ -206,8 +253,11 @@ class SQLAInterface(BaseInterface):
                     and bypass_many_to_many
                 ):
                     return query
-                # On MVC we still allow for joins to happen here
-                if not self.is_model_already_joined(
+                # On MVC we still allow for joins to happen here,
+                # relations joined by FAB are tracked on aliases_mapping
+                if not (
+                    aliases_mapping is not None and root_relation in aliases_mapping
+                ) and not self.is_model_already_joined(
                     query, self.get_related_model(root_relation)
                 ):
                     query = self._query_join_relation(
@@ -236,6 +286,72 @@ class SQLAInterface(BaseInterface):
             query = query.limit(page_size)
         return query
 
+    def apply_keyset(
+        self,
+        query: Query,
+        order_column: str,
+        order_direction: str,
+        seek_after: Optional[Tuple[Any, Any]],
+    ) -> Query:
+        """
+        Applies a keyset (seek) pagination predicate, selecting the rows that
+        come after the last row of the previous page on the
+        (order_column, primary key) order set by `apply_order_by(add_pk=True)`
+
+        :param query: The query to apply the predicate
+        :param order_column: A non dotted column name, or empty to seek by pk
+        :param order_direction: the direction to order <'asc'|'desc'>
+        :param seek_after: A tuple with the order column and primary key values
+            of the last row of the previous page, None for the first page
+        """
+        if seek_after is None:
+            return query
+        pk = self.get_pk()
+        if pk is None:
+            raise FABException("Keyset pagination needs a single column primary key")
+        last_value, last_pk = seek_after
+        compare: Callable[[Any, Any], Any] = (
+            operator.gt if order_direction == "asc" else operator.lt
+        )
+        if not order_column or order_column == self.get_pk_name():
+            return query.filter(compare(pk, last_pk))
+        column = getattr(self.obj, order_column)
+        last_value = self._parse_keyset_value(order_column, last_value)
+        return query.filter(
+            or_(
+                compare(column, last_value),
+                and_(column == last_value, compare(pk, last_pk)),
+            )
+        )
+
+    def _parse_keyset_value(self, col_name: str, value: Any) -> Any:
+        if isinstance(value, str) and self.is_datetime(col_name):
+            return datetime.datetime.fromisoformat(value)
+        if isinstance(value, str) and self.is_date(col_name):
+            return datetime.date.fromisoformat(value)
+        if isinstance(value, str) and self.is_numeric(col_name):
+            return decimal.Decimal(value)
+        return value
+
+    def is_keyset_supported(self, col_name: str) -> bool:
+        """
+        Returns True if col_name can order keyset pagination. The seek
+        predicate never matches NULL, so only non nullable scalar columns
+        are supported
+        """
+        if col_name not in self.list_columns or self.is_nullable(col_name):
+            return False
+        if self.is_enum(col_name):
+            return False
+        return (
+            self.is_string(col_name)
+            or self.is_numeric(col_name)
+            or self.is_integer(col_name)
+            or self.is_boolean(col_name)
+            or self.is_date(col_name)
+            or self.is_datetime(col_name)
+        )
+
     def apply_filters(self, query: Query, filters: Optional[Filters]) -> Query:
         if filters:
             return filters.apply_all(query)
@@ -249,9 +365,8 @@ class SQLAInterface(BaseInterface):
     def _apply_relation_fks_select_options(
         self, query: Query, relation_name: str
     ) -> Query:
-        relation = getattr(self.obj, relation_name)
-        if hasattr(relation, "property"):
-            local_cols = getattr(self.obj, relation_name).property.local_columns
+        if relation_name in self._relations:
+            local_cols = self._relations[relation_name].local_columns
             for local_fk in local_cols:
                 query = query.options(
                     Load(self.obj).load_only(getattr(self.obj, local_fk.name))
@@ -396,20 +511,18 @@ class SQLAInterface(BaseInterface):
         :param filters: All filters
         :return: New filtered filters to apply to an inner query
         """
-        inner_filters = Filters(self.filter_converter_class, self)
+        if not filters:
+            return Filters(self.filter_converter_class, self)
+        inner_filters = filters.empty_copy()
         _filters = []
-        if filters:
-            for flt, value in zip(filters.filters, filters.values):
-                if not is_column_dotted(flt.column_name):
-                    _filters.append((flt.column_name, flt.__class__, value))
-                elif self.is_relation_many_to_one(
-                    get_column_root_relation(flt.column_name)
-                ) or self.is_relation_one_to_one(
-                    get_column_root_relation(flt.column_name)
-                ):
-                    _filters.append((flt.column_name, flt.__class__, value))
-            inner_filters.add_filter_list(_filters)
-        return inner_filters
+        for flt, value in zip(filters.filters, filters.values):
+            if not is_column_dotted(flt.column_name):
+                _filters.append((flt.column_name, flt.__class__, value))
+            elif self.is_relation_many_to_one(
+                get_column_root_relation(flt.column_name)
+            ) or self.is_relation_one_to_one(get_column_root_relation(flt.column_name)):
+                _filters.append((flt.column_name, flt.__class__, value))
+        return inner_filters.add_filter_list(_filters)
 
     def exists_col_to_many(self, select_columns: list[str]) -> bool:
         for column in select_columns:
@@ -439,10 +552,12 @@ class SQLAInterface(BaseInterface):
         page_size: int | None = None,
         select_columns: list[str] | None = None,
         aliases_mapping: dict[str, AliasedClass] | None = None,
+        seek_after: Tuple[Any, Any] | None = None,
     ) -> Query:
         inner_filters = self.get_inner_filters(filters)
         query = self.apply_inner_select_joins(query, select_columns, aliases_mapping)
         query = self.apply_filters(query, inner_filters)
+        query = self.apply_keyset(query, order_column, order_direction, seek_after)
         query = self.apply_engine_specific_hack(query, page, page_size, order_column)
         query = self.apply_order_by(
             query,
@@ -475,6 +590,7 @@ class SQLAInterface(BaseInterface):
         page_size: Optional[int] = None,
         select_columns: Optional[list[str]] = None,
         outer_default_load: bool = False,
+        seek_after: Optional[Tuple[Any, Any]] = None,
     ) -> Query:
         """
         Accepts a SQLAlchemy Query and applies all filtering logic, order by and
@@ -498,6 +614,8 @@ class SQLAInterface(BaseInterface):
             the load of the many-to-many relationships at the model level.
             we will apply:
              https://docs.sqlalchemy.org/en/14/orm/loading_relationships.html#sqlalchemy.orm.Load.defaultload
+        :param seek_after: The (order column, primary key) values of the last row
+            of the previous page, to use keyset pagination instead of offsets
         :return: A SQLAlchemy Query with all the applied logic
         """
         aliases_mapping: dict[str, AliasedClass] = {}
@@ -510,6 +628,7 @@ class SQLAInterface(BaseInterface):
             page_size,
             select_columns,
             aliases_mapping=aliases_mapping,
+            seek_after=seek_after,
         )
         # Only use a from_self if we need to select a join one to many or many to many
         if select_columns and self.exists_col_to_many(select_columns):
@@ -531,6 +650,59 @@ class SQLAInterface(BaseInterface):
         else:
             return inner_query
 
+    def query_count_estimated(
+        self,
+        query: Query,
+        filters: Optional[Filters] = None,
+        select_columns: Optional[list[str]] = None,
+    ) -> int:
+        """
+        Returns an estimated count from the database planner statistics,
+        only supported on PostgreSQL. Unfiltered queries use the table
+        `pg_class.reltuples`, filtered queries use the `EXPLAIN` row estimate.
+        Falls back to an exact count on other engines or when no statistics exist
+        """
+        # EXPLAIN and pg_class are PostgreSQL only
+        if self.session.get_bind().dialect.name != "postgresql":
+            return self.query_count(query, filters, select_columns)
+        connection = self.session.connection()
+        inner_query = self._apply_inner_all(
+            query, filters, select_columns=select_columns, aliases_mapping={}
+        )
+        try:
+            if inner_query.whereclause is None:
+                estimate = connection.exec_driver_sql(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = %(table)s::regclass",
+                    {"table": self.obj.__table__.fullname},
+                ).scalar()
+            else:
+                statement = inner_query.statement.compile(dialect=connection.dialect)
+                plan = connection.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", statement.params
+                ).scalar()
+                estimate = plan[0]["Plan"]["Plan Rows"]
+        except SQLAlchemyError as e:
+            log.warning("Could not estimate count for %s: %s", self.model_name, e)
+            estimate = None
+        if estimate is None or estimate < 0:
+            return self.query_count(query, filters, select_columns)
+        return int(estimate)
+
+    def is_window_count_supported(self) -> bool:
+        """
+        Returns True if the database engine supports `COUNT(*) OVER ()`
+        """
+        dialect = self.session.get_bind().dialect
+        version = dialect.server_version_info or ()
+        if dialect.name == "sqlite":
+            return version >= (3, 25)
+        if dialect.name == "mysql":
+            if getattr(dialect, "is_mariadb", False):
+                return version >= (10, 2)
+            return version >= (8,)
+        return dialect.name in ("postgresql", "mssql", "oracle")
+
     def query(
         self,
         filters: Optional[Filters] = None,
@@ -540,7 +712,9 @@ class SQLAInterface(BaseInterface):
         page_size: Optional[int] = None,
         select_columns: Optional[list[str]] = None,
         outer_default_load: bool = False,
-    ) -> Tuple[int, list[Model]]:
+        count_mode: str = QUERY_COUNT_MODE_EXACT,
+        seek_after: Optional[Tuple[Any, Any]] = None,
+    ) -> Tuple[Optional[int], list[Model]]:
         """
         Returns the results for a model query, applies filters, sorting and pagination
 
@@ -556,11 +730,41 @@ class SQLAInterface(BaseInterface):
             the load of the many-to-many relationships at the model level.
             we will apply:
              https://docs.sqlalchemy.org/en/14/orm/loading_relationships.html#sqlalchemy.orm.Load.defaultload
+        :param count_mode: How to count the non paginated results, one of:
+            `exact` (default) runs a separate count query,
+            `window` fetches `COUNT(*) OVER ()` along with the page rows on
+            a single query (falls back to exact when not supported),
+            `estimated` uses the database planner statistics (PostgreSQL only),
+            `none` skips the count and returns None
+        :param seek_after: The (order column, primary key) values of the last row
+            of the previous page, to use keyset pagination instead of offsets.
+            The order column must be a non dotted column
         :return: A tuple with the query count (non paginated) and the results
         """
         query = self.session.query(self.obj)
 
-        count = self.query_count(query, filters, select_columns)
+        if (
+            count_mode == QUERY_COUNT_MODE_WINDOW
+            and seek_after is None
+            and not (select_columns and self.exists_col_to_many(select_columns))
+            and self.is_window_count_supported()
+        ):
+            return self._query_with_window_count(
+                query,
+                filters,
+                order_column,
+                order_direction,
+                page,
+                page_size,
+                select_columns,
+                outer_default_load,
+            )
+        if count_mode == QUERY_COUNT_MODE_NONE:
+            count = None
+        elif count_mode == QUERY_COUNT_MODE_ESTIMATED:
+            count = self.query_count_estimated(query, filters, select_columns)
+        else:
+            count = self.query_count(query, filters, select_columns)
         query = self.apply_all(
             query,
             filters,
@@ -570,6 +774,7 @@ class SQLAInterface(BaseInterface):
             page_size,
             select_columns,
             outer_default_load,
+            seek_after,
         )
         query_results = query.all()
 
@@ -581,32 +786,235 @@ class SQLAInterface(BaseInterface):
                 return count, query_results
         return count, result
 
-    def query_simple_group(
-        self, group_by: str | None = None, filters: Filters | None = None
+    def query_iter(
+        self,
+        filters: Optional[Filters] = None,
+        order_column: str = "",
+        order_direction: str = "",
+        select_columns: Optional[list[str]] = None,
+        outer_default_load: bool = False,
+        batch_size: int = 1000,
+    ) -> Iterator[Model]:
+        """
+        Yields all the results for a model query without a count, applies
+        filters and sorting. Rows are fetched in batches of batch_size from a
+        server side cursor, so memory stays constant for any number of rows.
+        Selected to many relations can't be joined on a cursor, so they are
+        fetched page by page instead, ordered by the primary key when no
+        order_column is given. Paging is not supported for composite
+        primary keys.
+
+        :param filters: A Filter class that contains all filters to apply
+        :param order_column: name of the column to order
+        :param order_direction: the direction to order <'asc'|'desc'>
+        :param select_columns: A List of columns to be specifically selected
+        on the query. Supports dotted notation.
+        :param outer_default_load: If True, the default load for outer joins will be
+            applied.
+        :param batch_size: The number of rows fetched on each round trip
+        """
+        if not (select_columns and self.exists_col_to_many(select_columns)):
+            query = self.apply_all(
+                self.session.query(self.obj),
+                filters,
+                order_column,
+                order_direction,
+                select_columns=select_columns,
+                outer_default_load=outer_default_load,
+            )
+            for item in query.yield_per(batch_size):
+                yield getattr(item, self.obj.__name__, item)
+            return
+        if self.is_pk_composite():
+            raise FABException("Composite primary key not supported")
+        if not order_column:
+            # Pages need a stable order
+            page_order_column, page_order_direction = self._pk_names[0], "asc"
+        else:
+            page_order_column, page_order_direction = order_column, order_direction
+        page = 0
+        while True:
+            items = self.apply_all(
+                self.session.query(self.obj),
+                filters,
+                page_order_column,
+                page_order_direction,
+                page=page,
+                page_size=batch_size,
+                select_columns=select_columns,
+                outer_default_load=outer_default_load,
+            ).all()
+            for item in items:
+                yield getattr(item, self.obj.__name__, item)
+            if len(items) < batch_size:
+                return
+            page += 1
+
+    def _query_with_window_count(
+        self,
+        query: Query,
+        filters: Optional[Filters] = None,
+        order_column: str = "",
+        order_direction: str = "",
+        page: Optional[int] = None,
+        page_size: Optional[int] = None,
+        select_columns: Optional[list[str]] = None,
+        outer_default_load: bool = False,
+    ) -> Tuple[int, list[Model]]:
+        """
+        Fetches the page rows and the non paginated count on a single statement.
+        The count column is added after all joins and load options, so the
+        model entity is always the first column and the count the last
+        """
+        query = self.apply_all(
+            query,
+            filters,
+            order_column,
+            order_direction,
+            page,
+            page_size,
+            select_columns,
+            outer_default_load=outer_default_load,
+        ).add_columns(func.count().over())
+        rows = query.all()
+        if rows:
+            return rows[0][-1], [row[0] for row in rows]
+        if page:
+            # Out of range page, the window has no rows to carry the count
+            return (
+                self.query_count(self.session.query(self.obj), filters, select_columns),
+                [],
+            )
+        return 0, []
+
+    def _query_group(
+        self,
+        group_by_exprs: list[ColumnElement],
+        aggregates: list[ColumnElement],
+        filters: Filters | None = None,
+        order_direction: str = "asc",
+    ) -> list[Tuple[Any, ...]]:
+        """
+        Groups and aggregates on the database, rows are ordered by the group
+        expressions and hold the group values followed by the aggregations
+        """
+        query = self._get_base_query(
+            query=self.session.query(self.obj), filters=filters
+        )
+        _order_direction = desc if order_direction == "desc" else asc
+        return (
+            query.with_entities(*group_by_exprs, *aggregates)
+            .group_by(*group_by_exprs)
+            .order_by(*[_order_direction(expr) for expr in group_by_exprs])
+            .all()
+        )
+
+    def _query_python_group(
+        self, group: BaseGroupBy, filters: Filters | None = None
     ) -> list[list[Any]]:
         query = self.session.query(self.obj)
         query = self._get_base_query(query=query, filters=filters)
-        query_result = query.all()
+        return group.apply(query.all())
+
+    def _get_aggregate_expression(
+        self, aggregate_func: Callable[..., Any], col_name: str
+    ) -> ColumnElement:
+        sql_func: str = getattr(aggregate_func, "_sql_func")
+        if sql_func == "count":
+            return func.count()
+        # Keep the python types, some engines return Decimal for SUM and AVG
+        if sql_func == "sum" and self.is_integer(col_name):
+            result_type: Any = sa_types.Integer
+        else:
+            result_type = sa_types.Float
+        return cast(getattr(func, sql_func)(getattr(self.obj, col_name)), result_type)
+
+    def is_aggregate_supported(
+        self, group_by_cols: list[str], aggr_by_cols: list[Tuple[Any, ...]]
+    ) -> bool:
+        """
+        Returns True if all group by columns are model columns and all
+        aggregation functions declare an equivalent SQL aggregate
+        """
+        if not all(col_name in self.list_columns for col_name in group_by_cols):
+            return False
+        for aggr_by_col in aggr_by_cols:
+            if not isinstance(aggr_by_col, tuple):
+                return False
+            aggregate_func, col_name = aggr_by_col[0], aggr_by_col[1]
+            sql_func = getattr(aggregate_func, "_sql_func", "")
+            if not sql_func:
+                return False
+            if sql_func != "count" and col_name not in self.list_columns:
+                return False
+        return True
+
+    def query_aggregate(
+        self,
+        group_by_cols: list[str],
+        aggr_by_cols: list[Tuple[Any, ...]],
+        filters: Filters | None = None,
+        order_direction: str = "asc",
+    ) -> list[Tuple[Any, ...]]:
+        """
+        Groups by columns and aggregates using SQL GROUP BY,
+        check support first with `is_aggregate_supported`
+
+        :param group_by_cols: A list of column names to group by
+        :param aggr_by_cols: A list of tuples [(<AGGR FUNC>,'<COLNAME>'),...]
+        :param filters: A Filter class that contains all filters to apply
+        :param order_direction: the direction to order the groups <'asc'|'desc'>
+        :return: A list of rows with the group values followed by the aggregations
+        """
+        return self._query_group(
+            [getattr(self.obj, col_name) for col_name in group_by_cols],
+            [
+                self._get_aggregate_expression(aggr_by_col[0], aggr_by_col[1])
+                for aggr_by_col in aggr_by_cols
+            ],
+            filters=filters,
+            order_direction=order_direction,
+        )
+
+    def query_simple_group(
+        self, group_by: str | None = None, filters: Filters | None = None
+    ) -> list[list[Any]]:
         group = GroupByCol(group_by, "Group by")
-        return group.apply(query_result)
+        if group_by is None or group_by not in self.list_columns:
+            return self._query_python_group(group, filters)
+        rows = self._query_group(
+            [getattr(self.obj, group_by)], [func.count()], filters=filters
+        )
+        return [[group.get_format_group_col(value), count] for value, count in rows]
 
     def query_month_group(
         self, group_by: str | None = None, filters: Filters | None = None
     ) -> list[list[Any]]:
-        query = self.session.query(self.obj)
-        query = self._get_base_query(query=query, filters=filters)
-        query_result = query.all()
         group = GroupByDateMonth(group_by, "Group by Month")
-        return group.apply(query_result)
+        if group_by is None or group_by not in self.list_columns:
+            return self._query_python_group(group, filters)
+        column = getattr(self.obj, group_by)
+        # extract is compiled per dialect, EXTRACT, STRFTIME or DATEPART
+        year = cast(extract("year", column), sa_types.Integer)
+        month = cast(extract("month", column), sa_types.Integer)
+        rows = self._query_group([year, month], [func.count()], filters=filters)
+        return [
+            [group.get_format_group_col((year, month)), count]
+            for year, month, count in rows
+            if year is not None
+        ]
 
     def query_year_group(
         self, group_by: str | None = None, filters: Filters | None = None
     ) -> list[list[Any]]:
-        query = self.session.query(self.obj)
-        query = self._get_base_query(query=query, filters=filters)
-        query_result = query.all()
         group_year = GroupByDateYear(group_by, "Group by Year")
-        return group_year.apply(query_result)
+        if group_by is None or group_by not in self.list_columns:
+            return self._query_python_group(group_year, filters)
+        year = cast(extract("year", getattr(self.obj, group_by)), sa_types.Integer)
+        rows = self._query_group([year], [func.count()], filters=filters)
+        return [
+            [group_year.get_format_group_col(value), count] for value, count in rows
+        ]
 
     """
     -----------------------------------------
@@ -696,56 +1104,38 @@ class SQLAInterface(BaseInterface):
             return False
 
     def is_relation(self, col_name: str) -> bool:
-        try:
-            return isinstance(self.list_properties[col_name], RelationshipProperty)
-        except KeyError:
-            return False
+        return col_name in self._relations
 
     def is_relation_many_to_one(self, col_name: str) -> bool:
-        try:
-            if self.is_relation(col_name):
-                return self.list_properties[col_name].direction.name == "MANYTOONE"
-            return False
-        except KeyError:
-            return False
+        relation = self._relations.get(col_name)
+        return relation is not None and relation.direction == "MANYTOONE"
 
     def is_relation_many_to_many(self, col_name: str) -> bool:
-        try:
-            if self.is_relation(col_name):
-                relation = self.list_properties[col_name]
-                return relation.direction.name == "MANYTOMANY"
-            return False
-        except KeyError:
-            return False
+        relation = self._relations.get(col_name)
+        return relation is not None and relation.direction == "MANYTOMANY"
 
     def is_relation_many_to_many_special(self, col_name: str) -> bool:
-        try:
-            if self.is_relation(col_name):
-                relation = self.list_properties[col_name]
-                return relation.direction.name == "ONETOONE" and relation.uselist
-            return False
-        except KeyError:
-            return False
+        relation = self._relations.get(col_name)
+        return (
+            relation is not None
+            and relation.direction == "ONETOONE"
+            and bool(relation.uselist)
+        )
 
     def is_relation_one_to_one(self, col_name: str) -> bool:
-        try:
-            if self.is_relation(col_name):
-                relation = self.list_properties[col_name]
-                return self.list_properties[col_name].direction.name == "ONETOONE" or (
-                    relation.direction.name == "ONETOMANY" and relation.uselist is False
-                )
-            return False
-        except KeyError:
-            return False
+        relation = self._relations.get(col_name)
+        return relation is not None and (
+            relation.direction == "ONETOONE"
+            or (relation.direction == "ONETOMANY" and relation.uselist is False)
+        )
 
     def is_relation_one_to_many(self, col_name: str) -> bool:
-        try:
-            if self.is_relation(col_name):
-                relation = self.list_properties[col_name]
-                return relation.direction.name == "ONETOMANY" and relation.uselist
-            return False
-        except KeyError:
-            return False
+        relation = self._relations.get(col_name)
+        return (
+            relation is not None
+            and relation.direction == "ONETOMANY"
+            and bool(relation.uselist)
+        )
 
     def is_nullable(self, col_name: str) -> bool:
         if self.is_relation_many_to_one(col_name):
@@ -769,7 +1159,7 @@ class SQLAInterface(BaseInterface):
             return False
 
     def is_pk_composite(self) -> bool:
-        return len(self.obj.__mapper__.primary_key) > 1
+        return len(self._pk_names) > 1
 
     def is_fk(self, col_name: str) -> bool:
         try:
@@ -895,6 +1285,8 @@ class SQLAInterface(BaseInterface):
         return value
 
     def get_related_model(self, col_name: str) -> Type[Model]:
+        if col_name in self._relations:
+            return self._relations[col_name].related_model
         return self.list_properties[col_name].mapper.class_
 
     def get_related_model_and_join(
@@ -1012,7 +1404,7 @@ class SQLAInterface(BaseInterface):
 
     def get_relation_fk(self, col_name: str) -> Column:
         # support for only one col for pk and fk
-        return list(self.list_properties[col_name].local_columns)[0]
+        return self._relations[col_name].local_columns[0]
 
     def get(
         self,
@@ -1054,6 +1446,59 @@ class SQLAInterface(BaseInterface):
                 return getattr(item, self.obj.__name__)
         return item
 
+    def get_many(
+        self,
+        pks: list[Any],
+        filters: Optional[Filters] = None,
+    ) -> list[Model]:
+        """
+        Returns the results for a list of model ids, with one IN query per
+        chunk of `get_many_chunk_size` parameters, applies filters and supports
+        composite keys.
+
+        :param pks: A list of model ids (pk), a list of values for composite keys
+        :param filters: A Filter class that contains all filters to apply.
+        :return: The found models, ordered like pks. Ids that do not exist or
+            are excluded by the filters are left out
+        """
+        pk_name = self.get_pk_name()
+        if isinstance(pk_name, str):
+            pk_columns = [getattr(self.obj, pk_name)]
+            pks = [[pk] for pk in pks]
+        elif isinstance(pk_name, list):
+            pk_columns = [getattr(self.obj, name) for name in pk_name]
+        else:
+            raise FABException("No primary key found")
+        chunk_size = max(1, self.get_many_chunk_size // len(pk_columns))
+        items_by_pk: dict[tuple[str, ...], Model] = {}
+        for i in range(0, len(pks), chunk_size):
+            chunk = pks[i : i + chunk_size]
+            if len(pk_columns) == 1:
+                criterion = pk_columns[0].in_([pk[0] for pk in chunk])
+            else:
+                criterion = or_(
+                    *[
+                        and_(
+                            *[column == value for column, value in zip(pk_columns, pk)]
+                        )
+                        for pk in chunk
+                    ]
+                )
+            query = self.apply_all(
+                self.session.query(self.obj).filter(criterion), filters
+            )
+            for item in query.all():
+                key = tuple(str(getattr(item, column.key)) for column in pk_columns)
+                items_by_pk[key] = item
+        items = []
+        for pk in pks:
+            item = items_by_pk.pop(tuple(str(value) for value in pk), None)
+            if item is not None:
+                items.append(item)
+        # Keys that did not match the submitted representation of the pks
+        items.extend(items_by_pk.values())
+        return items
+
     def get_pk_name(self) -> Optional[list[str] | str]:
         """
         Get the model primary key column name.
@@ -1072,12 +1517,34 @@ class SQLAInterface(BaseInterface):
         return None
 
     def _get_pk_name(self, model: Type[Model]) -> Optional[list[str] | str]:
-        pk = [pk.name for pk in model.__mapper__.primary_key]
+        if model is self.obj:
+            pk = list(self._pk_names)
+        else:
+            pk = [pk.name for pk in model.__mapper__.primary_key]
         if pk:
             return pk if self.is_pk_composite() else pk[0]
         return None
 
 
+def _get_join_target_table_name(target: Any) -> Optional[str]:
+    """
+    Returns the table name of a query join target or entity, that can be
+    a model, an alias, a relationship attribute or a table
+    """
+    if hasattr(target, "property"):
+        # Checking for `.join(Parent.child)` clauses
+        target = target.property.mapper
+    elif not hasattr(target, "fullname") and not hasattr(target, "element"):
+        target = sa_inspect(target, raiseerr=False)
+        if target is None:
+            return None
+    if hasattr(target, "mapper"):
+        target = target.mapper.local_table
+    # Aliased tables
+    target = getattr(target, "element", target)
+    return getattr(target, "fullname", None)
+
+
 def _include_filters(interface: SQLAInterface) -> None:
     """
     Injects all filters on the interface class itself
@@ -1,12 +1,35 @@
 from __future__ import annotations
 
+import atexit
 import datetime
+import hashlib
 import importlib
+import json
 import logging
 import re
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
 
-from flask import current_app, Flask, g, request, session, url_for
+from flask import (
+    current_app,
+    Flask,
+    g,
+    has_app_context,
+    request,
+    session,
+    url_for,
+)
 from flask_appbuilder.exceptions import InvalidLoginAttempt, OAuthProviderUnknown
 from flask_babel import lazy_gettext as _
 from flask_jwt_extended import current_user as current_user_jwt
@@ -24,6 +47,7 @@ from .registerviews import (
     RegisterUserDBView,
     RegisterUserOAuthView,
 )
+from .usage import UsageStatsBuffer
 from .views import (
     AuthDBView,
     AuthLDAPView,
@@ -56,12 +80,16 @@ from ..const import (
     LOGMSG_ERR_SEC_ADD_REGISTER_USER,
     LOGMSG_ERR_SEC_AUTH_LDAP,
     LOGMSG_ERR_SEC_AUTH_LDAP_TLS,
+    LOGMSG_INF_SEC_CLEANUP,
+    LOGMSG_INF_SEC_CONVERGE,
+    LOGMSG_INF_SEC_SYNC_PERMS_SKIP,
     LOGMSG_WAR_SEC_LOGIN_FAILED,
     LOGMSG_WAR_SEC_NO_USER,
     LOGMSG_WAR_SEC_NOLDAP_OBJ,
     MICROSOFT_KEY_SET_URL,
     PERMISSION_PREFIX,
 )
+from ..utils.cache import TTLCache
 
 if TYPE_CHECKING:
     from flask_appbuilder.security.saml.types import SAMLConfig, SAMLProvider
@@ -291,6 +319,25 @@ class BaseSecurityManager(AbstractSecurityManager):
         current_app.config.setdefault("AUTH_RATE_LIMITED", False)
         current_app.config.setdefault("AUTH_RATE_LIMIT", "10 per 20 second")
 
+        # Compiled permission sets cache
+        current_app.config.setdefault("FAB_PERMISSION_CACHE_ENABLED", False)
+        current_app.config.setdefault("FAB_PERMISSION_CACHE_TTL", 60)
+        current_app.config.setdefault("FAB_PERMISSION_CACHE_MAXSIZE", 1024)
+
+        # Verified API keys cache
+        current_app.config.setdefault("FAB_API_KEY_CACHE_ENABLED", False)
+        current_app.config.setdefault("FAB_API_KEY_CACHE_TTL", 60)
+        current_app.config.setdefault("FAB_API_KEY_CACHE_MAXSIZE", 1024)
+        # User snapshot cache, loaded users with their roles and groups
+        current_app.config.setdefault("FAB_USER_CACHE_ENABLED", False)
+        current_app.config.setdefault("FAB_USER_CACHE_TTL", 10)
+        current_app.config.setdefault("FAB_USER_CACHE_MAXSIZE", 1024)
+
+        # Write behind API key and login usage stats
+        current_app.config.setdefault("FAB_USAGE_STATS_WRITE_BEHIND", False)
+        current_app.config.setdefault("FAB_USAGE_STATS_FLUSH_INTERVAL", 10)
+        current_app.config.setdefault("FAB_USAGE_STATS_FLUSH_MAX_EVENTS", 1000)
+
         if self.auth_type == AUTH_OAUTH:
             from authlib.integrations.flask_client import OAuth
 
@@ -311,6 +358,30 @@ class BaseSecurityManager(AbstractSecurityManager):
                 self.oauth_remotes[provider_name] = obj_provider
 
         self._builtin_roles = self.create_builtin_roles()
+        self._builtin_roles_patterns = self.compile_builtin_roles(self._builtin_roles)
+        self._builtin_roles_access: Dict[Tuple[str, str, str], bool] = {}
+        self._permissions_version = 0
+        self._permissions_cache = TTLCache(
+            maxsize=current_app.config["FAB_PERMISSION_CACHE_MAXSIZE"],
+            ttl=current_app.config["FAB_PERMISSION_CACHE_TTL"],
+        )
+        self._api_keys_cache = TTLCache(
+            maxsize=current_app.config["FAB_API_KEY_CACHE_MAXSIZE"],
+            ttl=current_app.config["FAB_API_KEY_CACHE_TTL"],
+        )
+        self._users_version = 0
+        self._users_cache = TTLCache(
+            maxsize=current_app.config["FAB_USER_CACHE_MAXSIZE"],
+            ttl=current_app.config["FAB_USER_CACHE_TTL"],
+        )
+        self._usage_stats = UsageStatsBuffer(
+            flush_interval=current_app.config["FAB_USAGE_STATS_FLUSH_INTERVAL"],
+            flush_max_events=current_app.config["FAB_USAGE_STATS_FLUSH_MAX_EVENTS"],
+        )
+        if self.usage_stats_write_behind or self.api_key_cache_enabled:
+            atexit.register(
+                self._flush_usage_stats_at_exit, current_app._get_current_object()
+            )
         # Setup Flask-Login
         self.lm = self.create_login_manager(current_app)
 
@@ -353,6 +424,25 @@ class BaseSecurityManager(AbstractSecurityManager):
     def create_builtin_roles():
         return current_app.config.get("FAB_ROLES", {})
 
+    @staticmethod
+    def compile_builtin_roles(
+        builtin_roles: Dict[str, Any],
+    ) -> Dict[str, List[Tuple[re.Pattern, re.Pattern]]]:
+        """
+        Compiles the view menu and permission regexes of each builtin role once
+
+        :param builtin_roles: A dict like FAB_ROLES
+        :return: A dict with role names as keys and a list of compiled
+            (view menu, permission) patterns as values
+        """
+        return {
+            role_name: [
+                (re.compile(view_name), re.compile(permission_name))
+                for view_name, permission_name in pvms
+            ]
+            for role_name, pvms in builtin_roles.items()
+        }
+
     def get_roles_from_keys(self, role_keys: List[str]) -> Set[role_model]:
         """
         Construct a list of FAB role objects, from a list of keys.
@@ -574,6 +664,30 @@ class BaseSecurityManager(AbstractSecurityManager):
     def auth_rate_limit(self) -> str:
         return current_app.config["AUTH_RATE_LIMIT"]
 
+    @property
+    def permission_cache_enabled(self) -> bool:
+        return current_app.config["FAB_PERMISSION_CACHE_ENABLED"]
+
+    @property
+    def api_key_cache_enabled(self) -> bool:
+        return current_app.config["FAB_API_KEY_CACHE_ENABLED"]
+
+    @property
+    def user_cache_enabled(self) -> bool:
+        return current_app.config["FAB_USER_CACHE_ENABLED"]
+
+    @property
+    def usage_stats_write_behind(self) -> bool:
+        return has_app_context() and current_app.config["FAB_USAGE_STATS_WRITE_BEHIND"]
+
+    @property
+    def permissions_version(self) -> int:
+        return self._permissions_version
+
+    @property
+    def users_version(self) -> int:
+        return self._users_version
+
     @property
     def current_user(self):
         if getattr(g, "_api_key_user", False) and hasattr(g, "user"):
@@ -1017,6 +1131,14 @@ class BaseSecurityManager(AbstractSecurityManager):
             last_login, and resets fail_login_count to 0, if false increments
             fail_login_count on user model.
         """
+        if success and self.usage_stats_write_behind:
+            # Failed logins are written immediately, and so is their reset
+            if user.fail_login_count:
+                user.fail_login_count = 0
+                self.update_user(user)
+            self.record_user_login(user)
+            self.on_user_login(user)
+            return
         if not user.login_count:
             user.login_count = 0
         if not user.fail_login_count:
@@ -1033,6 +1155,57 @@ class BaseSecurityManager(AbstractSecurityManager):
         else:
             self.on_user_login_failed(user)
 
+    def record_user_login(self, user) -> None:
+        """
+        Buffers a successful login of a user, login_count and last_login
+        are written in bulk on the next usage stats flush. Override to also
+        update the in memory user without marking it for a write
+
+        :param user: The authenticated user model
+        """
+        if self._usage_stats.add_login(user.id, datetime.datetime.now()):
+            self.flush_usage_stats()
+
+    def record_api_key_usage(self, api_key_id: int) -> None:
+        """
+        Buffers the use of an API key, last_used_on is written in bulk
+        on the next usage stats flush
+
+        :param api_key_id: The API key's ID
+        """
+        if self._usage_stats.add_api_key_use(api_key_id, datetime.datetime.now()):
+            self.flush_usage_stats()
+
+    def flush_usage_stats(self) -> None:
+        """
+        Writes all buffered API key and login usage stats, on failure
+        they are kept buffered for the next flush
+        """
+        api_keys_used_on, logins = self._usage_stats.drain()
+        if api_keys_used_on or logins:
+            if not self.update_usage_stats(api_keys_used_on, logins):
+                self._usage_stats.restore(api_keys_used_on, logins)
+
+    def _flush_usage_stats_at_exit(self, app: Flask) -> None:
+        with app.app_context():
+            self.flush_usage_stats()
+
+    def update_usage_stats(
+        self,
+        api_keys_used_on: Dict[int, datetime.datetime],
+        logins: Dict[int, Tuple[int, datetime.datetime]],
+    ) -> bool:
+        """
+        Bulk updates API keys last_used_on and users login stats.
+
+        Override in subclass to provide storage-specific implementation.
+
+        :param api_keys_used_on: A dict of API key id to last use
+        :param logins: A dict of user id to (login count, last login)
+        :return: True on success, False on error
+        """
+        raise NotImplementedError
+
     def auth_user_db(self, username, password):
         """
         Method for authenticating user, auth db style
@@ -1784,6 +1957,8 @@ class BaseSecurityManager(AbstractSecurityManager):
         :param view_name:
             the name of the class view (child of BaseView)
         """
+        if self.permission_cache_enabled:
+            return (permission_name, view_name) in self.get_public_permissions_index()
         permissions = self.get_public_permissions()
         if permissions:
             for i in permissions:
@@ -1799,17 +1974,21 @@ class BaseSecurityManager(AbstractSecurityManager):
         self, role, permission_name: str, view_name: str
     ) -> bool:
         """
-        Checks permission on builtin role
-        """
-        builtin_pvms = self.builtin_roles.get(role.name, [])
-        for pvm in builtin_pvms:
-            _view_name = pvm[0]
-            _permission_name = pvm[1]
-            if re.match(_view_name, view_name) and re.match(
-                _permission_name, permission_name
-            ):
-                return True
-        return False
+        Checks permission on builtin role, results are memoized since
+        builtin roles are static
+        """
+        key = (role.name, permission_name, view_name)
+        result = self._builtin_roles_access.get(key)
+        if result is None:
+            result = any(
+                view_pattern.match(view_name)
+                and permission_pattern.match(permission_name)
+                for view_pattern, permission_pattern in (
+                    self._builtin_roles_patterns.get(role.name, [])
+                )
+            )
+            self._builtin_roles_access[key] = result
+        return result
 
     def _has_view_access(
         self, user: object, permission_name: str, view_name: str
@@ -1827,9 +2006,107 @@ class BaseSecurityManager(AbstractSecurityManager):
         db_role_ids = [role.id for role in roles if role.name not in self.builtin_roles]
 
         # Check database-stored roles if no match was found in built-in roles
-        return bool(db_role_ids) and self.exist_permission_on_roles(
-            view_name, permission_name, db_role_ids
-        )
+        if not db_role_ids:
+            return False
+        if self.permission_cache_enabled:
+            return (permission_name, view_name) in self.get_roles_permissions(
+                db_role_ids
+            )
+        return self.exist_permission_on_roles(view_name, permission_name, db_role_ids)
+
+    def _has_view_access_batch(
+        self, user: object, permissions: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], bool]:
+        return self._has_roles_access_batch(self.get_user_roles(user), permissions)
+
+    def _has_roles_access_batch(
+        self, roles: List[Any], permissions: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], bool]:
+        builtin_roles = [role for role in roles if role.name in self.builtin_roles]
+        db_role_ids = [role.id for role in roles if role.name not in self.builtin_roles]
+
+        # First check against built-in roles (avoiding unnecessary DB queries)
+        result = {
+            (permission_name, view_name): any(
+                self._has_access_builtin_roles(role, permission_name, view_name)
+                for role in builtin_roles
+            )
+            for permission_name, view_name in permissions
+        }
+        pending = [permission for permission, allowed in result.items() if not allowed]
+        if not pending or not db_role_ids:
+            return result
+        # Check all the remaining on database-stored roles at once
+        if self.permission_cache_enabled:
+            granted = self.get_roles_permissions(db_role_ids)
+        else:
+            granted = self.find_roles_permissions(
+                db_role_ids, view_names=list({view_name for _, view_name in pending})
+            )
+        for permission in pending:
+            result[permission] = permission in granted
+        return result
+
+    def _is_item_public_batch(
+        self, permissions: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], bool]:
+        if self.permission_cache_enabled:
+            granted = self.get_public_permissions_index()
+        else:
+            granted = {
+                (permission.permission.name, permission.view_menu.name)
+                for permission in self.get_public_permissions() or []
+            }
+        return {permission: permission in granted for permission in permissions}
+
+    def bump_permissions_version(self) -> None:
+        """
+        Invalidates all compiled permission sets. Called whenever
+        role permissions change
+        """
+        self._permissions_version += 1
+
+    def bump_users_version(self) -> None:
+        """
+        Invalidates all cached user snapshots. Called whenever users,
+        their roles or groups change
+        """
+        self._users_version += 1
+
+    def get_roles_permissions(self, role_ids: List[int]) -> FrozenSet[Tuple[str, str]]:
+        """
+        Returns the compiled set of (permission name, view menu name) granted
+        to a list of database role ids. The set is built on a single query and
+        then served from an in process LRU cache, keyed by the user's role ids
+        and the current permissions version
+
+        :param role_ids: a list of Role ids
+        """
+        key = (self._permissions_version, tuple(sorted(role_ids)))
+        permissions = self._permissions_cache.get(key)
+        if permissions is None:
+            permissions = frozenset(self.find_roles_permissions(role_ids))
+            self._permissions_cache.set(key, permissions)
+        return permissions
+
+    def get_public_permissions_index(self) -> FrozenSet[Tuple[str, str]]:
+        """
+        Returns the compiled set of (permission name, view menu name) granted
+        to the public role. Shares the permissions cache and version with
+        `get_roles_permissions`, so anonymous checks are served without
+        DB round trips until the public role permissions change
+        """
+        key = (self._permissions_version, self.auth_role_public)
+        permissions = self._permissions_cache.get(key)
+        if permissions is None:
+            role = self.get_public_role()
+            permissions = (
+                frozenset(self.find_roles_permissions([role.id]))
+                if role
+                else frozenset()
+            )
+            self._permissions_cache.set(key, permissions)
+        return permissions
 
     def get_user_roles(self, user) -> List[object]:
         """
@@ -1872,39 +2149,55 @@ class BaseSecurityManager(AbstractSecurityManager):
         return result
 
     def _get_user_permission_view_menus(
-        self, user: object, permission_name: str, view_menus_name: List[str]
+        self,
+        user: object,
+        permission_name: str,
+        view_menus_name: Optional[List[str]] = None,
     ) -> Set[str]:
         """
         Return a set of view menu names with a certain permission name
         that a user has access to. Mainly used to fetch all menu permissions
-        on a single db call, will also check public permissions and builtin roles
-        """
+        on a single db call, will also check public permissions and builtin roles.
+        When view_menus_name is None all the database roles view menus are
+        returned
+        """
+        if (
+            user is None
+            and self.permission_cache_enabled
+            and self.auth_role_public not in self.builtin_roles
+        ):
+            return {
+                view_menu_name
+                for _permission_name, view_menu_name in (
+                    self.get_public_permissions_index()
+                )
+                if _permission_name == permission_name
+            }
         # Determine user roles (use public role if user is None)
         roles = [self.get_public_role()] if user is None else self.get_user_roles(user)
-
-        # First, check built-in roles (avoiding unnecessary DB queries)
-        result = {
+        if view_menus_name is None:
+            db_role_ids = [
+                role.id for role in roles if role.name not in self.builtin_roles
+            ]
+            if not db_role_ids:
+                return set()
+            return {
+                view_menu_name
+                for _permission_name, view_menu_name in self.find_roles_permissions(
+                    db_role_ids
+                )
+                if _permission_name == permission_name
+            }
+        permissions = self._has_roles_access_batch(
+            roles,
+            [(permission_name, view_menu_name) for view_menu_name in view_menus_name],
+        )
+        return {
             view_menu_name
-            for role in roles
-            if role.name in self.builtin_roles
-            for view_menu_name in view_menus_name
-            if self._has_access_builtin_roles(role, permission_name, view_menu_name)
+            for (_, view_menu_name), allowed in permissions.items()
+            if allowed
         }
 
-        # Collect database role IDs for further checking
-        db_role_ids = [role.id for role in roles if role.name not in self.builtin_roles]
-
-        # Check database-stored roles if needed
-        if db_role_ids:
-            result.update(
-                pvm.view_menu.name
-                for pvm in self.find_roles_permission_view_menus(
-                    permission_name, db_role_ids
-                )
-            )
-
-        return result
-
     def _is_user_detached(self, user) -> bool:
         """Check if a SQLAlchemy user instance is detached from the session."""
         try:
@@ -1929,25 +2222,58 @@ class BaseSecurityManager(AbstractSecurityManager):
             return None
         return user
 
-    def has_access(self, permission_name: str, view_name: str) -> bool:
+    def _get_access_user(self) -> Tuple[Optional[Any], bool]:
         """
-        Check if current user or public has access to view or menu
+        Resolves the active user that access is checked for, authenticated
+        by API key, session or JWT
+
+        :return: A tuple with the user, None when there's no active user,
+            and True if access should be checked on the public role
         """
         # Check API key authenticated user first
         if getattr(g, "_api_key_user", False) and hasattr(g, "user"):
             user = self._get_safe_user(g.user)
             if user and user.is_active:
-                return self._has_view_access(user, permission_name, view_name)
+                return user, False
         if current_user.is_authenticated:
             user = self._get_safe_user(g.user)
             if user and user.is_active:
-                return self._has_view_access(user, permission_name, view_name)
-            return False
+                return user, False
+            return None, False
         if current_user_jwt and current_user_jwt.is_active:
-            return self._has_view_access(current_user_jwt, permission_name, view_name)
-        return self.is_item_public(permission_name, view_name)
+            return current_user_jwt, False
+        return None, True
 
-    def get_user_menu_access(self, menu_names: List[str] = None) -> Set[str]:
+    def has_access(self, permission_name: str, view_name: str) -> bool:
+        """
+        Check if current user or public has access to view or menu
+        """
+        user, is_public = self._get_access_user()
+        if user is not None:
+            return self._has_view_access(user, permission_name, view_name)
+        if is_public:
+            return self.is_item_public(permission_name, view_name)
+        return False
+
+    def has_access_batch(
+        self, permissions: Iterable[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], bool]:
+        """
+        Check if current user or public has access to a list of views or menus,
+        with one lookup on the user's roles permissions instead of one per item
+
+        :param permissions: (permission name, view name) tuples
+        :return: A dict of (permission name, view name) to a boolean
+        """
+        permissions = list(dict.fromkeys(permissions))
+        user, is_public = self._get_access_user()
+        if user is not None:
+            return self._has_view_access_batch(user, permissions)
+        if is_public:
+            return self._is_item_public_batch(permissions)
+        return dict.fromkeys(permissions, False)
+
+    def get_user_menu_access(self, menu_names: Optional[List[str]] = None) -> Set[str]:
         if current_user.is_authenticated:
             return self._get_user_permission_view_menus(
                 g.user, "menu_access", view_menus_name=menu_names
@@ -2042,33 +2368,109 @@ class BaseSecurityManager(AbstractSecurityManager):
             role_admin = self.find_role(self.auth_role_admin)
             self.add_permission_role(role_admin, pv)
 
-    def security_cleanup(self, baseviews, menus):
+    def get_permissions_fingerprint(
+        self, view_permissions: Dict[str, Set[str]], menus: Set[str]
+    ) -> str:
+        """
+        Returns a hash of the permissions needed by the registered views
+        and menus, and of the admin role they are granted to
+
+        :param view_permissions: A dict of view name to its base permissions
+        :param menus: A set of menu names
+        """
+        if self.auth_role_admin in self.builtin_roles:
+            role_admin = None
+        else:
+            role_admin = self.auth_role_admin
+        state = {
+            "views": {name: sorted(perms) for name, perms in view_permissions.items()},
+            "menus": sorted(menus),
+            "admin": role_admin,
+        }
+        return hashlib.sha256(
+            json.dumps(state, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def sync_permissions(
+        self,
+        view_permissions: Dict[str, Set[str]],
+        menus: Set[str],
+        force: bool = False,
+    ) -> bool:
+        """
+        Bulk version of `add_permissions_view` and `add_permissions_menu` for
+        all registered views and menus. Skipped when the fingerprint of the
+        registered permissions matches the one stored by the last sync
+
+        :param view_permissions: A dict of view name to its base permissions
+        :param menus: A set of menu names
+        :param force: Sync even if the fingerprint is unchanged
+        :return: True if synced or skipped, False if the sync failed
+        """
+        fingerprint = self.get_permissions_fingerprint(view_permissions, menus)
+        if not force and fingerprint == self.find_permissions_fingerprint():
+            log.info(LOGMSG_INF_SEC_SYNC_PERMS_SKIP)
+            return True
+        return self.bulk_sync_permissions(view_permissions, menus, fingerprint)
+
+    def find_permissions_fingerprint(self) -> Optional[str]:
+        """
+        Returns the fingerprint stored by the last permissions sync
+
+        Override in subclass to provide storage-specific implementation.
+        """
+        raise NotImplementedError
+
+    def bulk_sync_permissions(
+        self,
+        view_permissions: Dict[str, Set[str]],
+        menus: Set[str],
+        fingerprint: str,
+    ) -> bool:
+        """
+        Applies the difference between the registered and the stored
+        permissions in one transaction, and stores the new fingerprint
+
+        Override in subclass to provide storage-specific implementation.
+
+        :param view_permissions: A dict of view name to its base permissions
+        :param menus: A set of menu names
+        :param fingerprint: The fingerprint to store
+        :return: True on success, False on error
+        """
+        raise NotImplementedError
+
+    def security_cleanup(self, baseviews, menus, dry: bool = False) -> Dict[str, Any]:
         """
         Will cleanup all unused permissions from the database
 
         :param baseviews: A list of BaseViews class
         :param menus: Menu class
+        :param dry: If True will not change DB, only report the affected rows
+        :return: Dict with the affected rows by the cleanup and the elapsed time
+        """
+        view_menu_names = {baseview.class_permission_name for baseview in baseviews}
+        view_menu_names.update(menus.get_flat_name_list())
+        report = self.apply_security_cleanup(view_menu_names, dry=dry)
+        if not dry:
+            log.info(LOGMSG_INF_SEC_CLEANUP, report)
+            self.security_converge(baseviews, menus)
+        return report
+
+    def apply_security_cleanup(
+        self, view_menu_names: Set[str], dry: bool = False
+    ) -> Dict[str, Any]:
         """
-        viewsmenus = self.get_all_view_menu()
-        roles = self.get_all_roles()
-        for viewmenu in viewsmenus:
-            found = False
-            for baseview in baseviews:
-                if viewmenu.name == baseview.class_permission_name:
-                    found = True
-                    break
-            if menus.find(viewmenu.name):
-                found = True
-            if not found:
-                permissions = self.find_permissions_view_menu(viewmenu)
-                for permission in permissions:
-                    for role in roles:
-                        self.del_permission_role(role, permission)
-                    self.del_permission_view_menu(
-                        permission.permission.name, viewmenu.name
-                    )
-                self.del_view_menu(viewmenu.name)
-        self.security_converge(baseviews, menus)
+        Deletes all views and menus not in view_menu_names, with their
+        permissions on roles and the permissions left unused, in one transaction
+
+        Override in subclass to provide storage-specific implementation.
+
+        :param view_menu_names: The names of all registered views and menus
+        :param dry: If True rolls back, only reports the affected rows
+        :return: Dict with the affected rows and the elapsed time
+        """
+        raise NotImplementedError
 
     @staticmethod
     def _get_new_old_permissions(baseview) -> Dict:
@@ -2214,32 +2616,25 @@ class BaseSecurityManager(AbstractSecurityManager):
             log.info("No state transitions found")
             return dict()
         log.debug("State transitions: %s", state_transitions)
-        roles = self.get_all_roles()
-        for role in roles:
-            permissions = list(role.permissions)
-            for pvm in permissions:
-                new_pvm_states = state_transitions["add"].get(
-                    (pvm.view_menu.name, pvm.permission.name)
-                )
-                if not new_pvm_states:
-                    continue
-                for new_pvm_state in new_pvm_states:
-                    new_pvm = self.add_permission_view_menu(
-                        new_pvm_state[1], new_pvm_state[0]
-                    )
-                    self.add_permission_role(role, new_pvm)
-                if (pvm.view_menu.name, pvm.permission.name) in state_transitions[
-                    "del_role_pvm"
-                ]:
-                    self.del_permission_role(role, pvm)
-        for pvm in state_transitions["del_role_pvm"]:
-            self.del_permission_view_menu(pvm[1], pvm[0], cascade=False)
-        for view_name in state_transitions["del_views"]:
-            self.del_view_menu(view_name)
-        for permission_name in state_transitions["del_perms"]:
-            self.del_permission(permission_name)
+        report = self.apply_security_converge(state_transitions)
+        log.info(LOGMSG_INF_SEC_CONVERGE, report)
         return state_transitions
 
+    def apply_security_converge(
+        self, state_transitions: Dict, dry: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Applies the state transitions computed by `create_state_transitions`
+        to all roles at once, in one transaction
+
+        Override in subclass to provide storage-specific implementation.
+
+        :param state_transitions: Dict with the state transitions
+        :param dry: If True rolls back, only reports the affected rows
+        :return: Dict with the affected rows and the elapsed time
+        """
+        raise NotImplementedError
+
     """
      ---------------------------
      INTERFACE ABSTRACT METHODS
@@ -2391,6 +2786,15 @@ class BaseSecurityManager(AbstractSecurityManager):
         """
         raise NotImplementedError
 
+    def find_roles_permissions(
+        self, role_ids: List[int], view_names: Optional[List[str]] = None
+    ) -> Set[Tuple[str, str]]:
+        """
+        Returns all (permission name, view menu name) for a group of roles,
+        optionally only for some view menus
+        """
+        raise NotImplementedError
+
     def add_permission(self, name):
         """
         Adds a permission to the backend, model permission
@@ -2571,6 +2975,24 @@ class BaseSecurityManager(AbstractSecurityManager):
         """
         raise NotImplementedError
 
+    def invalidate_api_key_cache(self, lookup_hash: str) -> None:
+        """
+        Removes a verified API key from the cache, the next request using it
+        is fully verified again
+
+        :param lookup_hash: The API key lookup hash
+        """
+        self._api_keys_cache.delete(lookup_hash)
+
+    def invalidate_user_api_keys_cache(self, user_id: int) -> None:
+        """
+        Removes all verified API keys of a user from the cache,
+        used when a user is deactivated
+
+        :param user_id: The user's ID
+        """
+        self._api_keys_cache.delete_if(lambda _, value: value.user_id == user_id)
+
     def create_api_key(
         self,
         user: Any,
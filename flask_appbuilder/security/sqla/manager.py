@@ -5,7 +5,8 @@ import hashlib
 import json
 import logging
 import secrets
-from typing import Any, Dict, List, Optional, Tuple, Union
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 import uuid
 
 from flask import current_app, g, has_app_context
@@ -46,20 +47,143 @@ from flask_appbuilder.security.sqla.models import (
     assoc_permissionview_role,
     Group,
     Permission,
+    PermissionsFingerprint,
     PermissionView,
     RegisterUser,
     Role,
     User,
     ViewMenu,
 )
-from sqlalchemy import and_, func, literal, update
+from sqlalchemy import (
+    and_,
+    bindparam,
+    delete,
+    event,
+    func,
+    insert,
+    literal,
+    select,
+    Table,
+    update,
+)
 from sqlalchemy import inspect
-from sqlalchemy.orm import contains_eager
+from sqlalchemy.exc import IntegrityError, InvalidRequestError
+from sqlalchemy.orm import contains_eager, object_session, selectinload, Session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.orm.exc import MultipleResultsFound
 from werkzeug.security import check_password_hash, generate_password_hash
 
 log = logging.getLogger(__name__)
 
+_USERS_CHANGED_SESSION_KEY = "fab_users_changed"
+_PERMISSIONS_CHANGED_SESSION_KEY = "fab_permissions_changed"
+_API_KEYS_CHANGED_SESSION_KEY = "fab_api_keys_changed"
+
+
+def _on_role_permissions_change(target: Any, *args: Any, **kwargs: Any) -> None:
+    """
+    Flags the session when a role's permissions are changed outside the
+    security manager, on role views or APIs. The compiled permission sets
+    are invalidated when the session commits, so that a concurrent request
+    can't compile the old permissions under the new version
+    """
+    session = object_session(target)
+    if session is not None:
+        session.info[_PERMISSIONS_CHANGED_SESSION_KEY] = True
+
+
+def _on_permission_view_delete(mapper: Any, connection: Any, target: Any) -> None:
+    """
+    Flags the session when permissions on views or view menus are deleted
+    """
+    session = object_session(target)
+    if session is not None:
+        session.info[_PERMISSIONS_CHANGED_SESSION_KEY] = True
+
+
+def _on_user_active_change(
+    target: Any, value: Any, oldvalue: Any, *args: Any, **kwargs: Any
+) -> None:
+    """
+    Drops the cached verified API keys of a user when it's deactivated,
+    on user views, APIs or the security manager
+    """
+    if value or target.id is None or not has_app_context():
+        return
+    appbuilder = getattr(current_app, "appbuilder", None)
+    if appbuilder and appbuilder.sm:
+        appbuilder.sm.invalidate_user_api_keys_cache(target.id)
+
+
+def _on_api_key_change(target: Any, *args: Any, **kwargs: Any) -> None:
+    """
+    Flags an API key's lookup hash on the session when it's deactivated,
+    revoked, has its expiration changed or is deleted, outside the security
+    manager. The verified key is dropped from the cache when the session
+    commits
+    """
+    session = object_session(target)
+    if session is not None and target.lookup_hash:
+        session.info.setdefault(_API_KEYS_CHANGED_SESSION_KEY, set()).add(
+            target.lookup_hash
+        )
+
+
+def _on_api_key_delete(mapper: Any, connection: Any, target: Any) -> None:
+    _on_api_key_change(target)
+
+
+def _on_user_change(mapper: Any, connection: Any, target: Any) -> None:
+    """
+    Flags the session when users, roles or groups are updated or deleted,
+    on views, APIs or the security manager. The cached user snapshots are
+    invalidated when the session commits, so that a concurrent request
+    can't cache the old rows under the new version
+    """
+    session = object_session(target)
+    if session is not None:
+        session.info[_USERS_CHANGED_SESSION_KEY] = True
+
+
+def _on_session_commit(session: Session) -> None:
+    """
+    Invalidates the cached user snapshots, compiled permission sets
+    and verified API keys after a commit of flagged changes
+    """
+    users_changed = session.info.pop(_USERS_CHANGED_SESSION_KEY, False)
+    permissions_changed = session.info.pop(_PERMISSIONS_CHANGED_SESSION_KEY, False)
+    api_keys_changed = session.info.pop(_API_KEYS_CHANGED_SESSION_KEY, set())
+    if not (users_changed or permissions_changed or api_keys_changed):
+        return
+    if not has_app_context():
+        return
+    appbuilder = getattr(current_app, "appbuilder", None)
+    if appbuilder and appbuilder.sm:
+        if users_changed:
+            appbuilder.sm.bump_users_version()
+        if permissions_changed:
+            appbuilder.sm.bump_permissions_version()
+        for lookup_hash in api_keys_changed:
+            appbuilder.sm.invalidate_api_key_cache(lookup_hash)
+
+
+def _on_session_rollback(session: Session) -> None:
+    session.info.pop(_USERS_CHANGED_SESSION_KEY, None)
+    session.info.pop(_PERMISSIONS_CHANGED_SESSION_KEY, None)
+    session.info.pop(_API_KEYS_CHANGED_SESSION_KEY, None)
+
+
+class VerifiedApiKey(NamedTuple):
+    """
+    The state of a successfully verified API key, cached by lookup hash.
+    The key's user was active when verified, the entry is dropped when the
+    user is deactivated
+    """
+
+    api_key_id: int
+    user_id: int
+    expires_on: Optional[datetime]
+
 
 class SecurityManager(BaseSecurityManager):
     """
@@ -80,6 +204,7 @@ class SecurityManager(BaseSecurityManager):
     permissionview_model = PermissionView
     registeruser_model = RegisterUser
     api_key_model = ApiKey
+    permissions_fingerprint_model = PermissionsFingerprint
 
     # APIs
     permission_api = PermissionApi
@@ -248,6 +373,39 @@ class SecurityManager(BaseSecurityManager):
         self.permissionviewmodelview.datamodel = SQLAInterface(
             self.permissionview_model
         )
+        for identifier in ("append", "remove", "bulk_replace"):
+            if not event.contains(
+                self.role_model.permissions, identifier, _on_role_permissions_change
+            ):
+                event.listen(
+                    self.role_model.permissions,
+                    identifier,
+                    _on_role_permissions_change,
+                )
+        if not event.contains(self.user_model.active, "set", _on_user_active_change):
+            event.listen(self.user_model.active, "set", _on_user_active_change)
+        for attribute in (
+            self.api_key_model.active,
+            self.api_key_model.revoked_on,
+            self.api_key_model.expires_on,
+        ):
+            if not event.contains(attribute, "set", _on_api_key_change):
+                event.listen(attribute, "set", _on_api_key_change)
+        if not event.contains(self.api_key_model, "after_delete", _on_api_key_delete):
+            event.listen(self.api_key_model, "after_delete", _on_api_key_delete)
+        for model in (self.user_model, self.role_model, self.group_model):
+            for identifier in ("after_update", "after_delete"):
+                if not event.contains(model, identifier, _on_user_change):
+                    event.listen(model, identifier, _on_user_change)
+        for model in (self.permissionview_model, self.viewmenu_model):
+            if not event.contains(model, "after_delete", _on_permission_view_delete):
+                event.listen(model, "after_delete", _on_permission_view_delete)
+        for identifier, listener in (
+            ("after_commit", _on_session_commit),
+            ("after_rollback", _on_session_rollback),
+        ):
+            if not event.contains(Session, identifier, listener):
+                event.listen(Session, identifier, listener)
         self.create_db()
 
     @property
@@ -286,6 +444,7 @@ class SecurityManager(BaseSecurityManager):
             "ab_user" not in existing_tables
             or "ab_group" not in existing_tables
             or "ab_api_key" not in existing_tables
+            or "ab_permissions_fingerprint" not in existing_tables
         ):
             log.info(c.LOGMSG_INF_SEC_NO_DB)
             Model.metadata.create_all(engine)
@@ -516,6 +675,7 @@ class SecurityManager(BaseSecurityManager):
 
             if commit:
                 self.session.commit()
+                self.bump_users_version()
                 log.info(c.LOGMSG_INF_SEC_UPD_USER, user)
                 # Post-commit signal - for notifications only
                 self._emit_post_signal(
@@ -528,7 +688,53 @@ class SecurityManager(BaseSecurityManager):
             return False
 
     def get_user_by_id(self, pk):
-        return self.session.get(self.user_model, pk)
+        """
+        Returns a user with its roles, groups and groups roles eager loaded.
+
+        With FAB_USER_CACHE_ENABLED, a detached snapshot of the loaded user
+        is cached by id and users version, and merged back into the session
+        without querying the database
+
+        :param pk: The user's id
+        """
+        if not self.user_cache_enabled:
+            return self._get_user_by_id(pk)
+        version = self._users_version
+        snapshot = self._users_cache.get((version, pk))
+        if snapshot is not None:
+            return self.session.merge(snapshot, load=False)
+        user = self._get_user_by_id(pk)
+        snapshot = self._get_user_snapshot(user) if user is not None else None
+        if snapshot is not None:
+            self._users_cache.set((version, pk), snapshot)
+        return user
+
+    def _get_user_by_id(self, pk):
+        return self.session.get(
+            self.user_model,
+            pk,
+            options=[
+                selectinload(self.user_model.roles),
+                selectinload(self.user_model.groups).selectinload(
+                    self.group_model.roles
+                ),
+            ],
+        )
+
+    @staticmethod
+    def _get_user_snapshot(user):
+        """
+        Returns a detached copy of a loaded user, with its loaded
+        relationships, that is never expired by the request's session
+        """
+        session = Session()
+        try:
+            return session.merge(user, load=False)
+        except InvalidRequestError:
+            # The user or its roles have pending changes on this session
+            return None
+        finally:
+            session.close()
 
     def delete_user(self, user_or_id, commit: bool = True) -> bool:
         """
@@ -660,6 +866,7 @@ class SecurityManager(BaseSecurityManager):
 
             if commit:
                 self.session.commit()
+                self.bump_permissions_version()
                 log.info(c.LOGMSG_INF_SEC_UPD_ROLE, role)
                 # Post-commit signal
                 self._emit_post_signal(
@@ -867,6 +1074,40 @@ class SecurityManager(BaseSecurityManager):
             return self.session.query(literal(True)).filter(q).scalar()
         return self.session.query(q).scalar()
 
+    def find_roles_permissions(
+        self, role_ids: List[int], view_names: Optional[List[str]] = None
+    ) -> Set[Tuple[str, str]]:
+        """
+        Returns all (permission name, view menu name) tuples granted to a list
+        of role id's, on one single query. This is used to compile the
+        permission sets cached by `has_access`, and by `has_access_batch`
+
+        :param role_ids: a list of Role ids
+        :param view_names: Optional list of view menu names to restrict to
+        :return: Set of (permission name, view menu name) tuples
+        """
+        query = (
+            self.session.query(self.permission_model.name, self.viewmenu_model.name)
+            .select_from(self.permissionview_model)
+            .join(
+                assoc_permissionview_role,
+                self.permissionview_model.id
+                == assoc_permissionview_role.c.permission_view_id,
+            )
+            .join(
+                self.permission_model,
+                self.permissionview_model.permission_id == self.permission_model.id,
+            )
+            .join(
+                self.viewmenu_model,
+                self.permissionview_model.view_menu_id == self.viewmenu_model.id,
+            )
+            .filter(assoc_permissionview_role.c.role_id.in_(role_ids))
+        )
+        if view_names is not None:
+            query = query.filter(self.viewmenu_model.name.in_(view_names))
+        return set(query.all())
+
     def find_roles_permission_view_menus(
         self, permission_name: str, role_ids: List[int]
     ):
@@ -1191,6 +1432,7 @@ class SecurityManager(BaseSecurityManager):
                 role.permissions.append(perm_view)
                 self.session.merge(role)
                 self.session.commit()
+                self.bump_permissions_version()
                 log.info(c.LOGMSG_INF_SEC_ADD_PERMROLE, perm_view, role.name)
             except Exception as e:
                 log.error(c.LOGMSG_ERR_SEC_ADD_PERMROLE, e)
@@ -1210,11 +1452,392 @@ class SecurityManager(BaseSecurityManager):
                 role.permissions.remove(perm_view)
                 self.session.merge(role)
                 self.session.commit()
+                self.bump_permissions_version()
                 log.info(c.LOGMSG_INF_SEC_DEL_PERMROLE, perm_view, role.name)
             except Exception as e:
                 log.error(c.LOGMSG_ERR_SEC_DEL_PERMROLE, e)
                 self.session.rollback()
 
+    def find_permissions_fingerprint(self) -> Optional[str]:
+        try:
+            return (
+                self.session.query(self.permissions_fingerprint_model.fingerprint)
+                .limit(1)
+                .scalar()
+            )
+        except Exception as e:
+            log.warning("Could not read the permissions fingerprint: %s", e)
+            self.session.rollback()
+            return None
+
+    def _bulk_add_names(self, table: Table, names: Set[str]) -> Dict[str, int]:
+        """
+        Inserts missing names on the permission or view menu table
+
+        :return: A dict of all the table's names to ids
+        """
+        query = select(table.c.name, table.c.id)
+        ids = dict(self.session.execute(query).all())
+        missing = names - ids.keys()
+        if missing:
+            self.session.execute(
+                insert(table), [{"name": name} for name in sorted(missing)]
+            )
+            ids = dict(self.session.execute(query).all())
+        return ids
+
+    def _get_permission_view_ids(self) -> Dict[Tuple[int, int], int]:
+        """
+        :return: A dict of (permission id, view menu id) to permission view id
+        """
+        pv_table = self.permissionview_model.__table__
+        query = select(pv_table.c.permission_id, pv_table.c.view_menu_id, pv_table.c.id)
+        return {(row[0], row[1]): row[2] for row in self.session.execute(query)}
+
+    def _get_names_ids(self, table: Table) -> Dict[str, int]:
+        return dict(self.session.execute(select(table.c.name, table.c.id)).all())
+
+    def _get_roles_by_permission_view(self, pv_ids: Set[int]) -> Dict[int, Set[int]]:
+        """
+        :return: A dict of permission view id to the ids of the roles granted it
+        """
+        roles: Dict[int, Set[int]] = {}
+        if not pv_ids:
+            return roles
+        query = select(
+            assoc_permissionview_role.c.permission_view_id,
+            assoc_permissionview_role.c.role_id,
+        ).where(assoc_permissionview_role.c.permission_view_id.in_(pv_ids))
+        for pv_id, role_id in self.session.execute(query):
+            roles.setdefault(pv_id, set()).add(role_id)
+        return roles
+
+    def _bulk_del_permission_views(self, pv_ids: Set[int]) -> Tuple[int, int]:
+        """
+        Deletes permission views and their grants on all roles
+
+        :return: A tuple with the deleted role grants and permission views
+        """
+        if not pv_ids:
+            return 0, 0
+        pv_table = self.permissionview_model.__table__
+        del_role_pvm = self.session.execute(
+            delete(assoc_permissionview_role).where(
+                assoc_permissionview_role.c.permission_view_id.in_(pv_ids)
+            )
+        ).rowcount
+        del_pvm = self.session.execute(
+            delete(pv_table).where(pv_table.c.id.in_(pv_ids))
+        ).rowcount
+        return del_role_pvm, del_pvm
+
+    def _bulk_del_unused_names(self, table: Table, column: Any, ids: Set[int]) -> int:
+        """
+        Deletes the permissions or view menus in ids not referenced
+        by any permission view
+
+        :return: The number of deleted rows
+        """
+        if not ids:
+            return 0
+        return self.session.execute(
+            delete(table).where(
+                table.c.id.in_(ids),
+                table.c.id.not_in(select(column).where(column.is_not(None))),
+            )
+        ).rowcount
+
+    def _end_bulk_security_change(
+        self, report: Dict[str, Any], start: float, dry: bool
+    ) -> Dict[str, Any]:
+        report["elapsed"] = time.perf_counter() - start
+        if dry:
+            self.session.rollback()
+            return report
+        self.session.commit()
+        self.bump_permissions_version()
+        return report
+
+    def apply_security_converge(
+        self, state_transitions: Dict, dry: bool = False
+    ) -> Dict[str, Any]:
+        start = time.perf_counter()
+        pv_table = self.permissionview_model.__table__
+        permission_table = self.permission_model.__table__
+        viewmenu_table = self.viewmenu_model.__table__
+        report: Dict[str, Any] = {}
+        try:
+            view_menu_ids = self._get_names_ids(viewmenu_table)
+            permission_ids = self._get_names_ids(permission_table)
+            pvs = self._get_permission_view_ids()
+
+            def get_pv_id(view_name: str, permission_name: str) -> Optional[int]:
+                return pvs.get(
+                    (permission_ids.get(permission_name), view_menu_ids.get(view_name))
+                )
+
+            old_pv_ids = {
+                old_pvm: get_pv_id(*old_pvm) for old_pvm in state_transitions["add"]
+            }
+            old_roles = self._get_roles_by_permission_view(
+                {pv_id for pv_id in old_pv_ids.values() if pv_id is not None}
+            )
+            # Only permissions granted on some role are converged
+            new_pvms = {
+                new_pvm
+                for old_pvm, targets in state_transitions["add"].items()
+                if old_pv_ids[old_pvm] in old_roles
+                for new_pvm in targets
+            }
+            view_menu_ids = self._bulk_add_names(
+                viewmenu_table, {view_name for view_name, _ in new_pvms}
+            )
+            permission_ids = self._bulk_add_names(
+                permission_table, {permission_name for _, permission_name in new_pvms}
+            )
+            missing_pvs = {
+                (permission_ids[permission_name], view_menu_ids[view_name])
+                for view_name, permission_name in new_pvms
+            } - pvs.keys()
+            if missing_pvs:
+                self.session.execute(
+                    insert(pv_table),
+                    [
+                        {"permission_id": permission_id, "view_menu_id": view_menu_id}
+                        for permission_id, view_menu_id in sorted(missing_pvs)
+                    ],
+                )
+                pvs = self._get_permission_view_ids()
+            new_roles = self._get_roles_by_permission_view(
+                {get_pv_id(*new_pvm) for new_pvm in new_pvms}
+            )
+            grants = {
+                (get_pv_id(*new_pvm), role_id)
+                for old_pvm, targets in state_transitions["add"].items()
+                for role_id in old_roles.get(old_pv_ids[old_pvm], ())
+                for new_pvm in targets
+            }
+            grants = {
+                (pv_id, role_id)
+                for pv_id, role_id in grants
+                if role_id not in new_roles.get(pv_id, ())
+            }
+            if grants:
+                self.session.execute(
+                    insert(assoc_permissionview_role),
+                    [
+                        {"permission_view_id": pv_id, "role_id": role_id}
+                        for pv_id, role_id in sorted(grants)
+                    ],
+                )
+            del_pv_ids = {
+                get_pv_id(*pvm) for pvm in state_transitions["del_role_pvm"]
+            } - {None}
+            del_role_pvm, del_pvm = self._bulk_del_permission_views(del_pv_ids)
+            report = {
+                "add_pvm": len(missing_pvs),
+                "add_role_pvm": len(grants),
+                "del_role_pvm": del_role_pvm,
+                "del_pvm": del_pvm,
+                "del_views": self._bulk_del_unused_names(
+                    viewmenu_table,
+                    pv_table.c.view_menu_id,
+                    {
+                        view_menu_ids[name]
+                        for name in state_transitions["del_views"]
+                        if name in view_menu_ids
+                    },
+                ),
+                "del_perms": self._bulk_del_unused_names(
+                    permission_table,
+                    pv_table.c.permission_id,
+                    {
+                        permission_ids[name]
+                        for name in state_transitions["del_perms"]
+                        if name in permission_ids
+                    },
+                ),
+            }
+            return self._end_bulk_security_change(report, start, dry)
+        except Exception as e:
+            log.error(c.LOGMSG_ERR_SEC_CONVERGE, e)
+            self.session.rollback()
+            return report
+
+    def apply_security_cleanup(
+        self, view_menu_names: Set[str], dry: bool = False
+    ) -> Dict[str, Any]:
+        start = time.perf_counter()
+        pv_table = self.permissionview_model.__table__
+        report: Dict[str, Any] = {}
+        try:
+            unused_view_menu_ids = {
+                id_
+                for name, id_ in self._get_names_ids(
+                    self.viewmenu_model.__table__
+                ).items()
+                if name not in view_menu_names
+            }
+            unused_pvs = {
+                key: pv_id
+                for key, pv_id in self._get_permission_view_ids().items()
+                if key[1] in unused_view_menu_ids
+            }
+            del_role_pvm, del_pvm = self._bulk_del_permission_views(
+                set(unused_pvs.values())
+            )
+            report = {
+                "add_pvm": 0,
+                "add_role_pvm": 0,
+                "del_role_pvm": del_role_pvm,
+                "del_pvm": del_pvm,
+                "del_views": self._bulk_del_unused_names(
+                    self.viewmenu_model.__table__,
+                    pv_table.c.view_menu_id,
+                    unused_view_menu_ids,
+                ),
+                "del_perms": self._bulk_del_unused_names(
+                    self.permission_model.__table__,
+                    pv_table.c.permission_id,
+                    {key[0] for key in unused_pvs} - {None},
+                ),
+            }
+            return self._end_bulk_security_change(report, start, dry)
+        except Exception as e:
+            log.error(c.LOGMSG_ERR_SEC_CLEANUP, e)
+            self.session.rollback()
+            return report
+
+    def bulk_sync_permissions(
+        self,
+        view_permissions: Dict[str, Set[str]],
+        menus: Set[str],
+        fingerprint: str,
+    ) -> bool:
+        desired: Dict[str, Set[str]] = {
+            name: set(permissions) for name, permissions in view_permissions.items()
+        }
+        for name in menus:
+            desired.setdefault(name, set()).add("menu_access")
+        try:
+            try:
+                counts = self._bulk_sync_permissions(view_permissions, desired)
+            except IntegrityError:
+                # Another process added the same rows concurrently, re-read them
+                self.session.rollback()
+                counts = self._bulk_sync_permissions(view_permissions, desired)
+        except Exception as e:
+            log.error(c.LOGMSG_ERR_SEC_SYNC_PERMS, e)
+            self.session.rollback()
+            return False
+        self.bump_permissions_version()
+        log.info(c.LOGMSG_INF_SEC_SYNC_PERMS, *counts)
+        self._store_permissions_fingerprint(fingerprint)
+        return True
+
+    def _bulk_sync_permissions(
+        self, view_permissions: Dict[str, Set[str]], desired: Dict[str, Set[str]]
+    ) -> Tuple[int, int, int]:
+        """
+        Adds the missing and deletes the stale permissions on views, and
+        grants the added ones to the admin role, then commits
+
+        :return: The number of added, deleted and granted permission views
+        """
+        pv_table = self.permissionview_model.__table__
+        permission_table = self.permission_model.__table__
+        view_menu_ids = self._bulk_add_names(
+            self.viewmenu_model.__table__, set(desired)
+        )
+        permission_ids = self._bulk_add_names(
+            permission_table, set().union(*desired.values())
+        )
+        pvs = self._get_permission_view_ids()
+        desired_pvs = {
+            (permission_ids[permission], view_menu_ids[name])
+            for name, permissions in desired.items()
+            for permission in permissions
+        }
+        missing_pvs = desired_pvs - pvs.keys()
+        if missing_pvs:
+            self.session.execute(
+                insert(pv_table),
+                [
+                    {"permission_id": permission_id, "view_menu_id": view_menu_id}
+                    for permission_id, view_menu_id in sorted(missing_pvs)
+                ],
+            )
+            pvs = self._get_permission_view_ids()
+        # Permissions no longer exposed by a view, menus are only added
+        view_menu_names = {view_menu_ids[name]: name for name in view_permissions}
+        permission_names = {id_: name for name, id_ in permission_ids.items()}
+        stale_pvs = {
+            (permission_id, view_menu_id): pv_id
+            for (permission_id, view_menu_id), pv_id in pvs.items()
+            if view_menu_id in view_menu_names
+            and permission_id is not None
+            and permission_names[permission_id]
+            not in desired[view_menu_names[view_menu_id]]
+        }
+        if stale_pvs:
+            stale_pv_ids = list(stale_pvs.values())
+            stale_permission_ids = {key[0] for key in stale_pvs}
+            self.session.execute(
+                delete(assoc_permissionview_role).where(
+                    assoc_permissionview_role.c.permission_view_id.in_(stale_pv_ids)
+                )
+            )
+            self.session.execute(
+                delete(pv_table).where(pv_table.c.id.in_(stale_pv_ids))
+            )
+            # Remove permissions left without any permission view
+            self.session.execute(
+                delete(permission_table).where(
+                    permission_table.c.id.in_(stale_permission_ids),
+                    permission_table.c.id.not_in(
+                        select(pv_table.c.permission_id).where(
+                            pv_table.c.permission_id.in_(stale_permission_ids)
+                        )
+                    ),
+                )
+            )
+        granted_pv_ids: Set[int] = set()
+        role_admin = None
+        if self.auth_role_admin not in self.builtin_roles:
+            role_admin = self.find_role(self.auth_role_admin)
+        if role_admin:
+            admin_pv_ids = set(
+                self.session.execute(
+                    select(assoc_permissionview_role.c.permission_view_id).where(
+                        assoc_permissionview_role.c.role_id == role_admin.id
+                    )
+                ).scalars()
+            )
+            granted_pv_ids = {pvs[key] for key in desired_pvs} - admin_pv_ids
+            if granted_pv_ids:
+                self.session.execute(
+                    insert(assoc_permissionview_role),
+                    [
+                        {"permission_view_id": pv_id, "role_id": role_admin.id}
+                        for pv_id in sorted(granted_pv_ids)
+                    ],
+                )
+        self.session.commit()
+        return len(missing_pvs), len(stale_pvs), len(granted_pv_ids)
+
+    def _store_permissions_fingerprint(self, fingerprint: str) -> None:
+        try:
+            row = self.session.query(self.permissions_fingerprint_model).first()
+            if row is None:
+                row = self.permissions_fingerprint_model()
+                self.session.add(row)
+            row.fingerprint = fingerprint
+            row.changed_on = datetime.now()
+            self.session.commit()
+        except Exception as e:
+            log.error(c.LOGMSG_ERR_SEC_SYNC_PERMS, e)
+            self.session.rollback()
+
     def export_roles(
         self, path: Optional[str] = None, indent: Optional[Union[int, str]] = None
     ) -> None:
@@ -1310,8 +1933,18 @@ class SecurityManager(BaseSecurityManager):
         Uses a fast lookup hash (indexed, unique) for O(1) retrieval,
         then verifies against the slow key_hash for defense in depth.
         Updates last_used_on, sets g.user and g._api_key_user.
+
+        With FAB_API_KEY_CACHE_ENABLED, verified keys are cached by lookup
+        hash, so repeated requests skip the slow hash and the key query,
+        and last_used_on is always buffered and written in bulk. Together
+        with FAB_USER_CACHE_ENABLED a cached key is validated without
+        querying the database.
         """
         lookup = self._compute_lookup_hash(api_key_string)
+        if self.api_key_cache_enabled:
+            verified = self._api_keys_cache.get(lookup)
+            if verified is not None:
+                return self._validate_verified_api_key(lookup, verified)
         api_key = (
             self.session.query(self.api_key_model)
             .filter(self.api_key_model.lookup_hash == lookup)
@@ -1329,14 +1962,95 @@ class SecurityManager(BaseSecurityManager):
         if not user or not user.is_active:
             log.warning("API key '%s' user is not active", api_key.name)
             return None
+        if self.api_key_cache_enabled:
+            self._api_keys_cache.set(
+                lookup,
+                VerifiedApiKey(api_key.id, user.id, api_key.expires_on),
+            )
         # Update last_used_on
-        api_key.last_used_on = datetime.now()
-        self.session.commit()
+        if self.usage_stats_write_behind or self.api_key_cache_enabled:
+            self.record_api_key_usage(api_key.id)
+        else:
+            api_key.last_used_on = datetime.now()
+            self.session.commit()
         # Set Flask globals
         g.user = user
         g._api_key_user = True
         return user
 
+    def _validate_verified_api_key(
+        self, lookup: str, verified: VerifiedApiKey
+    ) -> Optional[User]:
+        """
+        Validates an API key served from the verified keys cache,
+        only the key expiration is checked. The user is loaded with
+        get_user_by_id, served from the users cache when enabled
+        """
+        if verified.expires_on is not None and verified.expires_on < datetime.now():
+            self.invalidate_api_key_cache(lookup)
+            return None
+        user = self.get_user_by_id(verified.user_id)
+        if not user or not user.is_active:
+            log.warning("API key user %s is not active", verified.user_id)
+            self.invalidate_api_key_cache(lookup)
+            return None
+        self.record_api_key_usage(verified.api_key_id)
+        g.user = user
+        g._api_key_user = True
+        return user
+
+    def record_user_login(self, user: Any) -> None:
+        """
+        Buffers a successful login and updates login_count and last_login
+        of the loaded user, without marking them for a write
+        """
+        set_committed_value(user, "login_count", (user.login_count or 0) + 1)
+        set_committed_value(user, "last_login", datetime.now())
+        super().record_user_login(user)
+
+    def update_usage_stats(
+        self,
+        api_keys_used_on: Dict[int, datetime],
+        logins: Dict[int, Tuple[int, datetime]],
+    ) -> bool:
+        """
+        Bulk updates API keys last_used_on and users login stats,
+        one executemany UPDATE per table
+        """
+        api_key_table = self.api_key_model.__table__
+        user_table = self.user_model.__table__
+        try:
+            if api_keys_used_on:
+                self.session.execute(
+                    update(api_key_table)
+                    .where(api_key_table.c.id == bindparam("b_id"))
+                    .values(last_used_on=bindparam("b_last_used_on")),
+                    [
+                        {"b_id": api_key_id, "b_last_used_on": used_on}
+                        for api_key_id, used_on in api_keys_used_on.items()
+                    ],
+                )
+            if logins:
+                self.session.execute(
+                    update(user_table)
+                    .where(user_table.c.id == bindparam("b_id"))
+                    .values(
+                        login_count=func.coalesce(user_table.c.login_count, 0)
+                        + bindparam("b_count"),
+                        last_login=bindparam("b_last_login"),
+                    ),
+                    [
+                        {"b_id": user_id, "b_count": count, "b_last_login": last_login}
+                        for user_id, (count, last_login) in logins.items()
+                    ],
+                )
+            self.session.commit()
+            return True
+        except Exception as e:
+            log.error("Error updating usage stats: %s", e)
+            self.session.rollback()
+            return False
+
     def create_api_key(
         self,
         user: Any,
@@ -1404,6 +2118,7 @@ class SecurityManager(BaseSecurityManager):
         try:
             api_key.revoked_on = datetime.now()
             self.session.commit()
+            self.invalidate_api_key_cache(api_key.lookup_hash)
             log.info("API key '%s' revoked", api_key.name)
             return True
         except Exception as e:
@@ -367,3 +367,26 @@ class ApiKey(Model):
 
     def __repr__(self):
         return f"ApiKey(name={self.name}, prefix={self.key_prefix})"
+
+
+class PermissionsFingerprint(Model):
+    __tablename__ = "ab_permissions_fingerprint"
+
+    id: Mapped[int] = mapped_column(
+        Integer,
+        Sequence(
+            "ab_permissions_fingerprint_id_seq",
+            start=1,
+            increment=1,
+            minvalue=1,
+            cycle=False,
+        ),
+        primary_key=True,
+    )
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    changed_on: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime, default=lambda: datetime.datetime.now(), nullable=True
+    )
+
+    def __repr__(self):
+        return self.fingerprint
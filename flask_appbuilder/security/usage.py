@@ -0,0 +1,101 @@
+import datetime
+import threading
+import time
+from typing import Dict, Tuple
+
+
+class UsageStatsBuffer:
+    """
+    Coalesces API key and login usage updates in memory, so that they can
+    be written to the backend in bulk instead of one commit per event.
+
+    API key uses keep the latest use, logins are counted and keep the
+    latest login, per key or user id.
+
+    :param flush_interval: Seconds after the last flush for events to
+        request a new flush
+    :param flush_max_events: Number of buffered events to request a flush
+    """
+
+    def __init__(self, flush_interval: float = 10, flush_max_events: int = 1000):
+        self.flush_interval = flush_interval
+        self.flush_max_events = flush_max_events
+        self._api_keys: Dict[int, datetime.datetime] = {}
+        self._logins: Dict[int, Tuple[int, datetime.datetime]] = {}
+        self._events = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add_api_key_use(self, api_key_id: int, used_on: datetime.datetime) -> bool:
+        """
+        Buffers an API key use
+
+        :return: True if the buffer should be flushed
+        """
+        with self._lock:
+            last_used_on = self._api_keys.get(api_key_id)
+            if last_used_on is None or last_used_on < used_on:
+                self._api_keys[api_key_id] = used_on
+            return self._add_event()
+
+    def add_login(self, user_id: int, login_on: datetime.datetime) -> bool:
+        """
+        Buffers a successful user login
+
+        :return: True if the buffer should be flushed
+        """
+        with self._lock:
+            count, last_login = self._logins.get(user_id, (0, login_on))
+            self._logins[user_id] = (count + 1, max(last_login, login_on))
+            return self._add_event()
+
+    def _add_event(self) -> bool:
+        self._events += 1
+        return (
+            self._events >= self.flush_max_events
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def drain(
+        self,
+    ) -> Tuple[Dict[int, datetime.datetime], Dict[int, Tuple[int, datetime.datetime]]]:
+        """
+        Returns and resets all buffered usage
+
+        :return: A tuple with a dict of API key id to last use and
+            a dict of user id to (login count, last login)
+        """
+        with self._lock:
+            api_keys, logins = self._api_keys, self._logins
+            self._api_keys, self._logins = {}, {}
+            self._events = 0
+            self._last_flush = time.monotonic()
+        return api_keys, logins
+
+    def restore(
+        self,
+        api_keys: Dict[int, datetime.datetime],
+        logins: Dict[int, Tuple[int, datetime.datetime]],
+    ) -> None:
+        """
+        Merges drained usage back into the buffer, used when writing it
+        to the backend failed so that it's retried on the next flush
+
+        :param api_keys: A dict of API key id to last use
+        :param logins: A dict of user id to (login count, last login)
+        """
+        with self._lock:
+            for api_key_id, used_on in api_keys.items():
+                last_used_on = self._api_keys.get(api_key_id)
+                if last_used_on is None or last_used_on < used_on:
+                    self._api_keys[api_key_id] = used_on
+            for user_id, (count, login_on) in logins.items():
+                buffered_count, last_login = self._logins.get(user_id, (0, login_on))
+                self._logins[user_id] = (
+                    buffered_count + count,
+                    max(last_login, login_on),
+                )
+            self._events += len(api_keys) + sum(count for count, _ in logins.values())
+
+    def __len__(self) -> int:
+        return self._events
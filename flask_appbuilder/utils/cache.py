@@ -0,0 +1,80 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    A small thread safe LRU cache with an optional time to live for each entry.
+
+    Used for in process caching of data that is expensive to compute
+    but cheap to keep, like compiled permission sets::
+
+        cache = TTLCache(maxsize=1024, ttl=60)
+        cache.set("key", "value")
+        cache.get("key")
+
+    :param maxsize: Maximum number of entries, least recently used entries
+        are evicted first
+    :param ttl: Time to live in seconds for each entry, 0 or None
+        disables expiration
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_on, value = entry
+            if expires_on and expires_on < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_on = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_on, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_if(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Deletes all entries for which predicate(key, value) is True
+
+        :return: the number of deleted entries
+        """
+        with self._lock:
+            keys = [
+                key for key, (_, value) in self._data.items() if predicate(key, value)
+            ]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -201,6 +201,10 @@ class ModelView(BaseCRUDView):
         except FABException as exc:
             flash(f"An error occurred: {exc}", "warning")
             return redirect(self.get_redirect())
+        if self.list_stream:
+            return self.stream_template(
+                self.list_template, title=self.list_title, widgets=widgets
+            )
         return self.render_template(
             self.list_template, title=self.list_title, widgets=widgets
         )
@@ -334,9 +338,9 @@ class ModelView(BaseCRUDView):
 
         if self.appbuilder.sm.has_access(permission_name, self.class_permission_name):
             action = self.actions.get(name)
-            items = [
-                self.datamodel.get(self._deserialize_pk_if_composite(pk)) for pk in pks
-            ]
+            items = self.datamodel.get_many(
+                [self._deserialize_pk_if_composite(pk) for pk in pks]
+            )
             return action.func(items)
         else:
             flash(as_unicode(FLAMSG_ERR_SEC_ACCESS_DENIED), "danger")
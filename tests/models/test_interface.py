@@ -1,4 +1,5 @@
 from contextlib import contextmanager
+from unittest.mock import patch
 
 from flask import Flask
 from flask_appbuilder import AppBuilder
@@ -190,3 +191,23 @@ class SQLAInterfaceTestCase(FABTestCase):
             ],
         )
         self.assertEqual(count, 2)
+
+    def test_filters_registry_shared(self):
+        interface = SQLAInterface(User)
+        filters = interface.get_filters(["username", "roles"])
+        with patch.object(
+            interface.filter_converter_class, "convert", side_effect=AssertionError
+        ):
+            other_filters = interface.get_filters(["username", "roles"])
+            interface.get_inner_filters(None)
+        self.assertIs(filters._all_filters, other_filters._all_filters)
+        self.assertEqual(
+            filters.get_search_filters()["username"],
+            other_filters.get_search_filters()["username"],
+        )
+        self.assertIsNot(
+            filters.get_search_filters()["username"],
+            other_filters.get_search_filters()["username"],
+        )
+        with self.assertRaises(TypeError):
+            filters._all_filters["username"] = []
@@ -3,11 +3,13 @@ import json
 import logging
 import os
 import unittest
+from unittest.mock import patch
 
 from flask import Flask
 from flask_appbuilder import AppBuilder
 from flask_appbuilder.security.sqla.models import ApiKey
 from flask_appbuilder.utils.legacy import get_sqla_class
+from sqlalchemy import event
 from tests.base import FABTestCase
 from tests.const import PASSWORD_ADMIN, USERNAME_ADMIN
 
@@ -173,6 +175,160 @@ class ApiKeySecurityManagerTestCase(FABTestCase):
         api_key = self.appbuilder.sm.get_api_key_by_uuid("nonexistent")
         self.assertIsNone(api_key)
 
+    def test_validate_api_key_cache(self):
+        """Verified keys skip the slow hash until revoked or user deactivated."""
+        self.app.config["FAB_API_KEY_CACHE_ENABLED"] = True
+        sm = self.appbuilder.sm
+        user = sm.find_user(USERNAME_ADMIN)
+        result = sm.create_api_key(user=user, name="cache-test")
+        raw_key = result["key"]
+
+        with patch(
+            "flask_appbuilder.security.sqla.manager.check_password_hash",
+            return_value=True,
+        ) as mock_check:
+            self.assertEqual(sm.validate_api_key(raw_key).id, user.id)
+            self.assertEqual(sm.validate_api_key(raw_key).id, user.id)
+            self.assertEqual(mock_check.call_count, 1)
+
+            user.active = False
+            self.assertEqual(len(sm._api_keys_cache), 0)
+            self.assertIsNone(sm.validate_api_key(raw_key))
+            user.active = True
+            sm.session.commit()
+
+            self.assertEqual(sm.validate_api_key(raw_key).id, user.id)
+            sm.revoke_api_key(result["uuid"])
+            self.assertIsNone(sm.validate_api_key(raw_key))
+            self.assertEqual(mock_check.call_count, 4)
+
+    def test_validate_api_key_cache_deactivated_key(self):
+        """Deactivating a key outside revoke_api_key drops it on commit."""
+        self.app.config["FAB_API_KEY_CACHE_ENABLED"] = True
+        sm = self.appbuilder.sm
+        user = sm.find_user(USERNAME_ADMIN)
+        result = sm.create_api_key(user=user, name="cache-deactivate-test")
+        self.assertIsNotNone(sm.validate_api_key(result["key"]))
+        self.assertEqual(len(sm._api_keys_cache), 1)
+
+        api_key = sm.get_api_key_by_uuid(result["uuid"])
+        api_key.active = False
+        self.assertEqual(len(sm._api_keys_cache), 1)
+        sm.session.commit()
+        self.assertEqual(len(sm._api_keys_cache), 0)
+        self.assertIsNone(sm.validate_api_key(result["key"]))
+
+    def test_validate_api_key_cache_no_queries(self):
+        """A cached key with a cached user is validated without queries."""
+        self.app.config["FAB_API_KEY_CACHE_ENABLED"] = True
+        self.app.config["FAB_USER_CACHE_ENABLED"] = True
+        sm = self.appbuilder.sm
+        sm._usage_stats.flush_interval = 3600
+        sm._usage_stats.flush_max_events = 100
+        user = sm.find_user(USERNAME_ADMIN)
+        result = sm.create_api_key(user=user, name="cache-queries-test")
+        self.assertIsNotNone(sm.validate_api_key(result["key"]))
+        self.assertIsNotNone(sm.validate_api_key(result["key"]))
+
+        statements = []
+
+        def before_execute(*args, **kwargs):
+            statements.append(args)
+
+        engine = sm.session.get_bind()
+        event.listen(engine, "before_cursor_execute", before_execute)
+        try:
+            self.assertEqual(sm.validate_api_key(result["key"]).id, user.id)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_execute)
+        self.assertEqual(statements, [])
+        self.assertEqual(len(sm._usage_stats), 3)
+        sm.flush_usage_stats()
+
+    def test_usage_stats_write_behind(self):
+        """API key uses and logins are buffered and flushed in bulk."""
+        self.app.config["FAB_USAGE_STATS_WRITE_BEHIND"] = True
+        sm = self.appbuilder.sm
+        sm._usage_stats.flush_interval = 3600
+        sm._usage_stats.flush_max_events = 100
+        user = sm.find_user(USERNAME_ADMIN)
+        login_count = user.login_count or 0
+        result = sm.create_api_key(user=user, name="write-behind-test")
+
+        self.assertIsNotNone(sm.validate_api_key(result["key"]))
+        self.assertIsNotNone(sm.validate_api_key(result["key"]))
+        sm.update_user_auth_stat(user)
+        sm.update_user_auth_stat(user)
+        self.assertEqual(len(sm._usage_stats), 4)
+        api_key = sm.get_api_key_by_uuid(result["uuid"])
+        self.assertIsNone(api_key.last_used_on)
+
+        sm.flush_usage_stats()
+        self.assertEqual(len(sm._usage_stats), 0)
+        sm.session.refresh(api_key)
+        sm.session.refresh(user)
+        self.assertIsNotNone(api_key.last_used_on)
+        self.assertEqual(user.login_count, login_count + 2)
+        self.assertIsNotNone(user.last_login)
+
+        sm._usage_stats.flush_max_events = 1
+        sm.update_user_auth_stat(user)
+        sm.session.refresh(user)
+        self.assertEqual(user.login_count, login_count + 3)
+
+    def test_usage_stats_write_behind_flush_error(self):
+        """Usage stats that fail to be written are kept for the next flush."""
+        self.app.config["FAB_USAGE_STATS_WRITE_BEHIND"] = True
+        sm = self.appbuilder.sm
+        sm._usage_stats.flush_interval = 3600
+        sm._usage_stats.flush_max_events = 100
+        user = sm.find_user(USERNAME_ADMIN)
+        login_count = user.login_count or 0
+        result = sm.create_api_key(user=user, name="flush-error-test")
+        self.assertIsNotNone(sm.validate_api_key(result["key"]))
+        sm.update_user_auth_stat(user)
+
+        with patch.object(sm.session, "execute", side_effect=Exception("error")):
+            sm.flush_usage_stats()
+        self.assertEqual(len(sm._usage_stats), 2)
+        sm.update_user_auth_stat(user)
+
+        sm.flush_usage_stats()
+        self.assertEqual(len(sm._usage_stats), 0)
+        api_key = sm.get_api_key_by_uuid(result["uuid"])
+        sm.session.refresh(api_key)
+        sm.session.refresh(user)
+        self.assertIsNotNone(api_key.last_used_on)
+        self.assertEqual(user.login_count, login_count + 2)
+
+    def test_usage_stats_write_behind_keeps_failed_logins(self):
+        """Failed logins between a buffered login and the flush are kept."""
+        self.app.config["FAB_USAGE_STATS_WRITE_BEHIND"] = True
+        sm = self.appbuilder.sm
+        sm._usage_stats.flush_interval = 3600
+        sm._usage_stats.flush_max_events = 100
+        user = sm.find_user(USERNAME_ADMIN)
+        login_count = user.login_count or 0
+
+        sm.update_user_auth_stat(user)
+        self.assertEqual(user.login_count, login_count + 1)
+        self.assertIsNotNone(user.last_login)
+        sm.update_user_auth_stat(user, success=False)
+        sm.flush_usage_stats()
+        sm.session.refresh(user)
+        self.assertEqual(user.login_count, login_count + 1)
+        self.assertEqual(user.fail_login_count, 1)
+
+        # A successful login resets the failures without waiting for a flush
+        sm.update_user_auth_stat(user)
+        sm.session.expire_all()
+        user = sm.find_user(USERNAME_ADMIN)
+        self.assertEqual(user.fail_login_count, 0)
+        self.assertEqual(user.login_count, login_count + 1)
+        sm.flush_usage_stats()
+        sm.session.refresh(user)
+        self.assertEqual(user.login_count, login_count + 2)
+
 
 class ApiKeySlowHashConfigTestCase(FABTestCase):
     """Test configurable slow hash (key_hash) algorithm."""
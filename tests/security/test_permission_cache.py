@@ -0,0 +1,333 @@
+import logging
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from flask import Flask, g
+from flask_appbuilder import AppBuilder
+from flask_appbuilder.utils.cache import TTLCache
+from flask_appbuilder.utils.legacy import get_sqla_class
+from sqlalchemy import event
+from tests.base import FABTestCase
+
+
+class TTLCacheTestCase(unittest.TestCase):
+    def test_get_set(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl_expiration(self):
+        cache = TTLCache(maxsize=2, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+class PermissionCacheTestCase(FABTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object("tests.config_api")
+        self.app.config["FAB_PERMISSION_CACHE_ENABLED"] = True
+        logging.basicConfig(level=logging.ERROR)
+
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        SQLA = get_sqla_class()
+        self.db = SQLA(self.app)
+        self.appbuilder = AppBuilder(self.app, self.db.session)
+        sm = self.appbuilder.sm
+        self.pvm = sm.add_permission_view_menu("can_list", "CachedView")
+        self.role = sm.add_role("CachedRole")
+        sm.add_permission_role(self.role, self.pvm)
+        self.user = self.create_user(
+            self.appbuilder,
+            "cached_user",
+            "password",
+            "CachedRole",
+            email="cached_user@fab.org",
+        )
+        self.statements = []
+        event.listen(self.db.engine, "before_cursor_execute", self._count_statement)
+
+    def tearDown(self):
+        event.remove(self.db.engine, "before_cursor_execute", self._count_statement)
+        sm = self.appbuilder.sm
+        self.appbuilder.session.delete(sm.find_user("cached_user"))
+        self.appbuilder.session.delete(sm.find_role("CachedRole"))
+        self.appbuilder.session.commit()
+        self.ctx.pop()
+        self.appbuilder = None
+        self.app = None
+
+    def _count_statement(self, *args, **kwargs):
+        self.statements.append(args[2])
+
+    def test_has_view_access_served_from_cache(self):
+        sm = self.appbuilder.sm
+        self.assertTrue(sm._has_view_access(self.user, "can_list", "CachedView"))
+        self.statements.clear()
+        self.assertTrue(sm._has_view_access(self.user, "can_list", "CachedView"))
+        self.assertFalse(sm._has_view_access(self.user, "can_add", "CachedView"))
+        self.assertEqual(self.statements, [])
+
+    def test_permission_role_changes_invalidate(self):
+        sm = self.appbuilder.sm
+        self.assertFalse(sm._has_view_access(self.user, "can_add", "CachedView"))
+        version = sm.permissions_version
+        pvm = sm.add_permission_view_menu("can_add", "CachedView")
+        sm.add_permission_role(self.role, pvm)
+        self.assertGreater(sm.permissions_version, version)
+        self.assertTrue(sm._has_view_access(self.user, "can_add", "CachedView"))
+
+        sm.del_permission_role(self.role, self.pvm)
+        self.assertFalse(sm._has_view_access(self.user, "can_list", "CachedView"))
+
+    def test_role_permissions_assignment_invalidates(self):
+        sm = self.appbuilder.sm
+        self.assertTrue(sm._has_view_access(self.user, "can_list", "CachedView"))
+        self.role.permissions = []
+        self.appbuilder.session.commit()
+        self.assertFalse(sm._has_view_access(self.user, "can_list", "CachedView"))
+
+    def test_role_permissions_invalidate_on_commit(self):
+        sm = self.appbuilder.sm
+        session = self.appbuilder.session
+        pvm = sm.add_permission_view_menu("can_add", "CachedView")
+        version = sm.permissions_version
+        self.role.permissions.append(pvm)
+        session.flush()
+        self.assertEqual(sm.permissions_version, version)
+        session.commit()
+        self.assertGreater(sm.permissions_version, version)
+
+        version = sm.permissions_version
+        self.role.permissions.remove(pvm)
+        session.flush()
+        session.rollback()
+        session.commit()
+        self.assertEqual(sm.permissions_version, version)
+
+        self.role.permissions.remove(pvm)
+        session.delete(pvm)
+        session.commit()
+        self.assertGreater(sm.permissions_version, version)
+
+    def test_update_role_invalidates(self):
+        sm = self.appbuilder.sm
+        version = sm.permissions_version
+        sm.update_role(self.role.id, "CachedRole")
+        self.assertGreater(sm.permissions_version, version)
+
+    def test_menu_access_uses_cache(self):
+        sm = self.appbuilder.sm
+        sm.add_permission_role(
+            self.role, sm.add_permission_view_menu("menu_access", "CachedMenu")
+        )
+        self.assertEqual(
+            sm._get_user_permission_view_menus(
+                self.user, "menu_access", ["CachedMenu", "OtherMenu"]
+            ),
+            {"CachedMenu"},
+        )
+
+    def test_menu_access_without_menu_names(self):
+        sm = self.appbuilder.sm
+        sm.add_permission_role(
+            self.role, sm.add_permission_view_menu("menu_access", "CachedMenu")
+        )
+        self.assertEqual(
+            sm._get_user_permission_view_menus(self.user, "menu_access"),
+            {"CachedMenu"},
+        )
+        with self.app.test_request_context("/"):
+            g.user = self.user
+            current_user = MagicMock()
+            current_user.is_authenticated = True
+            with patch("flask_appbuilder.security.manager.current_user", current_user):
+                self.assertEqual(sm.get_user_menu_access(), {"CachedMenu"})
+
+    def test_view_access_batch(self):
+        sm = self.appbuilder.sm
+        permissions = [
+            ("can_list", "CachedView"),
+            ("can_add", "CachedView"),
+            ("can_list", "OtherView"),
+        ]
+        expected = {
+            ("can_list", "CachedView"): True,
+            ("can_add", "CachedView"): False,
+            ("can_list", "OtherView"): False,
+        }
+        self.assertEqual(sm._has_view_access_batch(self.user, permissions), expected)
+        self.statements.clear()
+        self.assertEqual(sm._has_view_access_batch(self.user, permissions), expected)
+        self.assertEqual(self.statements, [])
+
+        self.app.config["FAB_PERMISSION_CACHE_ENABLED"] = False
+        self.statements.clear()
+        self.assertEqual(sm._has_view_access_batch(self.user, permissions), expected)
+        self.assertEqual(len(self.statements), 1)
+
+    def test_builtin_roles_compiled_and_memoized(self):
+        sm = self.appbuilder.sm
+        role = sm.find_role("ReadOnly")
+        self.assertIn("ReadOnly", sm._builtin_roles_patterns)
+        self.assertTrue(sm._has_access_builtin_roles(role, "can_list", "Model1Api"))
+        self.assertFalse(sm._has_access_builtin_roles(role, "can_add", "Model1Api"))
+        self.assertTrue(sm._builtin_roles_access[("ReadOnly", "can_list", "Model1Api")])
+        self.assertFalse(sm._builtin_roles_access[("ReadOnly", "can_add", "Model1Api")])
+
+    def test_public_permissions_served_from_cache(self):
+        sm = self.appbuilder.sm
+        public_role = sm.get_public_role()
+        pvm = sm.add_permission_view_menu("can_list", "PublicCachedView")
+        self.assertFalse(sm.is_item_public("can_list", "PublicCachedView"))
+        sm.add_permission_role(public_role, pvm)
+        self.assertTrue(sm.is_item_public("can_list", "PublicCachedView"))
+        self.statements.clear()
+        self.assertTrue(sm.is_item_public("can_list", "PublicCachedView"))
+        self.assertFalse(sm.is_item_public("can_add", "PublicCachedView"))
+        self.assertIn(
+            "PublicCachedView",
+            sm._get_user_permission_view_menus(None, "can_list", ["PublicCachedView"]),
+        )
+        self.assertEqual(self.statements, [])
+
+        sm.del_permission_role(public_role, pvm)
+        self.assertFalse(sm.is_item_public("can_list", "PublicCachedView"))
+
+
+class UserCacheTestCase(FABTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object("tests.config_api")
+        self.app.config["FAB_USER_CACHE_ENABLED"] = True
+        logging.basicConfig(level=logging.ERROR)
+
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        SQLA = get_sqla_class()
+        self.db = SQLA(self.app)
+        self.appbuilder = AppBuilder(self.app, self.db.session)
+        sm = self.appbuilder.sm
+        sm.add_role("CachedUserRole")
+        sm.add_role("CachedGroupRole")
+        sm.add_group(
+            "CachedGroup", "CachedGroup", "", roles=[sm.find_role("CachedGroupRole")]
+        )
+        self.user = self.create_user(
+            self.appbuilder,
+            "cached_user",
+            "password",
+            "CachedUserRole",
+            email="cached_user@fab.org",
+            group_names=["CachedGroup"],
+        )
+        self.user_id = self.user.id
+        self.statements = []
+        event.listen(self.db.engine, "before_cursor_execute", self._count_statement)
+
+    def tearDown(self):
+        event.remove(self.db.engine, "before_cursor_execute", self._count_statement)
+        sm = self.appbuilder.sm
+        # Group.roles uses passive deletes, clear the association rows first
+        user = sm.find_user("cached_user")
+        user.roles = []
+        user.groups = []
+        group = sm.find_group("CachedGroup")
+        group.roles = []
+        self.appbuilder.session.delete(user)
+        self.appbuilder.session.delete(group)
+        self.appbuilder.session.delete(sm.find_role("CachedUserRole"))
+        self.appbuilder.session.delete(sm.find_role("CachedGroupRole"))
+        self.appbuilder.session.commit()
+        self.ctx.pop()
+        self.appbuilder = None
+        self.app = None
+
+    def _count_statement(self, *args, **kwargs):
+        self.statements.append(args[2])
+
+    def _get_role_names(self, user):
+        return sorted(role.name for role in self.appbuilder.sm.get_user_roles(user))
+
+    def test_user_roles_eager_loaded(self):
+        self.app.config["FAB_USER_CACHE_ENABLED"] = False
+        self.appbuilder.session.remove()
+        self.statements.clear()
+        user = self.appbuilder.sm.load_user(self.user_id)
+        statements = len(self.statements)
+        self.assertEqual(
+            self._get_role_names(user), ["CachedGroupRole", "CachedUserRole"]
+        )
+        self.assertEqual(len(self.statements), statements)
+
+    def test_load_user_served_from_cache(self):
+        sm = self.appbuilder.sm
+        self.appbuilder.session.remove()
+        sm.load_user(self.user_id)
+        self.appbuilder.session.remove()
+        self.statements.clear()
+
+        user = sm.load_user(self.user_id)
+        self.assertEqual(user.username, "cached_user")
+        self.assertIn(user, self.appbuilder.session)
+        self.assertEqual(
+            self._get_role_names(user), ["CachedGroupRole", "CachedUserRole"]
+        )
+        self.assertEqual(self.statements, [])
+
+    def test_update_user_invalidates(self):
+        sm = self.appbuilder.sm
+        sm.load_user(self.user_id)
+        version = sm.users_version
+        user = sm.get_user_by_id(self.user_id)
+        user.first_name = "changed"
+        sm.update_user(user)
+        self.assertGreater(sm.users_version, version)
+
+        self.appbuilder.session.remove()
+        self.assertEqual(sm.load_user(self.user_id).first_name, "changed")
+
+    def test_user_change_invalidates_on_commit(self):
+        sm = self.appbuilder.sm
+        version = sm.users_version
+        user = sm.get_user_by_id(self.user_id)
+        user.first_name = "changed"
+        self.appbuilder.session.flush()
+        self.assertEqual(sm.users_version, version)
+        self.appbuilder.session.commit()
+        self.assertGreater(sm.users_version, version)
+
+        version = sm.users_version
+        user.first_name = "rolled back"
+        self.appbuilder.session.flush()
+        self.appbuilder.session.rollback()
+        self.appbuilder.session.commit()
+        self.assertEqual(sm.users_version, version)
+
+    def test_group_roles_change_invalidates(self):
+        sm = self.appbuilder.sm
+        sm.load_user(self.user_id)
+        group = sm.find_group("CachedGroup")
+        group.roles = []
+        self.appbuilder.session.commit()
+
+        self.appbuilder.session.remove()
+        user = sm.load_user(self.user_id)
+        self.assertEqual(self._get_role_names(user), ["CachedUserRole"])
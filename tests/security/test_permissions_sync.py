@@ -0,0 +1,146 @@
+import logging
+from unittest.mock import patch
+
+from flask import Flask
+from flask_appbuilder import AppBuilder, ModelView
+from flask_appbuilder.models.sqla.interface import SQLAInterface
+from flask_appbuilder.utils.legacy import get_sqla_class
+from sqlalchemy.exc import IntegrityError
+from tests.base import FABTestCase
+from tests.sqla.models import Model1
+
+
+class PermissionsSyncTestCase(FABTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object("tests.config_api")
+        self.app.config["FAB_UPDATE_PERMS_BULK"] = True
+        logging.basicConfig(level=logging.ERROR)
+
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        SQLA = get_sqla_class()
+        self.db = SQLA(self.app)
+        self.appbuilder = AppBuilder(self.app, self.db.session)
+
+        class SyncModelView(ModelView):
+            datamodel = SQLAInterface(Model1)
+
+        self.view = self.appbuilder.add_view(SyncModelView, "Sync", category="Syncs")
+
+    def tearDown(self):
+        sm = self.appbuilder.sm
+        session = self.appbuilder.session
+        for view_menu_name in ("SyncModelView", "Sync", "Syncs", "Old"):
+            view_menu = sm.find_view_menu(view_menu_name)
+            if view_menu is None:
+                continue
+            pvms = session.query(sm.permissionview_model).filter_by(
+                view_menu_id=view_menu.id
+            )
+            for pvm in pvms:
+                for role in session.query(sm.role_model).filter(
+                    sm.role_model.permissions.contains(pvm)
+                ):
+                    role.permissions.remove(pvm)
+                session.delete(pvm)
+            session.delete(view_menu)
+        permission = sm.find_permission("can_a")
+        if permission is not None:
+            session.delete(permission)
+        session.query(sm.permissions_fingerprint_model).delete()
+        session.commit()
+        self.ctx.pop()
+        self.appbuilder = None
+        self.app = None
+
+    def _admin_permissions(self):
+        role_admin = self.appbuilder.sm.find_role("Admin")
+        self.appbuilder.session.refresh(role_admin)
+        return {
+            (pv.permission.name, pv.view_menu.name) for pv in role_admin.permissions
+        }
+
+    def test_sync_is_deferred_and_bulk(self):
+        sm = self.appbuilder.sm
+        self.assertIsNone(sm.find_permission_view_menu("can_list", "SyncModelView"))
+
+        self.assertTrue(self.app.test_client().get("/").status_code < 500)
+        admin_permissions = self._admin_permissions()
+        for permission in self.view.base_permissions:
+            self.assertIn((permission, "SyncModelView"), admin_permissions)
+        self.assertIn(("menu_access", "Sync"), admin_permissions)
+        self.assertIn(("menu_access", "Syncs"), admin_permissions)
+        self.assertIn(("can_list", "UserDBModelView"), admin_permissions)
+        self.assertIsNotNone(sm.find_permissions_fingerprint())
+
+    def test_sync_skipped_by_fingerprint(self):
+        sm = self.appbuilder.sm
+        self.appbuilder.add_permissions()
+        with patch.object(sm, "bulk_sync_permissions") as bulk_sync:
+            self.appbuilder.add_permissions()
+            bulk_sync.assert_not_called()
+            self.appbuilder.add_permissions(update_perms=True)
+            bulk_sync.assert_called_once()
+
+    def test_sync_error_is_retried(self):
+        sm = self.appbuilder.sm
+        with patch.object(sm, "_bulk_add_names", side_effect=Exception("error")):
+            self.assertTrue(self.app.test_client().get("/").status_code < 500)
+        self.assertFalse(self.appbuilder._permissions_synced)
+        self.assertIsNone(sm.find_permissions_fingerprint())
+
+        self.app.test_client().get("/")
+        self.assertTrue(self.appbuilder._permissions_synced)
+        self.assertIn(("can_list", "SyncModelView"), self._admin_permissions())
+
+    def test_sync_concurrent_integrity_error(self):
+        sm = self.appbuilder.sm
+        bulk_add_names = sm._bulk_add_names
+        calls = []
+
+        def concurrent_bulk_add_names(table, names):
+            calls.append(table)
+            if len(calls) == 1:
+                raise IntegrityError("INSERT", {}, Exception("unique"))
+            return bulk_add_names(table, names)
+
+        with patch.object(sm, "_bulk_add_names", side_effect=concurrent_bulk_add_names):
+            self.appbuilder.add_permissions()
+        self.assertTrue(self.appbuilder._permissions_synced)
+        self.assertIn(("can_list", "SyncModelView"), self._admin_permissions())
+        self.assertIsNotNone(sm.find_permissions_fingerprint())
+
+    def test_sync_removes_stale_permissions(self):
+        sm = self.appbuilder.sm
+        self.appbuilder.add_permissions()
+        self.assertIsNotNone(
+            sm.find_permission_view_menu("can_delete", "SyncModelView")
+        )
+
+        self.view.base_permissions.remove("can_delete")
+        self.appbuilder.add_permissions()
+        self.assertIsNone(sm.find_permission_view_menu("can_delete", "SyncModelView"))
+        self.assertNotIn(("can_delete", "SyncModelView"), self._admin_permissions())
+        self.assertIn(("can_list", "SyncModelView"), self._admin_permissions())
+        # still used by other views
+        self.assertIsNotNone(sm.find_permission("can_delete"))
+
+    def test_security_cleanup_dry_run(self):
+        sm = self.appbuilder.sm
+        self.appbuilder.add_permissions()
+        role_admin = sm.find_role("Admin")
+        sm.add_permission_role(role_admin, sm.add_permission_view_menu("can_a", "Old"))
+
+        report = self.appbuilder.security_cleanup(dry=True)
+        self.assertGreaterEqual(report["del_role_pvm"], 1)
+        self.assertGreaterEqual(report["del_views"], 1)
+        self.assertIsNotNone(sm.find_permission_view_menu("can_a", "Old"))
+
+        applied_report = self.appbuilder.security_cleanup()
+        report.pop("elapsed")
+        applied_report.pop("elapsed")
+        self.assertEqual(report, applied_report)
+        self.assertIsNone(sm.find_view_menu("Old"))
+        self.assertIsNone(sm.find_permission("can_a"))
+        self.assertIn(("can_list", "SyncModelView"), self._admin_permissions())
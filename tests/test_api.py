@@ -1,8 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import datetime
+import gzip
+import io
 import json
 import logging
 import os
+import tempfile
+import threading
+import time
+from unittest.mock import patch
 
 from flask_appbuilder import ModelRestApi
+from flask_appbuilder.api import BaseApi
+from flask_appbuilder.cli import export_openapi
 from flask_appbuilder.const import (
     API_ADD_COLUMNS_RES_KEY,
     API_ADD_COLUMNS_RIS_KEY,
@@ -37,6 +48,7 @@ from flask_appbuilder.hooks import before_request
 from flask_appbuilder.models.sqla.filters import FilterGreater, FilterSmaller
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_appbuilder.utils.legacy import get_sqla_class
+from flask_babel import force_locale
 import prison
 from sqlalchemy.sql.expression import func
 from tests.base import FABTestCase
@@ -63,6 +75,7 @@ from tests.fixtures.data_models import (
 from tests.sqla.models import (
     Model1,
     Model2,
+    Model3,
     Model4,
     ModelMMChild,
     ModelMMParent,
@@ -252,6 +265,21 @@ class APITestCase(FABTestCase):
         self.model1api = Model1Api
         self.appbuilder.add_api(Model1Api)
 
+        class Model1ExportApi(ModelRestApi):
+            datamodel = SQLAInterface(Model1)
+            allow_export = True
+            export_batch_size = 3
+            list_columns = ["field_integer", "field_string"]
+
+        self.appbuilder.add_api(Model1ExportApi)
+
+        class Model1InfoEtagApi(ModelRestApi):
+            datamodel = SQLAInterface(Model1)
+            info_etag_ttl = 60
+
+        self.model1infoetagapi = Model1InfoEtagApi
+        self.appbuilder.add_api(Model1InfoEtagApi)
+
         class CustomFilter(BaseFilter):
             name = "Custom Filter"
             arg_name = "custom_filter"
@@ -1645,6 +1673,279 @@ class APITestCase(FABTestCase):
             rv = self.auth_client_get(client, token, uri)
             self.assertEqual(rv.status_code, 200)
 
+    def test_get_list_count_mode(self):
+        """
+        REST Api: Test get list count modes
+        """
+        client = self.app.test_client()
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+
+        with model1_data(self.appbuilder.session, MODEL1_DATA_SIZE):
+            for count_mode, expected_count in (
+                ("exact", MODEL1_DATA_SIZE),
+                ("window", MODEL1_DATA_SIZE),
+                ("estimated", MODEL1_DATA_SIZE),
+                ("none", None),
+            ):
+                arguments = {
+                    "page_size": 5,
+                    "page": 1,
+                    "order_column": "field_integer",
+                    "order_direction": "asc",
+                    "count_mode": count_mode,
+                }
+                uri = f"api/v1/model1api/?{API_URI_RIS_KEY}={prison.dumps(arguments)}"
+                rv = self.auth_client_get(client, token, uri)
+                self.assertEqual(rv.status_code, 200)
+                data = json.loads(rv.data.decode("utf-8"))
+                self.assertEqual(data["count"], expected_count)
+                self.assertEqual(
+                    [item["field_integer"] for item in data[API_RESULT_RES_KEY]],
+                    [5, 6, 7, 8, 9],
+                )
+
+            # Window count with filters and an out of range page
+            for page, expected_length in ((0, 1), (MODEL1_DATA_SIZE, 0)):
+                arguments = {
+                    "filters": [{"col": "field_integer", "opr": "gt", "value": 8}],
+                    "page_size": 1,
+                    "page": page,
+                    "count_mode": "window",
+                }
+                uri = f"api/v1/model1api/?{API_URI_RIS_KEY}={prison.dumps(arguments)}"
+                rv = self.auth_client_get(client, token, uri)
+                data = json.loads(rv.data.decode("utf-8"))
+                self.assertEqual(data["count"], MODEL1_DATA_SIZE - 9)
+                self.assertEqual(len(data[API_RESULT_RES_KEY]), expected_length)
+
+            # Window count keeps outer_default_load
+            datamodel = SQLAInterface(Model1, self.appbuilder.session)
+            with patch.object(
+                datamodel, "apply_all", wraps=datamodel.apply_all
+            ) as apply_all:
+                count, items = datamodel.query(
+                    page=0,
+                    page_size=5,
+                    outer_default_load=True,
+                    count_mode="window",
+                )
+                self.assertEqual(count, MODEL1_DATA_SIZE)
+                self.assertEqual(len(items), 5)
+                self.assertTrue(apply_all.call_args.kwargs["outer_default_load"])
+
+        arguments = {"count_mode": "invalid"}
+        uri = f"api/v1/model1api/?{API_URI_RIS_KEY}={prison.dumps(arguments)}"
+        rv = self.auth_client_get(client, token, uri)
+        self.assertEqual(rv.status_code, 400)
+
+    def test_get_list_dotted_window_count(self):
+        """
+        REST Api: Test get list window count with dotted columns
+        """
+        client = self.app.test_client()
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+
+        arguments = {
+            "columns": ["field_string", "group.field_string"],
+            "page_size": 5,
+            "count_mode": "window",
+        }
+        uri = f"api/v1/model2api/?{API_URI_RIS_KEY}={prison.dumps(arguments)}"
+        with model2_data(self.appbuilder.session, MODEL2_DATA_SIZE):
+            rv = self.auth_client_get(client, token, uri)
+            self.assertEqual(rv.status_code, 200)
+            data = json.loads(rv.data.decode("utf-8"))
+            self.assertEqual(data["count"], MODEL2_DATA_SIZE)
+            self.assertEqual(len(data[API_RESULT_RES_KEY]), 5)
+            self.assertIn("group", data[API_RESULT_RES_KEY][0])
+
+    def test_get_many(self):
+        """
+        REST Api: Test get many fetches by chunks, keeps the order and filters
+        """
+        datamodel = SQLAInterface(Model1, self.appbuilder.session)
+        datamodel.get_many_chunk_size = 3
+        with model1_data(self.appbuilder.session, MODEL1_DATA_SIZE) as models:
+            ids = [model.id for model in reversed(models)]
+            pks = [str(pk) for pk in ids] + ["-1"]
+            items = datamodel.get_many(pks)
+            self.assertEqual([item.id for item in items], ids)
+
+            filters = datamodel.get_filters()
+            filters.add_filter("field_integer", FilterGreater, 5)
+            items = datamodel.get_many(pks, filters)
+            self.assertEqual(
+                [item.field_integer for item in items],
+                [i for i in reversed(range(MODEL1_DATA_SIZE)) if i > 5],
+            )
+
+    def test_get_many_composite_key(self):
+        """
+        REST Api: Test get many with composite keys
+        """
+        session = self.appbuilder.session
+        datamodel = SQLAInterface(Model3, session)
+        pks = [[i, datetime.datetime(2020, 1, i + 1)] for i in range(3)]
+        for pk1, pk2 in pks:
+            session.add(Model3(pk1=pk1, pk2=pk2, field_string=f"test{pk1}"))
+        session.commit()
+        try:
+            items = datamodel.get_many([pks[2], pks[0], [9, pks[1][1]]])
+            self.assertEqual([item.pk1 for item in items], [2, 0])
+        finally:
+            session.query(Model3).delete()
+            session.commit()
+
+    def test_export(self):
+        """
+        REST Api: Test export streams all rows as CSV and NDJSON
+        """
+        client = self.app.test_client()
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        self.assertIsNotNone(
+            self.appbuilder.sm.find_permission_view_menu(
+                "can_export", "Model1ExportApi"
+            )
+        )
+        self.assertIsNone(
+            self.appbuilder.sm.find_permission_view_menu("can_export", "Model1Api")
+        )
+        with model1_data(self.appbuilder.session, MODEL1_DATA_SIZE):
+            rv = self.auth_client_get(client, token, "api/v1/model1api/export/")
+            self.assertEqual(rv.status_code, 404)
+
+            arguments = {
+                "filters": [{"col": "field_integer", "opr": "gt", "value": 1}],
+                "order_column": "field_integer",
+                "order_direction": "desc",
+            }
+            uri = f"api/v1/model1exportapi/export/?q={prison.dumps(arguments)}"
+            rv = self.auth_client_get(client, token, uri)
+            self.assertEqual(rv.status_code, 200)
+            self.assertTrue(rv.is_streamed)
+            self.assertEqual(rv.mimetype, "text/csv")
+            expected = [
+                [str(i), f"test{i}"] for i in reversed(range(2, MODEL1_DATA_SIZE))
+            ]
+            rows = list(csv.reader(io.StringIO(rv.data.decode("utf-8"))))
+            self.assertEqual(rows, [["field_integer", "field_string"]] + expected)
+
+            arguments["format"] = "ndjson"
+            arguments["columns"] = ["field_string"]
+            uri = f"api/v1/model1exportapi/export/?q={prison.dumps(arguments)}"
+            rv = self.auth_client_get(client, token, uri)
+            self.assertEqual(rv.status_code, 200)
+            self.assertEqual(rv.mimetype, "application/x-ndjson")
+            rows = [json.loads(line) for line in rv.data.decode("utf-8").splitlines()]
+            self.assertEqual(rows, [{"field_string": row[1]} for row in expected])
+
+    def test_export_errors(self):
+        """
+        REST Api: Test export errors are returned before streaming
+        """
+        client = self.app.test_client()
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        api = next(
+            baseview
+            for baseview in self.appbuilder.baseviews
+            if baseview.__class__.__name__ == "Model1ExportApi"
+        )
+        uri = "api/v1/model1exportapi/export/"
+        with patch.object(
+            api.datamodel, "exists_col_to_many", return_value=True
+        ), patch.object(api.datamodel, "is_pk_composite", return_value=True):
+            rv = self.auth_client_get(client, token, uri)
+        self.assertEqual(rv.status_code, 400)
+
+        with patch.object(
+            api.datamodel, "apply_all", side_effect=Exception("query error")
+        ):
+            rv = self.auth_client_get(client, token, uri)
+        self.assertEqual(rv.status_code, 500)
+
+    def test_query_iter_to_many(self):
+        """
+        REST Api: Test query iter pages selected to many relations
+        """
+        datamodel = SQLAInterface(ModelMMParent, self.appbuilder.session)
+        select_columns = ["field_string", "children.field_string"]
+        with model_mm_parent_data(self.appbuilder.session, 5, 2):
+            _, expected = datamodel.query(
+                select_columns=select_columns,
+                order_column="id",
+                order_direction="asc",
+            )
+            items = datamodel.query_iter(select_columns=select_columns, batch_size=2)
+            self.assertEqual(
+                [(item.id, len(item.children)) for item in items],
+                [(item.id, len(item.children)) for item in expected],
+            )
+            self.assertEqual(len(expected), 5)
+
+    def test_get_list_cursor(self):
+        """
+        REST Api: Test get list keyset pagination with cursors
+        """
+        client = self.app.test_client()
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+
+        with model1_data(self.appbuilder.session, MODEL1_DATA_SIZE):
+            for order_arguments, expected in (
+                (
+                    {"order_column": "field_string", "order_direction": "desc"},
+                    sorted(range(MODEL1_DATA_SIZE), key=str, reverse=True),
+                ),
+                ({}, list(range(MODEL1_DATA_SIZE))),
+            ):
+                cursor = ""
+                result = []
+                while cursor is not None:
+                    arguments = {
+                        "columns": ["field_string"],
+                        "page_size": 7,
+                        "cursor": cursor,
+                        **order_arguments,
+                    }
+                    uri = (
+                        f"api/v1/model1api/?{API_URI_RIS_KEY}="
+                        f"{prison.dumps(arguments)}"
+                    )
+                    rv = self.auth_client_get(client, token, uri)
+                    self.assertEqual(rv.status_code, 200)
+                    data = json.loads(rv.data.decode("utf-8"))
+                    self.assertEqual(data["count"], MODEL1_DATA_SIZE)
+                    result.extend(
+                        item["field_string"] for item in data[API_RESULT_RES_KEY]
+                    )
+                    cursor = data["next_cursor"]
+                self.assertEqual(result, [f"test{i}" for i in expected])
+
+            # Nullable order columns are not supported
+            arguments = {"page_size": 7, "cursor": "", "order_column": "field_integer"}
+            uri = f"api/v1/model1api/?{API_URI_RIS_KEY}={prison.dumps(arguments)}"
+            rv = self.auth_client_get(client, token, uri)
+            self.assertEqual(rv.status_code, 400)
+
+            # Cursor that does not match the requested order
+            arguments = {"page_size": 7, "cursor": ""}
+            uri = f"api/v1/model1api/?{API_URI_RIS_KEY}={prison.dumps(arguments)}"
+            rv = self.auth_client_get(client, token, uri)
+            cursor = json.loads(rv.data.decode("utf-8"))["next_cursor"]
+            arguments = {
+                "page_size": 7,
+                "cursor": cursor,
+                "order_column": "field_string",
+                "order_direction": "asc",
+            }
+            uri = f"api/v1/model1api/?{API_URI_RIS_KEY}={prison.dumps(arguments)}"
+            rv = self.auth_client_get(client, token, uri)
+            self.assertEqual(rv.status_code, 400)
+
+        arguments = {"cursor": "invalid"}
+        uri = f"api/v1/model1api/?{API_URI_RIS_KEY}={prison.dumps(arguments)}"
+        rv = self.auth_client_get(client, token, uri)
+        self.assertEqual(rv.status_code, 400)
+
     def test_get_list_max_page_size(self):
         """
         REST Api: Test get list max page size config setting
@@ -1707,6 +2008,38 @@ class APITestCase(FABTestCase):
             data = json.loads(rv.data.decode("utf-8"))
             self.assertEqual(len(data[API_RESULT_RES_KEY]), MODEL1_DATA_SIZE)
 
+    def test_handle_filters_args_thread_isolation(self):
+        """
+        REST Api: Test concurrent requests do not share active filters
+        """
+        api = next(
+            baseview
+            for baseview in self.appbuilder.baseviews
+            if baseview.__class__.__name__ == "Model1Api"
+        )
+        workers = 8
+        barrier = threading.Barrier(workers)
+
+        def handle_filters(index):
+            barrier.wait()
+            for _ in range(200):
+                value = f"test{index}"
+                filters = api._handle_filters_args(
+                    {
+                        API_FILTERS_RIS_KEY: [
+                            {"col": "field_string", "opr": "eq", "value": value}
+                        ]
+                    }
+                )
+                if filters.values != [value]:
+                    return False
+            return True
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(handle_filters, range(workers)))
+        self.assertTrue(all(results))
+        self.assertEqual(api._filters.filters, [])
+
     def test_get_list_filters(self):
         """
         REST Api: Test get list filter params
@@ -2118,6 +2451,40 @@ class APITestCase(FABTestCase):
             self.assertEqual(data[API_LIST_COLUMNS_RES_KEY], ["field_integer"])
             self.assertEqual(rv.status_code, 200)
 
+    def test_get_list_columns_schema_cached(self):
+        """
+        REST Api: Test get list with select columns reuses generated schemas
+        """
+        client = self.app.test_client()
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        api = next(
+            view
+            for view in self.appbuilder.baseviews
+            if isinstance(view, self.model1api)
+        )
+        argument = {
+            API_SELECT_COLUMNS_RIS_KEY: ["field_integer"],
+            "order_column": "field_integer",
+            "order_direction": "asc",
+        }
+        uri = f"api/v1/model1api/?{API_URI_RIS_KEY}={prison.dumps(argument)}"
+        with model1_data(self.appbuilder.session, 5):
+            with patch.object(
+                api.model2schemaconverter,
+                "convert",
+                wraps=api.model2schemaconverter.convert,
+            ) as convert:
+                for _ in range(2):
+                    rv = self.auth_client_get(client, token, uri)
+                    data = json.loads(rv.data.decode("utf-8"))
+                    self.assertEqual(data[API_RESULT_RES_KEY][0], {"field_integer": 0})
+                self.assertEqual(convert.call_count, 1)
+        self.assertIs(
+            api.get_columns_schema(["field_integer"]),
+            api.get_columns_schema(["field_integer"]),
+        )
+        self.assertGreaterEqual(api._columns_schemas.hits, 2)
+
     def test_get_list_choose_select_cols(self):
         """
         REST Api: Test get list with select columns
@@ -2393,6 +2760,75 @@ class APITestCase(FABTestCase):
         expected_permissions = ["can_get", "can_info"]
         self.assertEqual(sorted(data[API_PERMISSIONS_RES_KEY]), expected_permissions)
 
+    def test_info_etag(self):
+        """
+        REST Api: Test info ETag and not modified responses
+        """
+        client = self.app.test_client()
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        uri = "api/v1/model1api/_info"
+        rv = self.auth_client_get(client, token, uri)
+        etag = rv.headers["ETag"]
+        self.assertEqual(rv.status_code, 200)
+        self.assertFalse(etag.startswith("W/"))
+
+        headers = {"Authorization": f"Bearer {token}", "If-None-Match": etag}
+        rv = client.get(uri, headers=headers)
+        self.assertEqual(rv.status_code, 304)
+        self.assertEqual(rv.data, b"")
+
+        # Trusted ETags skip computing the response until they expire
+        api = next(
+            view
+            for view in self.appbuilder.baseviews
+            if isinstance(view, self.model1infoetagapi)
+        )
+        uri = "api/v1/model1infoetagapi/_info"
+        rv = self.auth_client_get(client, token, uri)
+        self.assertEqual(rv.status_code, 200)
+        headers["If-None-Match"] = rv.headers["ETag"]
+        with patch.object(
+            api, "set_response_key_mappings", wraps=api.set_response_key_mappings
+        ) as mappings:
+            rv = client.get(uri, headers=headers)
+            self.assertEqual(rv.status_code, 304)
+            self.assertEqual(rv.headers["ETag"], headers["If-None-Match"])
+            mappings.assert_not_called()
+
+            expired = time.monotonic() + api.info_etag_ttl + 1
+            with patch("flask_appbuilder.utils.cache.time.monotonic") as monotonic:
+                monotonic.return_value = expired
+                rv = client.get(uri, headers=headers)
+            self.assertEqual(rv.status_code, 304)
+            mappings.assert_called_once()
+        api._info_etags.clear()
+
+    def test_metadata_computed_once_per_locale(self):
+        """
+        REST Api: Test label and description columns are kept by locale
+        """
+        client = self.app.test_client()
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        api = next(
+            view
+            for view in self.appbuilder.baseviews
+            if isinstance(view, self.model1api)
+        )
+        api._locale_metadata.clear()
+        with patch.object(
+            api, "_label_columns_json", wraps=api._label_columns_json
+        ) as label_columns_json:
+            for _ in range(2):
+                rv = self.auth_client_get(client, token, "api/v1/model1api/")
+                data = json.loads(rv.data.decode("utf-8"))
+                self.assertEqual(
+                    data[API_LABEL_COLUMNS_RES_KEY]["field_integer"], "Field Integer"
+                )
+            self.assertEqual(label_columns_json.call_count, 1)
+            with force_locale("pt"):
+                api.merge_list_label_columns({})
+            self.assertEqual(label_columns_json.call_count, 2)
+
     def test_info_select_meta_data(self):
         """
         REST Api: Test info select meta data
@@ -3250,6 +3686,63 @@ class APITestCase(FABTestCase):
         rv = self.auth_client_get(client, token, uri)
         self.assertEqual(rv.status_code, 200)
 
+    def test_openapi_cached(self):
+        """
+        REST Api: Test OpenAPI spec is cached and served with ETag and gzip
+        """
+        client = self.app.test_client()
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        uri = "api/v1/_openapi"
+        rv = self.auth_client_get(client, token, uri)
+        data = json.loads(rv.data.decode("utf-8"))
+        self.assertIn("Model1Api", json.dumps(data["paths"]))
+        etag = rv.headers["ETag"]
+
+        with patch.object(BaseApi, "add_api_spec") as add_api_spec:
+            headers = {"Authorization": f"Bearer {token}", "If-None-Match": etag}
+            rv = client.get(uri, headers=headers)
+            self.assertEqual(rv.status_code, 304)
+
+            headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+            rv = client.get(uri, headers=headers)
+            self.assertEqual(rv.headers["Content-Encoding"], "gzip")
+            self.assertEqual(json.loads(gzip.decompress(rv.data)), data)
+            add_api_spec.assert_not_called()
+
+        rv = self.auth_client_get(client, token, "api/v2/_openapi")
+        self.assertEqual(rv.status_code, 404)
+
+    def test_openapi_spec_folder(self):
+        """
+        REST Api: Test OpenAPI spec exported by the CLI and served from disk
+        """
+        client = self.app.test_client()
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.app.config["FAB_OPENAPI_SPEC_FOLDER"] = tmp_dir
+            result = self.app.test_cli_runner().invoke(
+                export_openapi, ["--server", "https://fab.example.com"]
+            )
+            self.assertEqual(result.exit_code, 0)
+            self.assertTrue(os.path.exists(os.path.join(tmp_dir, "openapi_v1.json")))
+
+            rv = self.auth_client_get(client, token, "api/v1/_openapi")
+            data = json.loads(rv.data.decode("utf-8"))
+            self.assertEqual(data["servers"], [{"url": "https://fab.example.com"}])
+
+            # A re exported spec is served without a restart
+            spec_file = os.path.join(tmp_dir, "openapi_v1.json")
+            mtime = os.stat(spec_file).st_mtime
+            result = self.app.test_cli_runner().invoke(
+                export_openapi, ["--server", "https://new.example.com"]
+            )
+            self.assertEqual(result.exit_code, 0)
+            os.utime(spec_file, (mtime + 1, mtime + 1))
+            rv = self.auth_client_get(client, token, "api/v1/_openapi")
+            data = json.loads(rv.data.decode("utf-8"))
+            self.assertEqual(data["servers"], [{"url": "https://new.example.com"}])
+            del self.app.config["FAB_OPENAPI_SPEC_FOLDER"]
+
     def test_swagger_ui(self):
         """
         REST Api: Test Swagger UI
@@ -2,6 +2,7 @@ import datetime
 import json
 import logging
 from typing import Set
+from unittest.mock import patch
 
 from flask import Flask, make_response, redirect, session
 from flask_appbuilder import AppBuilder
@@ -15,7 +16,15 @@ from flask_appbuilder.charts.views import (
     TimeChartView,
 )
 from flask_appbuilder.hooks import before_request
-from flask_appbuilder.models.group import aggregate_avg, aggregate_count, aggregate_sum
+from flask_appbuilder.models.group import (
+    aggregate,
+    aggregate_avg,
+    aggregate_count,
+    aggregate_sum,
+    GroupByDateMonth,
+    GroupByDateYear,
+    GroupByProcessData,
+)
 from flask_appbuilder.models.sqla.filters import (
     FilterEqual,
     FilterEqualFunction,
@@ -743,6 +752,104 @@ class MVCTestCase(BaseMVCTestCase):
             data = rv.data.decode("utf-8")
             self.assertIn('<label for="group"', data)
 
+    def test_related_views_concurrent(self):
+        """
+        Test related views queried concurrently render like sequentially
+        """
+        view = next(
+            baseview
+            for baseview in self.appbuilder.baseviews
+            if baseview.__class__.__name__ == "Model1View"
+        )
+        model22_view = next(
+            baseview
+            for baseview in self.appbuilder.baseviews
+            if baseview.__class__.__name__ == "Model22View"
+        )
+        view._related_views.append(model22_view)
+        with self.app.test_client() as client:
+            self.browser_login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+            with model2_data(self.appbuilder.session, 3) as models:
+                model1_id = models[0].group.id
+                try:
+                    sequential = client.get(f"/model1view/show/{model1_id}")
+                    view.related_views_max_workers = 2
+                    concurrent = client.get(f"/model1view/show/{model1_id}")
+                finally:
+                    view._related_views.remove(model22_view)
+                    view.related_views_max_workers = 0
+                self.assertEqual(concurrent.status_code, 200)
+                self.assertIsNotNone(view._related_views_executor)
+                data = concurrent.data.decode("utf-8")
+                self.assertIn("model22view", data.lower())
+                self.assertEqual(data, sequential.data.decode("utf-8"))
+
+    def test_row_accessor(self):
+        """
+        Test the compiled row accessor gets the same values as get_values
+        """
+        columns = [
+            "field_string",
+            "field_method",
+            "group",
+            "group.field_string",
+            "group.missing",
+        ]
+        with model2_data(self.appbuilder.session, 3) as models:
+            datamodel = SQLAInterface(Model2, self.appbuilder.session)
+            accessor = datamodel.get_row_accessor(columns)
+            self.assertEqual(
+                [accessor(item) for item in models],
+                list(datamodel.get_values(models, columns)),
+            )
+            self.assertEqual(
+                datamodel.get_values_json(models, ["field_integer", "field_date"]),
+                [
+                    {
+                        "field_integer": item.field_integer,
+                        "field_date": item.field_date.isoformat(),
+                    }
+                    for item in models
+                ],
+            )
+            self.assertEqual(datamodel.get_keys(models), [item.id for item in models])
+        with model_with_enums_data(self.appbuilder.session) as models:
+            datamodel = SQLAInterface(ModelWithEnums, self.appbuilder.session)
+            columns = ["enum1", "enum2"]
+            accessor = datamodel.get_row_accessor(columns)
+            self.assertEqual(
+                [accessor(item) for item in models],
+                list(datamodel.get_values(models, columns)),
+            )
+
+    def test_list_stream(self):
+        """
+        Test the streamed list page renders like the list page
+        """
+        view = next(
+            baseview
+            for baseview in self.appbuilder.baseviews
+            if baseview.__class__.__name__ == "Model2View"
+        )
+        # Rows left by other tests would collide with the fixture's unique values
+        session = self.appbuilder.session
+        session.query(Model2).delete()
+        session.query(Model1).delete()
+        session.commit()
+        with self.app.test_client() as client:
+            self.browser_login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+            with model2_data(self.appbuilder.session, 3):
+                rendered = client.get("/model2view/list/")
+                view.list_stream = True
+                try:
+                    streamed = client.get("/model2view/list/")
+                finally:
+                    view.list_stream = False
+                self.assertTrue(streamed.is_streamed)
+                self.assertEqual(streamed.status_code, 200)
+                self.assertIn("test2", streamed.data.decode("utf-8"))
+                self.assertEqual(rendered.data, streamed.data)
+
     def test_index(self):
         """
         Test initial access and index message
@@ -1387,6 +1494,83 @@ class MVCTestCase(BaseMVCTestCase):
         rv = client.get("/model2timechartview/chart/")
         self.assertEqual(rv.status_code, 200)
 
+    def test_charts_aggregate_on_database(self):
+        """
+        Test chart group by and aggregations computed by the database
+        """
+
+        @aggregate("Custom")
+        def aggregate_custom(items, col):
+            return len(items)
+
+        datamodel = SQLAInterface(Model2, self.appbuilder.session)
+        group = GroupByProcessData(
+            ["field_string"],
+            [
+                (aggregate_sum, "field_integer"),
+                (aggregate_avg, "field_float"),
+                (aggregate_count, "field_integer"),
+            ],
+            {},
+        )
+        self.assertTrue(
+            datamodel.is_aggregate_supported(group.group_bys_cols, group.aggr_by_cols)
+        )
+        self.assertFalse(
+            datamodel.is_aggregate_supported(
+                ["field_method"], [(aggregate_count, "field_integer")]
+            )
+        )
+        self.assertFalse(
+            datamodel.is_aggregate_supported(
+                ["field_string"], [(aggregate_custom, "field_integer")]
+            )
+        )
+        with model2_data(self.appbuilder.session, 3):
+            _, items = datamodel.query()
+            rows = datamodel.query_aggregate(group.group_bys_cols, group.aggr_by_cols)
+            self.assertEqual(group.apply_aggregated(rows), group.apply(items))
+            for _, sum_value, avg_value, count_value in rows:
+                self.assertIsInstance(sum_value, int)
+                self.assertIsInstance(avg_value, float)
+                self.assertIsInstance(count_value, int)
+            self.assertEqual(
+                datamodel.query_month_group("field_date"),
+                GroupByDateMonth("field_date", "").apply(items),
+            )
+            self.assertEqual(
+                datamodel.query_year_group("field_date"),
+                GroupByDateYear("field_date", "").apply(items),
+            )
+
+    def test_charts_aggregate_order_column(self):
+        """
+        Test chart ordered by a non group column is processed in Python
+        """
+        view = next(
+            baseview
+            for baseview in self.appbuilder.baseviews
+            if baseview.__class__.__name__ == "Model2GroupByChartView"
+        )
+        group = view.get_group_by_class(view.definitions[0])
+        with model2_data(self.appbuilder.session, 3):
+            with patch.object(
+                view.datamodel,
+                "query_aggregate",
+                wraps=view.datamodel.query_aggregate,
+            ) as query_aggregate:
+                by_group = view._get_group_by_data(group, None, "field_string", "asc")
+                query_aggregate.assert_called_once()
+                query_aggregate.reset_mock()
+
+                by_integer = view._get_group_by_data(
+                    group, None, "field_integer", "desc"
+                )
+                query_aggregate.assert_not_called()
+            self.assertEqual(
+                [row[0] for row in by_integer], [row[0] for row in reversed(by_group)]
+            )
+
     def test_master_detail_view(self):
         """
         Test Master detail view
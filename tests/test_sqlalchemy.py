@@ -1,7 +1,17 @@
 import unittest
 
-from flask_appbuilder.models.sqla.interface import _is_sqla_type
+from flask_appbuilder.models.sqla.interface import _is_sqla_type, SQLAInterface
 import sqlalchemy as sa
+from sqlalchemy.orm import aliased, Query
+from tests.sqla.models import (
+    Model1,
+    Model2,
+    Model4,
+    ModelMMChild,
+    ModelMMParent,
+    ModelOMParent,
+    ModelOOParent,
+)
 
 
 class CustomSqlaType(sa.types.TypeDecorator):
@@ -21,3 +31,37 @@ class FlaskTestCase(unittest.TestCase):
         self.assertTrue(_is_sqla_type(t1, sa.types.DateTime))
         self.assertTrue(_is_sqla_type(t2, sa.types.DateTime))
         self.assertFalse(_is_sqla_type(t3, sa.types.DateTime))
+
+    def test_interface_relations_metadata(self):
+        datamodel = SQLAInterface(Model2)
+        self.assertTrue(datamodel.is_relation("group"))
+        self.assertTrue(datamodel.is_relation_many_to_one("group"))
+        self.assertFalse(datamodel.is_relation_many_to_many("group"))
+        self.assertFalse(datamodel.is_relation("field_string"))
+        self.assertFalse(datamodel.is_relation_many_to_one("not_a_column"))
+        self.assertEqual(datamodel.get_related_model("group"), Model1)
+        self.assertEqual(datamodel.get_relation_fk("group").name, "group_id")
+        self.assertEqual(datamodel.get_pk_name(), "id")
+        self.assertFalse(datamodel.is_pk_composite())
+        self.assertIs(datamodel._get_attr("field_string"), Model2.field_string)
+
+        datamodel = SQLAInterface(ModelMMParent)
+        self.assertTrue(datamodel.is_relation_many_to_many("children"))
+        datamodel = SQLAInterface(ModelOMParent)
+        self.assertTrue(datamodel.is_relation_one_to_many("children"))
+        datamodel = SQLAInterface(ModelOOParent)
+        self.assertTrue(datamodel.is_relation_one_to_one("child"))
+        self.assertFalse(datamodel.is_relation_one_to_many("child"))
+
+    def test_is_model_already_joined(self):
+        is_joined = SQLAInterface.is_model_already_joined
+        self.assertTrue(is_joined(Query(Model2), Model2))
+        self.assertFalse(is_joined(Query(Model2), Model1))
+        self.assertTrue(is_joined(Query(Model2).join(Model1), Model1))
+        self.assertTrue(is_joined(Query(Model2).join(Model2.group), Model1))
+        alias = aliased(Model1, name="model1_1")
+        query = Query(Model4).join(alias, Model4.model1_1, isouter=True)
+        self.assertTrue(is_joined(query, Model1))
+        self.assertFalse(is_joined(query, ModelMMChild))
+        query = Query(ModelMMParent).join(ModelMMParent.children)
+        self.assertTrue(is_joined(query, ModelMMChild))